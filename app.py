@@ -1,94 +1,204 @@
 import os
 import logging
+import click
 from flask import Flask
+from sqlalchemy import inspect
 from werkzeug.middleware.proxy_fix import ProxyFix
-from flask_wtf.csrf import CSRFProtect
-from extensions import db, login_manager, cache
+from extensions import db, login_manager, cache, csrf
+from counters import init_counters
+from query_monitor import init_query_monitor
+from replica import DEFAULT_STICKY_SECONDS, REPLICA_BIND, init_replica
+from images import init_image_pipeline
+from uploads import DEFAULT_GRACE_SECONDS, init_upload_tracking
+from logging_config import ensure_logging, init_request_logging
 from werkzeug.security import generate_password_hash
 
-# Set up logging
-logging.basicConfig(level=logging.DEBUG)
-
-# Create the app
-app = Flask(__name__)
-app.secret_key = os.environ.get("SESSION_SECRET", "dev-secret-key-change-in-production")
-app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
-
-# Configure the database
-database_url = os.environ.get("DATABASE_URL", "sqlite:///college_management.db")
-app.config["SQLALCHEMY_DATABASE_URI"] = database_url
-
-# Only set PostgreSQL-specific options if using PostgreSQL
-if database_url.startswith("postgresql"):
-    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
-        "pool_recycle": 300,
-        "pool_pre_ping": True,
-        "connect_args": {
-            "sslmode": "disable",  # Disable SSL for local development
-            "connect_timeout": 10,
-            "options": "-c statement_timeout=30000"
+logger = logging.getLogger(__name__)
+
+
+def create_app(config=None, profile='web'):
+    """
+    Build and configure the Flask app.
+
+    ``config`` is a mapping (or object) of settings applied over the defaults.
+    ``profile`` picks what gets loaded (see blueprints.PROFILES):
+        web     all views; what gunicorn serves
+        api     only the public /api/* views
+        worker  models and the database only, for Celery and scripts
+
+    Creating the app never touches the database; run ``flask --app app
+    init-db`` (or let gunicorn.conf.py do it) to create the schema and the
+    default admin, and ``flask --app app db-upgrade`` to migrate an existing
+    database.
+    """
+    from blueprints import PROFILES, register_blueprints
+
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown app profile {profile!r}; expected one of {sorted(PROFILES)}")
+
+    # Structured, queue-backed logging (see logging_config.py), once per process
+    ensure_logging()
+
+    app = Flask(__name__)
+    app.secret_key = os.environ.get("SESSION_SECRET", "dev-secret-key-change-in-production")
+
+    # Configure the database
+    database_url = os.environ.get("DATABASE_URL", "sqlite:///college_management.db")
+    app.config["SQLALCHEMY_DATABASE_URI"] = database_url
+
+    # Only set PostgreSQL-specific options if using PostgreSQL
+    if database_url.startswith("postgresql"):
+        app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+            "pool_recycle": 300,
+            "pool_pre_ping": True,
+            "connect_args": {
+                "sslmode": "disable",  # Disable SSL for local development
+                "connect_timeout": 10,
+                "options": "-c statement_timeout=30000"
+            }
         }
-    }
-else:
-    # SQLite configuration
-    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
-        "pool_pre_ping": True
-    }
-app.config["UPLOAD_FOLDER"] = "static/uploads"
-app.config["MAX_CONTENT_LENGTH"] = 16 * 1024 * 1024  # 16MB max file size
-
-# Initialize extensions
-db.init_app(app)
-login_manager.init_app(app)
-login_manager.login_view = 'login'
-login_manager.login_message = 'Please log in to access this page.'
-login_manager.login_message_category = 'info'
-
-# Initialize caching
-cache.init_app(app)
-
-# Initialize CSRF protection
-csrf = CSRFProtect(app)
+    else:
+        # SQLite configuration
+        app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+            "pool_pre_ping": True
+        }
+    # Optional read replica for reports and dashboards (see replica.py)
+    replica_url = os.environ.get("DATABASE_REPLICA_URL")
+    if replica_url:
+        app.config["SQLALCHEMY_BINDS"] = {REPLICA_BIND: replica_url}
+    app.config["REPLICA_STICKY_SECONDS"] = int(os.environ.get("REPLICA_STICKY_SECONDS", DEFAULT_STICKY_SECONDS))
+    # Redis cache shared by the web workers and Celery (extensions.cache)
+    app.config["CACHE_TYPE"] = os.environ.get("CACHE_TYPE", "RedisCache")
+    app.config["CACHE_REDIS_URL"] = os.environ.get("REDIS_URL", "redis://localhost:6379/0")
+    app.config["CACHE_DEFAULT_TIMEOUT"] = 300  # 5 minutes default
+    app.config["UPLOAD_FOLDER"] = "static/uploads"
+    app.config["MAX_CONTENT_LENGTH"] = 16 * 1024 * 1024  # 16MB max file size
+    # Unreferenced uploads younger than this are left for the hourly sweep (see uploads.py)
+    app.config["UPLOAD_GRACE_SECONDS"] = int(os.environ.get("UPLOAD_GRACE_SECONDS", DEFAULT_GRACE_SECONDS))
+
+    # Per-request SQL statement accounting (always on in debug/testing)
+    app.config["QUERY_MONITOR"] = os.environ.get("QUERY_MONITOR", "").lower() in ("1", "true", "yes")
+    app.config["QUERY_BUDGET_RAISE"] = os.environ.get("QUERY_BUDGET_RAISE", "").lower() in ("1", "true", "yes")
+
+    # Resized image variants are generated by Celery after upload ('celery' or 'off')
+    app.config["IMAGE_PIPELINE"] = os.environ.get("IMAGE_PIPELINE", "celery").lower()
+
+    if config is not None:
+        if isinstance(config, dict):
+            app.config.update(config)
+        else:
+            app.config.from_object(config)
+
+    db.init_app(app)
+    init_upload_tracking(db)
+    init_image_pipeline(db)
+    init_counters(db)
+    init_replica(app, db)
+    cache.init_app(app)
+    register_commands(app)
+    if profile == 'worker':
+        return app
+
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
+
+    # Initialize extensions
+    login_manager.init_app(app)
+    login_manager.login_view = 'auth.login'
+    login_manager.login_message = 'Please log in to access this page.'
+    login_manager.login_message_category = 'info'
+
+    # Tag every request with an id for the logs
+    init_request_logging(app)
+
+    # Initialize CSRF protection
+    csrf.init_app(app)
+
+    init_query_monitor(app)
+
+    register_blueprints(app, profile)
+    return app
+
 
 @login_manager.user_loader
 def load_user(user_id):
     from models import User
-    return User.query.get(int(user_id))
+    return db.session.get(User, int(user_id))
+
 
-def init_db():
+def create_tables():
+    # Import models to ensure they are registered with SQLAlchemy
+    import models  # noqa: F401
+    import migrations
+
+    try:
+        fresh = not inspect(db.engine).has_table('user')
+        db.create_all()
+        logger.info("Database tables created successfully")
+    except Exception as e:
+        logger.warning("Error creating tables: %s", e)
+        # If tables already exist, that's fine
+        return
+    if fresh:
+        # create_all() built the current schema; later revisions start from here
+        migrations.stamp('head')
+
+
+def ensure_default_admin():
+    """Create the default admin user if it doesn't exist"""
+    from models import User
+
+    admin_user = User.query.filter_by(email='admin@college.edu').first()
+    if admin_user:
+        return
+    admin_user = User(
+        username='admin',
+        email='admin@college.edu',
+        password_hash=generate_password_hash('admin123'),
+        role='admin',
+        first_name='System',
+        last_name='Administrator'
+    )
+    db.session.add(admin_user)
+    try:
+        db.session.commit()
+        logger.info("Default admin user created: admin@college.edu")
+    except Exception as e:
+        db.session.rollback()
+        logger.error("Error creating admin user: %s", e)
+
+
+def init_db(app):
     with app.app_context():
-        # Import models to ensure they are registered with SQLAlchemy
-        from models import User
-        
-        # Create tables if they don't exist
-        try:
-            db.create_all()
-            logging.info("Database tables created successfully")
-        except Exception as e:
-            logging.warning(f"Error creating tables: {str(e)}")
-            # If tables already exist, that's fine
-        
-        # Create default admin user if it doesn't exist
-        admin_user = User.query.filter_by(email='admin@college.edu').first()
-        if not admin_user:
-            admin_user = User(
-                username='admin',
-                email='admin@college.edu',
-                password_hash=generate_password_hash('admin123'),
-                role='admin',
-                first_name='System',
-                last_name='Administrator'
-            )
-            db.session.add(admin_user)
-            try:
-                db.session.commit()
-                logging.info("Default admin user created: admin@college.edu / admin123")
-            except Exception as e:
-                db.session.rollback()
-                logging.error(f"Error creating admin user: {str(e)}")
-
-# Initialize database
-init_db()
-
-# Import routes after app initialization
-from routes import *
+        create_tables()
+        ensure_default_admin()
+
+
+def register_commands(app):
+    @app.cli.command('init-db')
+    def init_db_command():
+        """Create missing tables and the default admin user."""
+        create_tables()
+        ensure_default_admin()
+        click.echo('Database initialised.')
+
+    @app.cli.command('create-tables')
+    def create_tables_command():
+        """Create missing tables only."""
+        create_tables()
+        click.echo('Tables created.')
+
+    @app.cli.command('db-upgrade')
+    @click.argument('revision', default='head')
+    def db_upgrade_command(revision):
+        """Apply pending schema migrations (see migrations/)."""
+        import migrations
+        if migrations.upgrade(revision):
+            click.echo(f'Database upgraded to {revision}.')
+        else:
+            click.echo('No tables yet; run init-db to create them.')
+
+    @app.cli.command('create-admin')
+    def create_admin_command():
+        """Create the default admin user if it is missing."""
+        ensure_default_admin()
+        click.echo('Default admin checked.')
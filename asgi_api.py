@@ -0,0 +1,232 @@
+"""
+Async (ASGI) server for the public JSON APIs.
+
+The /api/* endpoints used by the college website are public, read-only (apart
+from enquiries) and spend their time waiting on the database. Served from the
+Flask app they compete with the admin pages for the same sync gunicorn
+workers, so a burst of website traffic can starve logged-in users. This
+module serves them from a separate process instead: a small ASGI app that
+reuses models.py and the queries in public_api.py through SQLAlchemy's
+asyncio engine (asyncpg on PostgreSQL, aiosqlite on SQLite).
+
+Run it next to the main app and route /api/ to it at the proxy:
+    uvicorn asgi_api:app --host 0.0.0.0 --port 8000 --workers 2
+
+The Flask routes stay in place, so running this is optional.
+
+Environment variables:
+    DATABASE_URL         same URL the Flask app uses; the async driver is picked from it
+    API_DB_POOL_SIZE     connections per process, default 10
+    API_CORS_ORIGIN      Access-Control-Allow-Origin value, unset by default
+"""
+
+import json
+import logging
+import os
+from urllib.parse import parse_qsl
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import public_api
+
+logger = logging.getLogger(__name__)
+
+ASYNC_DRIVERS = {
+    'postgresql': 'postgresql+asyncpg',
+    'sqlite': 'sqlite+aiosqlite',
+}
+MAX_BODY_BYTES = 64 * 1024
+INSTANCE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance')
+
+
+def async_database_url(url):
+    """Swap the sync driver in a DATABASE_URL for its asyncio counterpart"""
+    if url.startswith('postgres://'):
+        url = url.replace('postgres://', 'postgresql://', 1)
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f'No async driver configured for {backend} databases')
+    # asyncpg takes ssl=..., not libpq's sslmode=...
+    query = dict(parsed.query)
+    if backend == 'postgresql' and 'sslmode' in query:
+        query['ssl'] = query.pop('sslmode')
+    database = parsed.database
+    if backend == 'sqlite' and database and database != ':memory:' and not os.path.isabs(database):
+        # Flask-SQLAlchemy resolves relative SQLite paths against the instance folder
+        database = os.path.join(INSTANCE_PATH, database)
+    return parsed.set(drivername=ASYNC_DRIVERS[backend], query=query, database=database)
+
+
+class JSONResponse:
+    def __init__(self, payload, status=200):
+        self.body = b'' if status == 204 else json.dumps(payload, default=public_api.json_default).encode()
+        self.status = status
+
+
+class PublicApi:
+    """Minimal ASGI application: exact-path routing, JSON in, JSON out"""
+
+    def __init__(self, database_url=None, pool_size=None, cors_origin=None):
+        self.database_url = database_url or os.environ.get('DATABASE_URL', 'sqlite:///college_management.db')
+        self.pool_size = pool_size or int(os.environ.get('API_DB_POOL_SIZE', 10))
+        self.cors_origin = cors_origin if cors_origin is not None else os.environ.get('API_CORS_ORIGIN')
+        self.engine = None
+        self.sessions = None
+        self.routes = {
+            ('GET', '/api/departments'): self.departments,
+            ('GET', '/api/banners'): self.banners,
+            ('GET', '/api/events'): self.events,
+            ('GET', '/api/announcements'): self.announcements,
+            ('GET', '/api/notifications'): self.notifications,
+            ('POST', '/api/enquiry'): self.enquiry,
+        }
+
+    async def startup(self):
+        url = async_database_url(self.database_url)
+        options = {'pool_pre_ping': True}
+        if url.get_backend_name() == 'postgresql':
+            options.update(pool_size=self.pool_size, max_overflow=self.pool_size, pool_recycle=300)
+        self.engine = create_async_engine(url, **options)
+        self.sessions = async_sessionmaker(self.engine, expire_on_commit=False)
+
+    async def shutdown(self):
+        if self.engine is not None:
+            await self.engine.dispose()
+            self.engine = None
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http':
+            if self.engine is None:
+                # Servers without lifespan support
+                await self.startup()
+            response = await self._dispatch(scope, receive)
+            await self._send(send, response)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                try:
+                    await self.startup()
+                except Exception as e:
+                    logger.exception('Public API startup failed')
+                    await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                    return
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _dispatch(self, scope, receive):
+        method = scope['method']
+        if method == 'OPTIONS':
+            return JSONResponse({}, 204)
+        path = scope['path'].rstrip('/') or '/'
+        handler = self.routes.get((method, path))
+        if handler is None:
+            allowed = any(route_path == path for _, route_path in self.routes)
+            status = 405 if allowed else 404
+            return JSONResponse({'success': False, 'message': 'Method not allowed' if allowed else 'Not found'},
+                                status)
+        args = dict(parse_qsl(scope.get('query_string', b'').decode('latin-1')))
+        try:
+            return await handler(args, receive)
+        except public_api.ApiError as e:
+            return JSONResponse({'success': False, 'message': str(e)}, 400)
+
+    async def _send(self, send, response):
+        headers = [(b'content-type', b'application/json'),
+                   (b'content-length', str(len(response.body)).encode())]
+        if self.cors_origin:
+            headers += [(b'access-control-allow-origin', self.cors_origin.encode()),
+                        (b'access-control-allow-methods', b'GET, POST, OPTIONS'),
+                        (b'access-control-allow-headers', b'Content-Type')]
+        await send({'type': 'http.response.start', 'status': response.status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': response.body})
+
+    async def _read_json(self, receive):
+        body = b''
+        more = True
+        while more:
+            message = await receive()
+            body += message.get('body', b'')
+            more = message.get('more_body', False)
+            if len(body) > MAX_BODY_BYTES:
+                raise public_api.ApiError('Request body too large')
+        try:
+            return json.loads(body) if body else None
+        except ValueError:
+            return None
+
+    async def _fetch(self, statement):
+        async with self.sessions() as session:
+            return (await session.scalars(statement)).unique().all()
+
+    async def departments(self, args, receive):
+        try:
+            departments = await self._fetch(public_api.departments_query())
+            return JSONResponse(public_api.departments_payload(departments))
+        except Exception as e:
+            logger.exception('Departments API error')
+            return JSONResponse({'success': False, 'message': f'Failed to fetch departments: {str(e)}'}, 500)
+
+    async def banners(self, args, receive):
+        try:
+            banners = await self._fetch(public_api.banners_query())
+            return JSONResponse(public_api.banners_payload(banners))
+        except Exception as e:
+            logger.exception('Banners API error')
+            return JSONResponse({'success': False, 'message': f'Failed to fetch banners: {str(e)}'}, 500)
+
+    async def events(self, args, receive):
+        filters = public_api.events_filters(args)
+        try:
+            events = await self._fetch(public_api.events_query(filters))
+            return JSONResponse(public_api.events_payload(events, filters))
+        except Exception as e:
+            logger.exception('Events API error')
+            return JSONResponse({'success': False, 'message': f'Failed to fetch events: {str(e)}'}, 500)
+
+    async def announcements(self, args, receive):
+        filters = public_api.announcements_filters(args)
+        try:
+            announcements = await self._fetch(public_api.announcements_query(filters))
+            return JSONResponse(public_api.announcements_payload(announcements, filters))
+        except Exception as e:
+            logger.exception('Announcements API error')
+            return JSONResponse({'success': False, 'message': f'Failed to fetch announcements: {str(e)}'}, 500)
+
+    async def notifications(self, args, receive):
+        filters = public_api.notifications_filters(args)
+        try:
+            notifications = await self._fetch(public_api.notifications_query(filters))
+            return JSONResponse(public_api.notifications_payload(notifications, filters))
+        except Exception as e:
+            logger.exception('Notifications API error')
+            return JSONResponse({'success': False, 'message': f'Failed to fetch notifications: {str(e)}'}, 500)
+
+    async def enquiry(self, args, receive):
+        enquiry = public_api.build_enquiry(await self._read_json(receive))
+        try:
+            async with self.sessions() as session:
+                session.add(enquiry)
+                await session.commit()
+            return JSONResponse(public_api.enquiry_created_payload(enquiry), 201)
+        except Exception:
+            logger.exception('Enquiry API error')
+            return JSONResponse({'success': False, 'message': 'Failed to submit enquiry. Please try again.'}, 500)
+
+
+def create_asgi_app(**options):
+    from logging_config import setup_logging
+
+    setup_logging()
+    return PublicApi(**options)
+
+
+app = create_asgi_app()
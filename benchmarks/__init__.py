@@ -0,0 +1 @@
+"""Performance tooling: endpoint benchmarks and load tests against seed_data.py datasets"""
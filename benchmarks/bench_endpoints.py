@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Latency and query-count benchmarks for the hot endpoints
+
+Boots the app in-process against a database generated by seed_data.py, logs
+in as a student, a faculty member and the admin, and times each endpoint with
+the Flask test client. Per endpoint it records p50/p95/mean latency and the
+number of SQL statements (from the query monitor's X-Query-Count header).
+
+The first run (or --update-baseline) writes the results to the baseline file.
+Later runs compare against it and exit non-zero when an endpoint's p95 grows
+by more than --threshold or it starts running more queries.
+
+Example:
+    python -m benchmarks.bench_endpoints --database-url sqlite:////tmp/bench.db --students 5000 --days 60
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import time
+from datetime import date, timedelta
+
+DEFAULT_DATABASE_URL = 'sqlite:////tmp/college_bench.db'
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+ADMIN_CREDENTIALS = ('admin@college.edu', 'admin123')
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the hot endpoints')
+    parser.add_argument('--database-url', default=os.environ.get('BENCH_DATABASE_URL', DEFAULT_DATABASE_URL))
+    parser.add_argument('--students', type=int, default=2000, help='students to seed when the database is empty')
+    parser.add_argument('--days', type=int, default=30, help='attendance days to seed when the database is empty')
+    parser.add_argument('--reseed', action='store_true', help='drop and regenerate the dataset first')
+    parser.add_argument('--iterations', type=int, default=20, help='timed requests per endpoint')
+    parser.add_argument('--warmup', type=int, default=2, help='untimed requests per endpoint')
+    parser.add_argument('--import-rows', type=int, default=200, help='rows in the generated Excel import file')
+    parser.add_argument('--import-iterations', type=int, default=3,
+                        help='timed runs of the Excel import (password hashing makes it slow)')
+    parser.add_argument('--only', action='append', help='run only the named benchmark (repeatable)')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--output', default='bench_results.json', help='where to write this run\'s results')
+    parser.add_argument('--update-baseline', action='store_true', help='overwrite the baseline with this run')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='allowed relative p95 regression (default 0.25 = 25%%)')
+    parser.add_argument('--min-delta-ms', type=float, default=5.0,
+                        help='ignore p95 regressions smaller than this many ms')
+    return parser.parse_args(argv)
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+def boot_app(args):
+    """Import the app against the benchmark database, seeding it if needed"""
+    os.environ['DATABASE_URL'] = args.database_url
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+    # The per-request N+1 reports are expected here; the numbers go in the results file
+    os.environ.setdefault('LOG_LEVELS', 'query_monitor=ERROR')
+    os.environ['QUERY_MONITOR'] = '1'
+
+    from app import create_app, init_db
+    from extensions import db
+    from models import User
+    import seed_data
+
+    app = create_app({'WTF_CSRF_ENABLED': False})
+
+    with app.app_context():
+        if args.reseed:
+            db.drop_all()
+            db.session.commit()
+        init_db(app)
+        if not User.query.filter_by(role='student').first():
+            print(f'🌱 Seeding {args.students} students x {args.days} days into {args.database_url}')
+            seed_data.seed(db.session, students=args.students, days=args.days, log=lambda msg: None)
+    return app
+
+
+def login(app, email, password):
+    client = app.test_client()
+    response = client.post('/login', data={'email': email, 'password': password})
+    if response.status_code != 302:
+        raise RuntimeError(f'Login failed for {email} (status {response.status_code})')
+    return client
+
+
+def build_excel(rows):
+    """An in-memory student import workbook with ``rows`` new students"""
+    from openpyxl import Workbook
+
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(['first_name', 'last_name', 'email', 'student_id', 'phone'])
+    for i in range(rows):
+        sheet.append([f'Bench{i}', 'Import', f'bench.import{i}@bench.example.edu', f'BENCH{i:06d}', '9876500000'])
+    output = io.BytesIO()
+    workbook.save(output)
+    return output.getvalue()
+
+
+def build_scenarios(app, args):
+    """Return [(name, client, method, path, request_kwargs_factory, expected_status)]"""
+    import seed_data
+    from extensions import db
+    from models import User, ClassroomAssignment, Classroom, Department
+
+    with app.app_context():
+        student = User.query.filter_by(role='student', is_active=True).order_by(User.id).first()
+        assignment = ClassroomAssignment.query.filter_by(is_active=True).order_by(ClassroomAssignment.id).first()
+        if student is None or assignment is None:
+            raise RuntimeError('The benchmark database has no students or faculty assignments; use --reseed')
+        faculty = db.session.get(User, assignment.user_id)
+        classroom = db.session.get(Classroom, assignment.classroom_id)
+        classroom_students = [
+            user_id for (user_id,) in db.session.query(User.id).filter(
+                User.classroom_id == classroom.id, User.role == 'student', User.is_active == True)
+        ]
+        department = Department.query.order_by(Department.id).first()
+        search_term = student.last_name
+        student_email, faculty_email = student.email, faculty.email
+
+    student_client = login(app, student_email, seed_data.DEFAULT_PASSWORD)
+    faculty_client = login(app, faculty_email, seed_data.DEFAULT_PASSWORD)
+    admin_client = login(app, *ADMIN_CREDENTIALS)
+    public_client = app.test_client()
+
+    attendance_day = date.today() - timedelta(days=1)
+    if attendance_day.weekday() == 6:
+        attendance_day -= timedelta(days=1)
+    attendance_form = {'date': attendance_day.isoformat()}
+    attendance_form.update({f'attendance_{sid}': 'present' for sid in classroom_students})
+
+    excel_bytes = build_excel(args.import_rows)
+
+    def no_body():
+        return {}
+
+    def excel_upload():
+        return {
+            'data': {
+                'excel_file': (io.BytesIO(excel_bytes), 'students.xlsx'),
+                'default_password': 'student123',
+                'department': department.name,
+                'classroom_id': '0',
+            },
+            'content_type': 'multipart/form-data',
+        }
+
+    return [
+        ('student_dashboard', student_client, 'GET', '/student/dashboard', no_body, 200),
+        ('student_attendance', student_client, 'GET', '/student/attendance', no_body, 200),
+        ('faculty_attendance_get', faculty_client, 'GET',
+         f'/faculty/attendance?classroom_id={classroom.id}&date={attendance_day.isoformat()}', no_body, 200),
+        ('faculty_attendance_post', faculty_client, 'POST', '/faculty/attendance',
+         lambda: {'data': attendance_form}, 302),
+        ('faculty_attendance_reports', faculty_client, 'GET',
+         f'/faculty/attendance-reports?department={classroom.department}', no_body, 200),
+        ('admin_attendance_overview', admin_client, 'GET', '/admin/attendance-overview', no_body, 200),
+        ('admin_users_search', admin_client, 'GET', f'/admin/users?search={search_term}', no_body, 200),
+        ('admin_import_students', admin_client, 'POST', '/admin/import-students', excel_upload, 200),
+        ('api_departments', public_client, 'GET', '/api/departments', no_body, 200),
+        ('api_banners', public_client, 'GET', '/api/banners', no_body, 200),
+        ('api_events', public_client, 'GET', '/api/events?limit=20', no_body, 200),
+        ('api_announcements', public_client, 'GET', '/api/announcements', no_body, 200),
+        ('api_notifications', public_client, 'GET', '/api/notifications', no_body, 200),
+        ('api_enquiry', public_client, 'POST', '/api/enquiry',
+         lambda: {'json': {'name': 'Bench', 'email': 'bench@example.com', 'mobile': '9876543210',
+                           'programme': 'UG', 'branch': 'CSE'}}, 201),
+    ]
+
+
+def run_scenario(client, method, path, make_kwargs, expected_status, iterations, warmup):
+    samples = []
+    queries = None
+    for i in range(warmup + iterations):
+        started = time.perf_counter()
+        response = client.open(path, method=method, **make_kwargs())
+        elapsed = (time.perf_counter() - started) * 1000
+        if response.status_code != expected_status:
+            raise RuntimeError(f'{method} {path} returned {response.status_code}, expected {expected_status}')
+        if i >= warmup:
+            samples.append(elapsed)
+            queries = int(response.headers.get('X-Query-Count', 0))
+    return {
+        'p50_ms': round(percentile(samples, 50), 2),
+        'p95_ms': round(percentile(samples, 95), 2),
+        'mean_ms': round(sum(samples) / len(samples), 2),
+        'queries': queries,
+        'iterations': iterations,
+    }
+
+
+def compare(results, baseline, threshold, min_delta_ms):
+    """Return a list of human-readable regressions against ``baseline``"""
+    regressions = []
+    for name, current in results['benchmarks'].items():
+        previous = baseline.get('benchmarks', {}).get(name)
+        if not previous:
+            continue
+        allowed = previous['p95_ms'] * (1 + threshold)
+        if current['p95_ms'] > allowed and current['p95_ms'] - previous['p95_ms'] >= min_delta_ms:
+            regressions.append(f"{name}: p95 {previous['p95_ms']}ms -> {current['p95_ms']}ms")
+        if previous.get('queries') is not None and current['queries'] > previous['queries']:
+            regressions.append(f"{name}: queries {previous['queries']} -> {current['queries']}")
+    return regressions
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    app = boot_app(args)
+    scenarios = build_scenarios(app, args)
+    if args.only:
+        scenarios = [s for s in scenarios if s[0] in args.only]
+
+    with app.app_context():
+        from extensions import db
+        from models import User, Attendance
+        dataset = {
+            'students': User.query.filter_by(role='student').count(),
+            'attendance_rows': db.session.query(Attendance.id).count(),
+            'dialect': db.engine.dialect.name,
+        }
+
+    results = {
+        'generated_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'dataset': dataset,
+        'benchmarks': {},
+    }
+
+    print(f"{'benchmark':<30} {'p50 ms':>9} {'p95 ms':>9} {'queries':>8}")
+    for name, client, method, path, make_kwargs, expected in scenarios:
+        iterations = args.import_iterations if name == 'admin_import_students' else args.iterations
+        stats = run_scenario(client, method, path, make_kwargs, expected, iterations, min(args.warmup, iterations))
+        results['benchmarks'][name] = stats
+        print(f"{name:<30} {stats['p50_ms']:>9.1f} {stats['p95_ms']:>9.1f} {stats['queries']:>8}")
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+
+    if args.update_baseline or not os.path.exists(args.baseline):
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f'📝 Baseline written to {args.baseline}')
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    baseline_dataset = baseline.get('dataset', {})
+    if any(baseline_dataset.get(key) != dataset[key] for key in ('students', 'dialect')):
+        print(f"⚠️  Baseline dataset {baseline_dataset} differs from this run's {dataset}")
+
+    regressions = compare(results, baseline, args.threshold, args.min_delta_ms)
+    if regressions:
+        print('💥 Regressions against baseline:')
+        for line in regressions:
+            print(f'   {line}')
+        return 1
+    print('✅ No regressions against baseline')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Index advisor: which of the app's queries scan whole tables, and which
+indexes nothing uses
+
+Boots the app against a seed_data.py database like bench_endpoints.py, runs
+each of its scenarios once and records every distinct SELECT/UPDATE/DELETE.
+Each statement is then explained with its recorded parameters (EXPLAIN
+QUERY PLAN on SQLite, EXPLAIN (ANALYZE, FORMAT JSON) on PostgreSQL, rolled
+back) and the report lists
+
+- statements that scan a table of at least --min-rows rows, or sort without
+  an index, with the scenarios that ran them;
+- indexes declared in models.py that no replayed plan used.
+
+It also writes a migration (--migration, plain SQL for the database's
+dialect) that brings the database in line with models.py: CREATE INDEX for
+declared indexes it lacks (partial and INCLUDE indexes as declared) and
+DROP INDEX for indexes models.py no longer declares. Unused indexes are only
+reported; remove them from models.py and rerun to drop them.
+
+Example:
+    python -m benchmarks.index_advisor --database-url sqlite:////tmp/bench.db
+    sqlite3 /tmp/bench.db < index_migration.sql
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from collections import defaultdict
+
+from benchmarks.bench_endpoints import DEFAULT_DATABASE_URL, boot_app, build_scenarios
+
+# SQLite: "SCAN attendance", "SEARCH user USING INDEX idx_user_names (first_name=?)"
+SQLITE_PLAN = re.compile(r'^(SCAN|SEARCH) (\w+)(?: AS \w+)?(?: USING (?:COVERING )?INDEX (\w+))?')
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Report table scans and unused indexes for the app\'s queries')
+    parser.add_argument('--database-url', default=os.environ.get('BENCH_DATABASE_URL', DEFAULT_DATABASE_URL))
+    parser.add_argument('--students', type=int, default=2000, help='students to seed when the database is empty')
+    parser.add_argument('--days', type=int, default=30, help='attendance days to seed when the database is empty')
+    parser.add_argument('--reseed', action='store_true', help='drop and regenerate the dataset first')
+    parser.add_argument('--import-rows', type=int, default=20, help='rows in the generated Excel import file')
+    parser.add_argument('--min-rows', type=int, default=1000, help='ignore scans of tables smaller than this')
+    parser.add_argument('--migration', default='index_migration.sql', help='where to write the index migration')
+    parser.add_argument('--output', help='also write the report as JSON')
+    return parser.parse_args(argv)
+
+
+def capture_statements(app, scenarios):
+    """{statement: {'parameters': first parameters seen, 'scenarios': names}} for one run of each scenario"""
+    from sqlalchemy import event
+    from extensions import db
+
+    captured = {}
+    current = [None]
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if executemany or not re.match(r'\s*(SELECT|UPDATE|DELETE|WITH)\b', statement, re.IGNORECASE):
+            return
+        entry = captured.setdefault(statement, {'parameters': parameters, 'scenarios': set()})
+        entry['scenarios'].add(current[0])
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        for name, client, method, path, make_kwargs, expected in scenarios:
+            current[0] = name
+            response = client.open(path, method=method, **make_kwargs())
+            if response.status_code != expected:
+                raise RuntimeError(f'{method} {path} returned {response.status_code}, expected {expected}')
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+    return captured
+
+
+def _explain_sqlite(connection, statement, parameters):
+    scans, indexes, sorts, tables = [], set(), 0, set()
+    for row in connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters):
+        detail = row[-1]
+        match = SQLITE_PLAN.match(detail)
+        if match:
+            kind, table, index = match.groups()
+            tables.add(table)
+            if index:
+                indexes.add(index)
+            elif kind == 'SCAN':
+                scans.append((table, detail))
+        elif detail.startswith('USE TEMP B-TREE'):
+            sorts += 1
+    return scans, indexes, sorts, tables
+
+
+def _walk(node):
+    yield node
+    for child in node.get('Plans', []):
+        yield from _walk(child)
+
+
+def _explain_postgresql(connection, statement, parameters):
+    scans, indexes, sorts, tables = [], set(), 0, set()
+    transaction = connection.begin_nested() if connection.in_transaction() else connection.begin()
+    try:
+        # ANALYZE runs the statement; UPDATE/DELETE are rolled back below
+        plan = connection.exec_driver_sql(f'EXPLAIN (ANALYZE, FORMAT JSON) {statement}', parameters).scalar()
+    finally:
+        transaction.rollback()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    for node in _walk(plan[0]['Plan']):
+        if node.get('Relation Name'):
+            tables.add(node['Relation Name'])
+        if node.get('Index Name'):
+            indexes.add(node['Index Name'])
+        if node['Node Type'] == 'Seq Scan':
+            removed = node.get('Rows Removed by Filter', 0)
+            scans.append((node['Relation Name'],
+                          f"Seq Scan on {node['Relation Name']}: {node.get('Actual Rows', 0)} rows kept, "
+                          f"{removed} removed by filter {node.get('Filter', '')}".strip()))
+        elif node['Node Type'] == 'Sort' and node.get('Sort Method', '').startswith('external'):
+            sorts += 1
+    return scans, indexes, sorts, tables
+
+
+def explain(connection, statement, parameters):
+    """(full scans as [(table, detail)], index names used, sorts without an index, tables read)"""
+    if connection.dialect.name == 'postgresql':
+        return _explain_postgresql(connection, statement, parameters)
+    return _explain_sqlite(connection, statement, parameters)
+
+
+def table_sizes(connection, tables):
+    from sqlalchemy import func, select
+
+    return {table.name: connection.execute(select(func.count()).select_from(table)).scalar() for table in tables}
+
+
+def live_indexes(connection):
+    """{index name: table name} of the database's own indexes, leaving out those behind unique constraints"""
+    from sqlalchemy import inspect
+
+    inspector = inspect(connection)
+    indexes = {}
+    for table in inspector.get_table_names():
+        constraints = {constraint['name'] for constraint in inspector.get_unique_constraints(table)}
+        for index in inspector.get_indexes(table):
+            if index['name'] in constraints or index.get('duplicates_constraint'):
+                continue
+            indexes[index['name']] = table
+    return indexes
+
+
+def migration_sql(dialect, declared, live):
+    """DDL creating the declared indexes the database lacks and dropping the ones models.py no longer has"""
+    from sqlalchemy.schema import CreateIndex
+
+    lines = []
+    for name, index in sorted(declared.items()):
+        if name not in live:
+            ddl = str(CreateIndex(index).compile(dialect=dialect)).strip()
+            if dialect.name == 'postgresql':
+                # Don't block writes while building; run this file outside a transaction
+                ddl = ddl.replace('CREATE INDEX', 'CREATE INDEX CONCURRENTLY', 1)
+            lines.append(f'{ddl};')
+    for name in sorted(set(live) - set(declared)):
+        quoted = dialect.identifier_preparer.quote(name)
+        if dialect.name == 'postgresql':
+            lines.append(f'DROP INDEX CONCURRENTLY IF EXISTS {quoted};')
+        else:
+            lines.append(f'DROP INDEX IF EXISTS {quoted};')
+    return lines
+
+
+def advise(app, captured, min_rows):
+    from extensions import db
+
+    with app.app_context():
+        metadata = db.metadata
+        declared = {index.name: index for table in metadata.sorted_tables for index in table.indexes}
+        with db.engine.connect() as connection:
+            sizes = table_sizes(connection, metadata.sorted_tables)
+            live = live_indexes(connection)
+            used, findings = set(), []
+            for statement, entry in captured.items():
+                scans, indexes, sorts, tables = explain(connection, statement, entry['parameters'])
+                used |= indexes
+                scans = [(table, detail) for table, detail in scans if sizes.get(table, 0) >= min_rows]
+                # Sorting a handful of rows from small tables is not worth an index
+                if not any(sizes.get(table, 0) >= min_rows for table in tables):
+                    sorts = 0
+                if scans or sorts:
+                    findings.append({
+                        'scenarios': sorted(entry['scenarios']),
+                        'scans': [detail for table, detail in scans],
+                        'sorts': sorts,
+                        'statement': ' '.join(statement.split()),
+                    })
+            dialect = connection.dialect
+
+    unused = defaultdict(list)
+    for name, index in declared.items():
+        if name not in used and name in live:
+            unused[index.table.name].append(name)
+    return {
+        'dialect': dialect.name,
+        'table_rows': sizes,
+        'statements': len(captured),
+        'findings': findings,
+        'unused_indexes': {table: sorted(names) for table, names in sorted(unused.items())},
+        'migration': migration_sql(dialect, declared, live),
+    }
+
+
+def print_report(report):
+    print(f"🔎 {report['statements']} distinct statements explained on {report['dialect']}")
+    if report['findings']:
+        print(f"\n⚠️  {len(report['findings'])} statements scan large tables or sort without an index:")
+        for finding in report['findings']:
+            print(f"\n   [{', '.join(finding['scenarios'])}]")
+            for detail in finding['scans']:
+                print(f"   {detail}")
+            if finding['sorts']:
+                print(f"   {finding['sorts']} sort(s) without an index")
+            statement = finding['statement']
+            print(f"   {statement[:300]}{'...' if len(statement) > 300 else ''}")
+    else:
+        print('✅ No scans of large tables')
+
+    if report['unused_indexes']:
+        print('\n🗑  Indexes no replayed statement used (candidates to remove from models.py):')
+        for table, names in report['unused_indexes'].items():
+            print(f"   {table}: {', '.join(names)}")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    app = boot_app(args)
+    scenarios = build_scenarios(app, args)
+    captured = capture_statements(app, scenarios)
+    report = advise(app, captured, args.min_rows)
+    print_report(report)
+
+    with open(args.migration, 'w') as f:
+        f.write(f"-- Index migration for {report['dialect']}, generated by benchmarks/index_advisor.py\n")
+        f.writelines(f'{line}\n' for line in report['migration'])
+    if report['migration']:
+        print(f"\n📝 {len(report['migration'])} index changes written to {args.migration}")
+    else:
+        print(f'\n✅ The database indexes match models.py ({args.migration} is empty)')
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
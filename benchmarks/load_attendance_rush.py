@@ -0,0 +1,514 @@
+#!/usr/bin/env python3
+"""
+Load test for the 9-10 AM attendance rush
+
+Every faculty member opens ``faculty_attendance`` for one of their classrooms
+and submits it at roughly the same time, while students keep refreshing
+``student_attendance``. Each virtual user logs in through the real login form
+(CSRF token included) and keeps its own cookie jar and keep-alive connection.
+
+Runs fully offline: the HTTP client below is a small HTTP/1.1 client on top
+of asyncio streams, and accounts are read straight from the database (a
+seed_data.py dataset, all users share its password).
+
+Reports throughput, error rate, latency per request type and, on PostgreSQL,
+how many backends were waiting on locks (sampled from pg_stat_activity).
+
+Example:
+    gunicorn --bind 127.0.0.1:5000 --workers 4 wsgi:app &
+    DATABASE_URL=postgresql://... python -m benchmarks.load_attendance_rush \\
+        --base-url http://127.0.0.1:5000 --faculty 60 --students 400 --duration 60
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode, urljoin, urlsplit
+
+from benchmarks.bench_endpoints import percentile
+
+CSRF_RE = re.compile(r'name="csrf_token"[^>]*value="([^"]+)"')
+SUCCESS_MARKER = 'Attendance marked successfully'
+# Requests that are safe to send twice when a keep-alive connection drops
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}
+
+
+class HttpError(Exception):
+    pass
+
+
+class HttpResponse:
+    def __init__(self, status, headers, body):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    @property
+    def text(self):
+        return self.body.decode('utf-8', 'replace')
+
+
+class HttpClient:
+    """
+    Minimal HTTP/1.1 client: one keep-alive connection, a cookie jar and
+    GET/urlencoded POST. Enough to drive the app like a browser would.
+    """
+
+    def __init__(self, base_url, timeout=30.0):
+        parts = urlsplit(base_url)
+        self.base_url = base_url.rstrip('/')
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.timeout = timeout
+        self.cookies = {}
+        self._reader = None
+        self._writer = None
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+        self._reader = self._writer = None
+
+    async def get(self, path):
+        return await self.request('GET', path)
+
+    async def post(self, path, form):
+        return await self.request('POST', path, body=urlencode(form).encode(),
+                                  content_type='application/x-www-form-urlencoded')
+
+    async def request(self, method, path, body=b'', content_type=None):
+        try:
+            return await asyncio.wait_for(self._send(method, path, body, content_type), self.timeout)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            # The server may drop an idle keep-alive connection; retry once on a fresh one,
+            # unless the request may already have been processed (a POST is counted as an error)
+            await self.close()
+            if method not in IDEMPOTENT_METHODS:
+                raise
+            return await asyncio.wait_for(self._send(method, path, body, content_type), self.timeout)
+        except asyncio.TimeoutError:
+            await self.close()
+            raise
+
+    async def _send(self, method, path, body, content_type):
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+
+        lines = [f'{method} {path} HTTP/1.1', f'Host: {self.host}:{self.port}', 'Connection: keep-alive']
+        if self.cookies:
+            lines.append('Cookie: ' + '; '.join(f'{k}={v}' for k, v in self.cookies.items()))
+        if body or method == 'POST':
+            lines.append(f'Content-Type: {content_type}')
+            lines.append(f'Content-Length: {len(body)}')
+        self._writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode() + body)
+        await self._writer.drain()
+
+        status_line = await self._reader.readuntil(b'\r\n')
+        if not status_line:
+            raise ConnectionError('connection closed')
+        status = int(status_line.split()[1])
+
+        headers = {}
+        while True:
+            line = (await self._reader.readuntil(b'\r\n')).decode('latin-1').rstrip('\r\n')
+            if not line:
+                break
+            name, _, value = line.partition(':')
+            name, value = name.strip().lower(), value.strip()
+            if name == 'set-cookie':
+                cookie = SimpleCookie()
+                cookie.load(value)
+                for key, morsel in cookie.items():
+                    self.cookies[key] = morsel.value
+            headers[name] = value
+
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await self._reader.readuntil(b'\r\n')).split(b';')[0], 16)
+                if size == 0:
+                    await self._reader.readuntil(b'\r\n')
+                    break
+                chunks.append(await self._reader.readexactly(size))
+                await self._reader.readexactly(2)
+            body = b''.join(chunks)
+        elif 'content-length' in headers:
+            body = await self._reader.readexactly(int(headers['content-length']))
+        else:
+            body = await self._reader.read()
+            headers['connection'] = 'close'
+
+        if headers.get('connection', '').lower() == 'close':
+            await self.close()
+        return HttpResponse(status, headers, body)
+
+
+class Stats:
+    """Latencies and failures per request label"""
+
+    def __init__(self):
+        self.requests = defaultdict(int)
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(lambda: defaultdict(int))
+
+    async def timed(self, label, call, expected_status):
+        self.requests[label] += 1
+        started = time.perf_counter()
+        try:
+            response = await call
+        except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError, HttpError, ValueError) as exc:
+            self.errors[label][type(exc).__name__] += 1
+            return None
+        self.latencies[label].append((time.perf_counter() - started) * 1000)
+        if response.status != expected_status:
+            self.errors[label][f'HTTP {response.status}'] += 1
+            return None
+        return response
+
+    def summary(self, elapsed, setup_labels=('login_form', 'login')):
+        """``elapsed`` covers the rush only, so setup requests are left out of the throughput"""
+        rows = {}
+        for label in sorted(self.requests):
+            samples = self.latencies[label]
+            failures = sum(self.errors[label].values())
+            total = self.requests[label]
+            rows[label] = {
+                'requests': total,
+                'errors': failures,
+                'error_rate': round(failures / total, 4) if total else 0.0,
+                'p50_ms': round(percentile(samples, 50), 1),
+                'p95_ms': round(percentile(samples, 95), 1),
+                'max_ms': round(max(samples), 1) if samples else 0.0,
+                'error_kinds': dict(self.errors[label]),
+            }
+        requests = sum(row['requests'] for row in rows.values())
+        errors = sum(row['errors'] for row in rows.values())
+        rush_requests = sum(row['requests'] for label, row in rows.items() if label not in setup_labels)
+        return {
+            'elapsed_s': round(elapsed, 2),
+            'requests': requests,
+            'errors': errors,
+            'error_rate': round(errors / requests, 4) if requests else 0.0,
+            'throughput_rps': round(rush_requests / elapsed, 1) if elapsed else 0.0,
+            'endpoints': rows,
+        }
+
+
+def csrf_token(response):
+    match = CSRF_RE.search(response.text) if response is not None else None
+    if not match:
+        raise HttpError('no csrf_token in page')
+    return match.group(1)
+
+
+class RushClock:
+    """
+    Starts the rush once every virtual user has finished logging in, so the
+    rush only measures attendance traffic. Users wait for an offset from it.
+    """
+
+    def __init__(self, users):
+        self.pending = users
+        self.started = asyncio.Event()
+        self.start = None
+
+    def logged_in(self):
+        """Called once per user, whether its login succeeded or not"""
+        self.pending -= 1
+        if self.pending <= 0 and not self.started.is_set():
+            self.start = time.monotonic()
+            self.started.set()
+
+    async def wait(self, offset=0.0):
+        await self.started.wait()
+        await asyncio.sleep(max(0.0, self.start + offset - time.monotonic()))
+
+    def elapsed(self):
+        return time.monotonic() - self.start
+
+
+async def log_in(client, stats, login_slots, clock, email, password):
+    try:
+        async with login_slots:
+            return await _log_in(client, stats, email, password)
+    finally:
+        clock.logged_in()
+
+
+async def _log_in(client, stats, email, password):
+    page = await stats.timed('login_form', client.get('/login'), 200)
+    if page is None:
+        return False
+    try:
+        token = csrf_token(page)
+    except HttpError:
+        stats.errors['login_form']['no csrf_token'] += 1
+        return False
+    response = await stats.timed('login', client.post('/login', {
+        'csrf_token': token, 'email': email, 'password': password}), 302)
+    return response is not None
+
+
+async def faculty_user(base_url, stats, login_slots, clock, account, password, offset, attendance_day):
+    """Open the attendance sheet for a classroom and submit it once"""
+    client = HttpClient(base_url)
+    try:
+        if not await log_in(client, stats, login_slots, clock, account['email'], password):
+            return
+        await clock.wait(offset)
+
+        sheet = f"/faculty/attendance?classroom_id={account['classroom_id']}&date={attendance_day}"
+        page = await stats.timed('faculty_attendance_get', client.get(sheet), 200)
+        if page is None:
+            return
+        form = {'csrf_token': csrf_token(page), 'date': attendance_day}
+        rng = random.Random(account['user_id'])
+        for student_id in account['students']:
+            form[f'attendance_{student_id}'] = 'absent' if rng.random() < 0.1 else 'present'
+
+        response = await stats.timed('faculty_attendance_post', client.post('/faculty/attendance', form), 302)
+        if response is None:
+            return
+        # The outcome is only visible in the flash message on the redirect target
+        location = urlsplit(urljoin(base_url + '/', response.headers.get('location', '/faculty/attendance')))
+        landing = await stats.timed('faculty_attendance_redirect', client.get(location.path or '/'), 200)
+        if landing is not None and SUCCESS_MARKER not in landing.text:
+            stats.errors['faculty_attendance_post']['not saved'] += 1
+    except HttpError as exc:
+        stats.errors['faculty_attendance_get'][str(exc)] += 1
+    finally:
+        await client.close()
+
+
+async def student_user(base_url, stats, login_slots, clock, email, password, offset, duration, think_time):
+    """Keep refreshing the attendance page until the rush is over"""
+    client = HttpClient(base_url)
+    try:
+        if not await log_in(client, stats, login_slots, clock, email, password):
+            return
+        await clock.wait(offset)
+        while clock.elapsed() < duration:
+            await stats.timed('student_attendance', client.get('/student/attendance'), 200)
+            await asyncio.sleep(random.uniform(0.5, 1.5) * think_time)
+    finally:
+        await client.close()
+
+
+class LockSampler:
+    """
+    Sample pg_stat_activity in a background thread while the test runs.
+    Only PostgreSQL exposes lock waits; on other databases this records nothing.
+    """
+
+    QUERY = """
+        SELECT count(*) FILTER (WHERE wait_event_type = 'Lock'),
+               count(*) FILTER (WHERE state = 'active'),
+               coalesce(max(extract(epoch FROM now() - query_start))
+                        FILTER (WHERE wait_event_type = 'Lock'), 0)
+        FROM pg_stat_activity
+        WHERE datname = current_database() AND pid <> pg_backend_pid()
+    """
+
+    def __init__(self, engine, interval=0.25):
+        self.engine = engine
+        self.interval = interval
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @property
+    def supported(self):
+        return self.engine.dialect.name == 'postgresql'
+
+    def start(self):
+        if self.supported:
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def _run(self):
+        from sqlalchemy import text
+
+        with self.engine.connect() as conn:
+            while not self._stop.is_set():
+                waiting, active, longest = conn.execute(text(self.QUERY)).one()
+                conn.rollback()
+                self.samples.append((waiting, active, float(longest)))
+                self._stop.wait(self.interval)
+
+    def summary(self):
+        if not self.supported:
+            return {'supported': False, 'note': f'lock waits are only sampled on PostgreSQL '
+                                                f'(this is {self.engine.dialect.name})'}
+        waiting = [s[0] for s in self.samples]
+        return {
+            'supported': True,
+            'samples': len(self.samples),
+            'max_backends_waiting': max(waiting, default=0),
+            'mean_backends_waiting': round(sum(waiting) / len(waiting), 2) if waiting else 0.0,
+            'samples_with_waits': sum(1 for n in waiting if n),
+            'max_active_backends': max((s[1] for s in self.samples), default=0),
+            'longest_wait_s': round(max((s[2] for s in self.samples), default=0.0), 3),
+        }
+
+
+def load_accounts(engine, faculty_limit, student_limit):
+    """One (faculty, classroom) pair per faculty member, plus student logins"""
+    from sqlalchemy import select
+    from sqlalchemy.orm import Session
+    from models import ClassroomAssignment, User
+
+    with Session(engine) as session:
+        assignments = session.execute(
+            select(ClassroomAssignment.user_id, User.email, ClassroomAssignment.classroom_id)
+            .join(User, User.id == ClassroomAssignment.user_id)
+            .where(ClassroomAssignment.is_active == True, User.is_active == True)
+            .order_by(ClassroomAssignment.user_id, ClassroomAssignment.classroom_id)
+        ).all()
+
+        faculty = {}
+        for user_id, email, classroom_id in assignments:
+            faculty.setdefault(user_id, {'user_id': user_id, 'email': email, 'classroom_id': classroom_id})
+        faculty = list(faculty.values())[:faculty_limit]
+
+        for account in faculty:
+            account['students'] = session.scalars(
+                select(User.id).where(User.classroom_id == account['classroom_id'],
+                                      User.role == 'student', User.is_active == True)
+            ).all()
+
+        students = session.scalars(
+            select(User.email).where(User.role == 'student', User.is_active == True)
+            .order_by(User.id).limit(student_limit)
+        ).all()
+    return faculty, students
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Replay the morning attendance rush against a running server')
+    parser.add_argument('--base-url', default='http://127.0.0.1:5000')
+    parser.add_argument('--database-url', default=os.environ.get('DATABASE_URL'),
+                        help='database the server uses; accounts are read from it (default $DATABASE_URL)')
+    parser.add_argument('--password', default=None, help='password of the seeded accounts')
+    parser.add_argument('--faculty', type=int, default=50, help='faculty members submitting attendance')
+    parser.add_argument('--students', type=int, default=300, help='students refreshing their attendance')
+    parser.add_argument('--duration', type=float, default=30.0, help='seconds the student refresh loop runs')
+    parser.add_argument('--ramp', type=float, default=5.0,
+                        help='faculty submissions are spread over this many seconds')
+    parser.add_argument('--think-time', type=float, default=2.0, help='mean seconds between student refreshes')
+    parser.add_argument('--login-concurrency', type=int, default=20,
+                        help='logins in flight at once before the rush starts')
+    parser.add_argument('--date', default=None, help='attendance date (default: last weekday before today)')
+    parser.add_argument('--output', default=None, help='also write the report as JSON to this file')
+    parser.add_argument('--max-error-rate', type=float, default=0.01,
+                        help='exit 1 when the overall error rate is above this')
+    return parser.parse_args(argv)
+
+
+def default_attendance_day():
+    day = date.today() - timedelta(days=1)
+    while day.weekday() == 6:
+        day -= timedelta(days=1)
+    return day.isoformat()
+
+
+async def run(args, faculty, students, sampler):
+    stats = Stats()
+    login_slots = asyncio.Semaphore(args.login_concurrency)
+    # Everybody logs in first; the clock starts when the last login is done
+    clock = RushClock(len(faculty) + len(students))
+
+    tasks = []
+    for i, account in enumerate(faculty):
+        offset = args.ramp * i / len(faculty)
+        tasks.append(faculty_user(args.base_url, stats, login_slots, clock, account, args.password,
+                                  offset, args.date))
+    for email in students:
+        offset = random.uniform(0, min(args.ramp, args.duration))
+        tasks.append(student_user(args.base_url, stats, login_slots, clock, email, args.password,
+                                  offset, args.duration, args.think_time))
+
+    async def sample_locks():
+        await clock.wait()
+        sampler.start()
+
+    await asyncio.gather(sample_locks(), *tasks)
+    return stats, clock.elapsed()
+
+
+def print_report(report):
+    print(f"\n{'request':<30} {'count':>7} {'errors':>7} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}")
+    for label, row in report['endpoints'].items():
+        print(f"{label:<30} {row['requests']:>7} {row['errors']:>7} "
+              f"{row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['max_ms']:>9.1f}")
+        for kind, count in row['error_kinds'].items():
+            print(f"{'':<32}{kind}: {count}")
+
+    print(f"\nThroughput: {report['throughput_rps']} req/s over {report['elapsed_s']}s, "
+          f"error rate {report['error_rate'] * 100:.2f}%")
+    locks = report['lock_waits']
+    if locks['supported']:
+        print(f"Lock waits: max {locks['max_backends_waiting']} backends waiting "
+              f"(mean {locks['mean_backends_waiting']}), longest {locks['longest_wait_s']}s, "
+              f"{locks['samples_with_waits']}/{locks['samples']} samples had waiters")
+    else:
+        print(f"Lock waits: {locks['note']}")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if not args.database_url:
+        print('❌ Pass --database-url (or set DATABASE_URL) so accounts can be read from the database')
+        return 2
+    if args.password is None:
+        from seed_data import DEFAULT_PASSWORD
+        args.password = DEFAULT_PASSWORD
+    args.date = args.date or default_attendance_day()
+
+    from sqlalchemy import create_engine
+
+    engine = create_engine(args.database_url)
+    faculty, students = load_accounts(engine, args.faculty, args.students)
+    if not faculty:
+        print('❌ No faculty with classroom assignments found; generate data with seed_data.py first')
+        return 2
+    print(f'🚦 {len(faculty)} faculty submitting, {len(students)} students refreshing, '
+          f'attendance date {args.date}, target {args.base_url}')
+
+    sampler = LockSampler(engine)
+    try:
+        stats, elapsed = asyncio.run(run(args, faculty, students, sampler))
+    finally:
+        sampler.stop()
+        engine.dispose()
+
+    report = stats.summary(elapsed)
+    report['lock_waits'] = sampler.summary()
+    report['config'] = {k: v for k, v in vars(args).items() if k not in ('password', 'database_url')}
+    print_report(report)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    return 1 if report['error_rate'] > args.max_error_rate else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,24 @@
+"""
+Views, grouped into blueprints by audience.
+
+create_app() only imports and registers the groups a process needs (see
+PROFILES), so an API-only process never loads the admin views and their
+forms, and a Celery worker loads no views at all.
+"""
+
+import importlib
+
+PROFILES = {
+    # Everything: the main gunicorn app
+    'web': ('auth', 'public', 'student', 'faculty', 'admin', 'api', 'files', 'errors'),
+    # Only the public JSON endpoints (and the upload links they return), for a separate API process
+    'api': ('api', 'files'),
+    # Models and the database only, for Celery workers and scripts
+    'worker': (),
+}
+
+
+def register_blueprints(app, profile='web'):
+    for name in PROFILES[profile]:
+        module = importlib.import_module(f'blueprints.{name}')
+        app.register_blueprint(module.bp)
@@ -0,0 +1,1585 @@
+"""
+Admin console: users, classrooms, courses, content, imports and reports
+"""
+
+import os
+import logging
+import uuid
+from datetime import datetime
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, abort
+from flask_wtf.file import FileAllowed
+from flask_login import login_required, current_user
+from werkzeug.security import generate_password_hash
+from werkzeug.utils import secure_filename
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import aliased, contains_eager, selectinload
+from extensions import db
+from exports import FORMATS, export_response
+from streaming import stream_rows
+from bulk import assign_faculty, assign_students, enroll_students, move_classroom
+from caching import invalidate
+from query_monitor import query_budget
+from dashboard import get_snapshot
+from replica import reads_from_replica, stream_from_replica
+from reports import attendance_by_classroom, classroom_filter, classroom_filter_options, format_attendance_stat
+from rollover import run_rollover
+from utils import admin_required, save_uploaded_file
+import public_api
+from models import Announcement, Attendance, Banner, Classroom, ClassroomAssignment, Course, Department, Enquiry, Enrollment, Feedback, Lecturer, Notification, StudentReview, User
+from forms import AnnouncementForm, BannerForm, BulkEnrollmentForm, ClassroomAssignmentForm, ClassroomForm, CourseForm, DepartmentForm, EnquiryUpdateForm, ExcelImportForm, FeedbackResponseForm, LecturerForm, NotificationForm, StudentReviewForm, UserForm, user_choice_label
+
+bp = Blueprint('admin', __name__, url_prefix='/admin')
+logger = logging.getLogger(__name__)
+
+USER_SEARCH_PAGE_SIZE = 20
+
+
+# Admin Routes
+@bp.route('/dashboard')
+@login_required
+@admin_required
+@reads_from_replica
+def admin_dashboard():
+    # Counts, recent items and attendance totals, refreshed every minute by Celery
+    snapshot = get_snapshot()
+    return render_template('admin/dashboard.html', **snapshot)
+
+def _filter_users(query, args):
+    """Apply the admin user list filters to a User query or select()"""
+    role_filter = args.get('role', 'all')
+    department_filter = args.get('department', 'all')
+    year_filter = args.get('year', 'all')
+    semester_filter = args.get('semester', 'all')
+    section_filter = args.get('section', 'all')
+    classroom_filter = args.get('classroom', 'all')
+    search = args.get('search', '')
+    
+    # Check if any classroom-related filters are active
+    classroom_filters_active = any([
+        year_filter != 'all',
+        semester_filter != 'all', 
+        section_filter != 'all',
+        classroom_filter != 'all'
+    ])
+    
+    # Only join with classroom table if classroom filters are active
+    if classroom_filters_active:
+        query = query.join(Classroom, User.classroom_id == Classroom.id)
+    
+    # Role filter
+    if role_filter != 'all':
+        query = query.filter(User.role == role_filter)
+    
+    # Department filter
+    if department_filter != 'all':
+        query = query.filter(User.department == department_filter)
+    
+    # Year filter (for students in classrooms)
+    if year_filter != 'all':
+        query = query.filter(Classroom.year == int(year_filter))
+    
+    # Semester filter (for students in classrooms)
+    if semester_filter != 'all':
+        query = query.filter(Classroom.semester == int(semester_filter))
+    
+    # Section filter (for students in classrooms)
+    if section_filter != 'all':
+        query = query.filter(Classroom.section == section_filter)
+    
+    # Classroom filter
+    if classroom_filter != 'all':
+        query = query.filter(User.classroom_id == int(classroom_filter))
+    
+    # Search filter
+    if search:
+        query = query.filter(or_(
+            User.username.contains(search),
+            User.email.contains(search),
+            User.first_name.contains(search),
+            User.last_name.contains(search),
+            User.student_id.contains(search),
+            User.faculty_id.contains(search)
+        ))
+    
+    return query
+
+@bp.route('/users')
+@login_required
+@admin_required
+def admin_users():
+    page = request.args.get('page', 1, type=int)
+    role_filter = request.args.get('role', 'all')
+    department_filter = request.args.get('department', 'all')
+    year_filter = request.args.get('year', 'all')
+    semester_filter = request.args.get('semester', 'all')
+    section_filter = request.args.get('section', 'all')
+    classroom_filter = request.args.get('classroom', 'all')
+    search = request.args.get('search', '')
+    
+    query = _filter_users(User.query, request.args)
+    
+    users = query.order_by(User.created_at.desc()).paginate(
+        page=page, per_page=20, error_out=False
+    )
+    
+    # Get filter options for dropdowns
+    departments = db.session.query(User.department.distinct()).filter(User.department.isnot(None)).all()
+    departments = [dept[0] for dept in departments if dept[0]]
+    
+    years = db.session.query(Classroom.year.distinct()).all()
+    years = [year[0] for year in years if year[0]]
+    
+    semesters = db.session.query(Classroom.semester.distinct()).all()
+    semesters = [sem[0] for sem in semesters if sem[0]]
+    
+    sections = db.session.query(Classroom.section.distinct()).all()
+    sections = [sec[0] for sec in sections if sec[0]]
+    
+    classrooms = Classroom.query.filter_by(is_active=True).order_by(Classroom.name).all()
+    
+    return render_template('admin/users.html', 
+                         users=users, 
+                         role_filter=role_filter,
+                         department_filter=department_filter,
+                         year_filter=year_filter,
+                         semester_filter=semester_filter,
+                         section_filter=section_filter,
+                         classroom_filter=classroom_filter,
+                         search=search,
+                         departments=departments,
+                         years=years,
+                         semesters=semesters,
+                         sections=sections,
+                         classrooms=classrooms)
+
+@bp.route('/users/export')
+@login_required
+@admin_required
+def admin_export_users():
+    fmt = request.args.get('format', 'csv')
+    if fmt not in FORMATS:
+        abort(400)
+    
+    # Aliased so the classroom filters can still join Classroom themselves
+    user_classroom = aliased(Classroom)
+    statement = _filter_users(
+        select(User.id, User.username, User.email, User.first_name, User.last_name, User.role,
+               User.department, User.student_id, User.faculty_id, user_classroom.name,
+               User.phone, User.is_active, User.created_at)
+        .select_from(User)
+        .outerjoin(user_classroom, User.classroom_id == user_classroom.id),
+        request.args
+    ).order_by(User.created_at.desc(), User.id.desc())
+    
+    header = ['ID', 'Username', 'Email', 'First Name', 'Last Name', 'Role', 'Department',
+              'Student ID', 'Faculty ID', 'Classroom', 'Phone', 'Active', 'Created At']
+    return export_response(fmt, 'users', header, stream_rows(statement))
+
+@bp.route('/users/add', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def admin_add_user():
+    form = UserForm()
+    
+    # Populate department choices
+    departments = Department.query.filter_by(is_active=True).order_by(Department.name).all()
+    form.department.choices = [('', 'Select Department (Optional)')] + [(d.name, f"{d.name} ({d.code})") for d in departments]
+    
+    # Populate classroom choices
+    classrooms = Classroom.query.filter_by(is_active=True).order_by(Classroom.name).all()
+    form.classroom_id.choices = [(0, 'No Classroom Assignment')] + [(c.id, f"{c.name} ({c.department} - Year {c.year})") for c in classrooms]
+    
+    if form.validate_on_submit():
+        # Check for existing users
+        if User.query.filter_by(email=form.email.data).first():
+            flash('Email address already exists.', 'error')
+            return render_template('admin/users.html', form=form)
+        
+        if User.query.filter_by(username=form.username.data).first():
+            flash('Username already exists.', 'error')
+            return render_template('admin/users.html', form=form)
+        
+        # Create new user
+        user = User(
+            username=form.username.data,
+            email=form.email.data,
+            first_name=form.first_name.data,
+            last_name=form.last_name.data,
+            role=form.role.data,
+            phone=form.phone.data,
+            department=form.department.data,
+            student_id=form.student_id.data if form.role.data == 'student' else None,
+            faculty_id=form.faculty_id.data if form.role.data == 'faculty' else None,
+            is_active=form.is_active.data,
+            password_hash=generate_password_hash(form.password.data or 'defaultpass123')
+        )
+        
+        db.session.add(user)
+        db.session.commit()
+        
+        # Handle classroom assignment for students
+        if form.role.data == 'student' and form.classroom_id.data and form.classroom_id.data != 0:
+            try:
+                classroom = Classroom.query.get(form.classroom_id.data)
+                user.set_classroom(classroom)
+                db.session.commit()
+                
+                flash(f'User created successfully and assigned to classroom: {classroom.name}!', 'success')
+            except Exception as e:
+                flash(f'User created but failed to assign to classroom: {str(e)}', 'warning')
+        else:
+            flash('User created successfully!', 'success')
+        
+        return redirect(url_for('admin.admin_users'))
+    
+    return render_template('admin/users.html', form=form, action='add')
+
+@bp.route('/users/<int:user_id>/edit', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def admin_edit_user(user_id):
+    user = User.query.get_or_404(user_id)
+    form = UserForm(obj=user)
+    
+    # Populate department choices
+    departments = Department.query.filter_by(is_active=True).order_by(Department.name).all()
+    form.department.choices = [('', 'Select Department (Optional)')] + [(d.name, f"{d.name} ({d.code})") for d in departments]
+    
+    # Populate classroom choices
+    classrooms = Classroom.query.filter_by(is_active=True).order_by(Classroom.name).all()
+    form.classroom_id.choices = [(0, 'No Classroom Assignment')] + [(c.id, f"{c.name} ({c.department} - Year {c.year})") for c in classrooms]
+    
+    # Set current classroom assignment
+    if user.classroom_id:
+        form.classroom_id.data = user.classroom_id
+    else:
+        form.classroom_id.data = 0
+    
+    if form.validate_on_submit():
+        # Check for email conflicts
+        existing_user = User.query.filter(User.email == form.email.data, User.id != user_id).first()
+        if existing_user:
+            flash('Email address already exists.', 'error')
+            return render_template('admin/users.html', form=form, user=user, action='edit')
+        
+        # Update user
+        user.username = form.username.data
+        user.email = form.email.data
+        user.first_name = form.first_name.data
+        user.last_name = form.last_name.data
+        user.role = form.role.data
+        user.phone = form.phone.data
+        user.department = form.department.data
+        user.student_id = form.student_id.data if form.role.data == 'student' else None
+        user.faculty_id = form.faculty_id.data if form.role.data == 'faculty' else None
+        user.is_active = form.is_active.data
+        
+        # Handle classroom assignment for students
+        if form.role.data == 'student' and form.classroom_id.data and form.classroom_id.data != 0:
+            classroom = Classroom.query.get(form.classroom_id.data)
+            if classroom:
+                user.set_classroom(classroom)
+        elif form.role.data != 'student' or form.classroom_id.data == 0:
+            # Remove classroom assignment if not student or no classroom selected
+            user.classroom_id = None
+        
+        if form.password.data:
+            user.password_hash = generate_password_hash(form.password.data)
+        
+        db.session.commit()
+        flash('User updated successfully!', 'success')
+        return redirect(url_for('admin.admin_users'))
+    
+    return render_template('admin/users.html', form=form, user=user, action='edit')
+
+@bp.route('/users/<int:user_id>/delete', methods=['POST'])
+@login_required
+@admin_required
+def admin_delete_user(user_id):
+    user = User.query.get_or_404(user_id)
+    if user.id == current_user.id:
+        flash('You cannot delete your own account.', 'error')
+        return redirect(url_for('admin.admin_users'))
+    
+    # Soft delete by deactivating
+    user.is_active = False
+    db.session.commit()
+    
+    flash('User deactivated successfully!', 'success')
+    return redirect(url_for('admin.admin_users'))
+
+@bp.route('/courses')
+@login_required
+@admin_required
+def admin_courses():
+    courses = Course.query.filter_by(is_active=True).order_by(Course.created_at.desc()).all()
+    return render_template('admin/courses.html', courses=courses)
+
+@bp.route('/courses/add', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def admin_add_course():
+    form = CourseForm()
+    
+    # Populate faculty choices
+    faculty_users = User.query.filter_by(role='faculty', is_active=True).all()
+    form.faculty_id.choices = [(0, 'Select Faculty')] + [(f.id, f.get_full_name()) for f in faculty_users]
+    
+    if form.validate_on_submit():
+        # Check for existing course code
+        if Course.query.filter_by(code=form.code.data).first():
+            flash('Course code already exists.', 'error')
+            return render_template('admin/courses.html', form=form, action='add')
+        
+        course = Course(
+            name=form.name.data,
+            code=form.code.data,
+            description=form.description.data,
+            credits=form.credits.data,
+            department=form.department.data,
+            semester=form.semester.data,
+            faculty_id=form.faculty_id.data if form.faculty_id.data > 0 else None
+        )
+        
+        db.session.add(course)
+        db.session.commit()
+        
+        flash('Course created successfully!', 'success')
+        return redirect(url_for('admin.admin_courses'))
+    
+    return render_template('admin/courses.html', form=form, action='add')
+
+@bp.route('/announcements')
+@login_required
+@admin_required
+def admin_announcements():
+    announcements = Announcement.query.filter_by(is_active=True).order_by(
+        Announcement.is_pinned.desc(), Announcement.created_at.desc()
+    ).all()
+    return render_template('admin/announcements.html', announcements=announcements)
+
+@bp.route('/announcements/add', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def admin_add_announcement():
+    form = AnnouncementForm()
+    
+    if request.method == 'POST':
+        if form.validate_on_submit():
+            announcement = Announcement(
+                title=form.title.data,
+                content=form.content.data,
+                category=form.category.data,
+                target_audience=form.target_audience.data,
+                event_date=form.event_date.data,
+                link=form.link.data,
+                expires_at=form.expires_at.data,
+                is_pinned=form.is_pinned.data,
+                created_by=current_user.id
+            )
+            
+            db.session.add(announcement)
+            db.session.commit()
+            
+            flash('Announcement created successfully!', 'success')
+            return redirect(url_for('admin.admin_announcements'))
+        else:
+            logger.debug('Announcement form invalid: %s', form.errors)
+            flash('Please correct the errors below.', 'error')
+    
+    return render_template('admin/announcements.html', form=form, action='add')
+
+@bp.route('/announcements/<int:announcement_id>/edit', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def admin_edit_announcement(announcement_id):
+    announcement = Announcement.query.get_or_404(announcement_id)
+    form = AnnouncementForm(obj=announcement)
+    
+    if request.method == 'POST':
+        if form.validate_on_submit():
+            announcement.title = form.title.data
+            announcement.content = form.content.data
+            announcement.category = form.category.data
+            announcement.target_audience = form.target_audience.data
+            announcement.event_date = form.event_date.data
+            announcement.link = form.link.data
+            announcement.expires_at = form.expires_at.data
+            announcement.is_pinned = form.is_pinned.data
+            
+            db.session.commit()
+            flash('Announcement updated successfully!', 'success')
+            return redirect(url_for('admin.admin_announcements'))
+        else:
+            flash('Please correct the errors below.', 'error')
+    
+    return render_template('admin/announcements.html', form=form, action='edit', announcement=announcement)
+
+@bp.route('/announcements/<int:announcement_id>/delete', methods=['POST'])
+@login_required
+@admin_required
+def admin_delete_announcement(announcement_id):
+    announcement = Announcement.query.get_or_404(announcement_id)
+    
+    try:
+        db.session.delete(announcement)
+        db.session.commit()
+        flash('Announcement deleted successfully!', 'success')
+    except Exception:
+        db.session.rollback()
+        flash('Error deleting announcement. Please try again.', 'error')
+        logger.exception('Error deleting announcement')
+    
+    return redirect(url_for('admin.admin_announcements'))
+
+@bp.route('/banners')
+@login_required
+@admin_required
+def admin_banners():
+    banners = Banner.query.order_by(Banner.display_order, Banner.created_at.desc()).all()
+    return render_template('admin/banners.html', banners=banners)
+
+@bp.route('/banners/add', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def admin_add_banner():
+    form = BannerForm()
+    
+    if form.validate_on_submit():
+        # Save uploaded image
+        filename = save_uploaded_file(form.image.data, 'banners')
+        if filename:
+            banner = Banner(
+                title=form.title.data,
+                image_path=filename,
+                link_url=form.link_url.data,
+                description=form.description.data,
+                display_order=form.display_order.data or 0,
+                created_by=current_user.id
+            )
+            
+            db.session.add(banner)
+            db.session.commit()
+            
+            flash('Banner uploaded successfully!', 'success')
+            return redirect(url_for('admin.admin_banners'))
+        else:
+            flash('Error uploading image.', 'error')
+    
+    return render_template('admin/banners.html', form=form, action='add')
+
+@bp.route('/banners/<int:banner_id>/edit', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def admin_edit_banner(banner_id):
+    banner = Banner.query.get_or_404(banner_id)
+    form = BannerForm(obj=banner)
+    
+    # Remove image validation for edit form since image is optional when editing
+    form.image.validators = [FileAllowed(['jpg', 'png', 'jpeg'], 'Images only!')]
+    
+    if request.method == 'POST':
+        if form.validate_on_submit():
+            banner.title = form.title.data
+            banner.link_url = form.link_url.data
+            banner.description = form.description.data
+            banner.display_order = form.display_order.data
+            
+            # Handle image upload if new image is provided; the old file is
+            # deleted on commit if no other record uses it (see uploads.py)
+            if form.image.data:
+                filename = save_uploaded_file(form.image.data, 'banners')
+                if filename:
+                    banner.image_path = filename
+            
+            db.session.commit()
+            flash('Banner updated successfully!', 'success')
+            return redirect(url_for('admin.admin_banners'))
+        else:
+            flash('Please correct the errors below.', 'error')
+    
+    return render_template('admin/banners.html', form=form, action='edit', banner=banner)
+
+@bp.route('/banners/<int:banner_id>/delete', methods=['POST'])
+@login_required
+@admin_required
+def admin_delete_banner(banner_id):
+    banner = Banner.query.get_or_404(banner_id)
+    
+    try:
+        # The image file is deleted on commit unless another record uses it
+        db.session.delete(banner)
+        db.session.commit()
+        flash('Banner deleted successfully!', 'success')
+    except Exception:
+        db.session.rollback()
+        flash('Error deleting banner. Please try again.', 'error')
+        logger.exception('Error deleting banner')
+    
+    return redirect(url_for('admin.admin_banners'))
+
+@bp.route('/banners/<int:banner_id>/toggle-status', methods=['POST'])
+@login_required
+@admin_required
+def admin_toggle_banner_status(banner_id):
+    banner = Banner.query.get_or_404(banner_id)
+    
+    try:
+        banner.is_active = not banner.is_active
+        db.session.commit()
+        
+        status = 'activated' if banner.is_active else 'deactivated'
+        flash(f'Banner {status} successfully!', 'success')
+    except Exception:
+        db.session.rollback()
+        flash('Error updating banner status. Please try again.', 'error')
+        logger.exception('Error toggling banner status')
+    
+    return redirect(url_for('admin.admin_banners'))
+
+@bp.route('/feedback')
+@login_required
+@admin_required
+def admin_feedback():
+    feedback_list = Feedback.query.order_by(Feedback.created_at.desc()).all()
+    return render_template('admin/feedback.html', feedback_list=feedback_list)
+
+@bp.route('/feedback/<int:feedback_id>/respond', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def admin_respond_feedback(feedback_id):
+    feedback = Feedback.query.get_or_404(feedback_id)
+    form = FeedbackResponseForm()
+    
+    if form.validate_on_submit():
+        feedback.response = form.response.data
+        feedback.status = form.status.data
+        feedback.responded_by = current_user.id
+        feedback.responded_at = datetime.utcnow()
+        
+        db.session.commit()
+        
+        flash('Feedback response submitted successfully!', 'success')
+        return redirect(url_for('admin.admin_feedback'))
+    
+    return render_template('admin/feedback.html', feedback=feedback, form=form, action='respond')
+
+@bp.route('/enquiries')
+@login_required
+@admin_required
+def admin_enquiries():
+    enquiries = Enquiry.query.order_by(Enquiry.created_at.desc()).all()
+    return render_template('admin/enquiries.html', enquiries=enquiries)
+
+@bp.route('/enquiries/<int:enquiry_id>/update', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def admin_update_enquiry(enquiry_id):
+    enquiry = Enquiry.query.get_or_404(enquiry_id)
+    form = EnquiryUpdateForm(obj=enquiry)
+    
+    # Populate assignee choices
+    staff_users = User.query.filter(User.role.in_(['admin', 'faculty']), User.is_active == True).all()
+    form.assigned_to.choices = [(0, 'Unassigned')] + [(u.id, u.get_full_name()) for u in staff_users]
+    
+    if form.validate_on_submit():
+        enquiry.status = form.status.data
+        enquiry.assigned_to = form.assigned_to.data if form.assigned_to.data > 0 else None
+        enquiry.notes = form.notes.data
+        enquiry.updated_at = datetime.utcnow()
+        
+        db.session.commit()
+        
+        flash('Enquiry updated successfully!', 'success')
+        return redirect(url_for('admin.admin_enquiries'))
+    
+    return render_template('admin/enquiries.html', enquiry=enquiry, form=form, action='update')
+
+@bp.route('/notifications')
+@login_required
+@admin_required
+def admin_notifications():
+    notifications = Notification.query.filter_by(is_active=True).order_by(
+        Notification.is_important.desc(), Notification.created_at.desc()
+    ).all()
+    return render_template('admin/notifications.html', notifications=notifications)
+
+@bp.route('/notifications/add', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def admin_add_notification():
+    form = NotificationForm()
+    
+    if request.method == 'POST':
+        if form.validate_on_submit():
+            notification = Notification(
+                title=form.title.data,
+                content=form.content.data,
+                notification_type=form.notification_type.data,
+                document_url=form.document_url.data,
+                reference_number=form.reference_number.data,
+                issue_date=form.issue_date.data,
+                is_important=form.is_important.data,
+                created_by=current_user.id
+            )
+            
+            db.session.add(notification)
+            db.session.commit()
+            
+            flash('Notification created successfully!', 'success')
+            return redirect(url_for('admin.admin_notifications'))
+        else:
+            logger.debug('Notification form invalid: %s', form.errors)
+            flash('Please correct the errors below.', 'error')
+    
+    return render_template('admin/notifications.html', form=form, action='add')
+
+@bp.route('/notifications/<int:notification_id>/edit', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def admin_edit_notification(notification_id):
+    notification = Notification.query.get_or_404(notification_id)
+    form = NotificationForm(obj=notification)
+    
+    if request.method == 'POST':
+        if form.validate_on_submit():
+            notification.title = form.title.data
+            notification.content = form.content.data
+            notification.notification_type = form.notification_type.data
+            notification.document_url = form.document_url.data
+            notification.reference_number = form.reference_number.data
+            notification.issue_date = form.issue_date.data
+            notification.is_important = form.is_important.data
+            
+            db.session.commit()
+            flash('Notification updated successfully!', 'success')
+            return redirect(url_for('admin.admin_notifications'))
+        else:
+            flash('Please correct the errors below.', 'error')
+    
+    return render_template('admin/notifications.html', form=form, action='edit', notification=notification)
+
+@bp.route('/notifications/<int:notification_id>/delete', methods=['POST'])
+@login_required
+@admin_required
+def admin_delete_notification(notification_id):
+    notification = Notification.query.get_or_404(notification_id)
+    
+    try:
+        db.session.delete(notification)
+        db.session.commit()
+        flash('Notification deleted successfully!', 'success')
+    except Exception:
+        db.session.rollback()
+        flash('Error deleting notification. Please try again.', 'error')
+        logger.exception('Error deleting notification')
+    
+    return redirect(url_for('admin.admin_notifications'))
+
+# Error handlers
+# Admin - Classroom Management
+@bp.route('/classrooms')
+@login_required
+@admin_required
+def admin_classrooms():
+    classrooms = Classroom.query.filter_by(is_active=True).order_by(Classroom.department, Classroom.year, Classroom.semester, Classroom.section).all()
+    
+    # Get statistics from the counters maintained by counters.py
+    total_classrooms = len(classrooms)
+    students_assigned = sum(classroom.student_count for classroom in classrooms)
+    faculty_assigned = sum(classroom.faculty_count for classroom in classrooms)
+    
+    return render_template('admin/classrooms.html',
+                         classrooms=classrooms,
+                         total_classrooms=total_classrooms,
+                         students_assigned=students_assigned,
+                         faculty_assigned=faculty_assigned)
+
+@bp.route('/classrooms/rollover', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def admin_classroom_rollover():
+    """Preview the semester rollover (a dry run) and start it as a Celery task"""
+    from tasks import semester_rollover
+    
+    department = request.values.get('department') or None
+    if request.method == 'POST':
+        try:
+            task = semester_rollover.delay(department=department, dry_run=False, performed_by=current_user.id)
+            logger.info('Semester rollover queued as task %s by user %s', task.id, current_user.id)
+            flash('Semester rollover started. Students will appear in their new classrooms in a few seconds.', 'info')
+        except Exception:
+            logger.exception('Error starting semester rollover')
+            flash('Error starting the semester rollover. Please try again.', 'error')
+        return redirect(url_for('admin.admin_classrooms'))
+    
+    departments = [name for (name,) in db.session.query(Classroom.department)
+                   .filter(Classroom.is_active == True).distinct().order_by(Classroom.department)]
+    return render_template('admin/classroom_rollover.html',
+                         plan=run_rollover(department=department, dry_run=True),
+                         departments=departments,
+                         department=department)
+
+@bp.route('/classrooms/add', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def admin_add_classroom():
+    form = ClassroomForm()
+    
+    # Populate department choices from database
+    departments = Department.query.filter_by(is_active=True).order_by(Department.name).all()
+    form.department.choices = [(d.name, f"{d.name} ({d.code})") for d in departments]
+    
+    if form.validate_on_submit():
+        # Double-check for duplicate classroom (additional safety check)
+        existing_classroom = Classroom.query.filter_by(
+            department=form.department.data,
+            year=form.year.data,
+            semester=form.semester.data,
+            section=form.section.data,
+            is_active=True
+        ).first()
+        
+        if existing_classroom:
+            flash(f'Classroom "{existing_classroom.get_classroom_name()}" already exists. Please choose different parameters.', 'error')
+            return render_template('admin/add_classroom.html', form=form)
+        
+        # Always auto-generate name using template: DEPT_CODE SECTION YEAR-SEMESTER
+        # Get department code from the selected department name
+        department = Department.query.filter_by(name=form.department.data).first()
+        dept_code = department.code if department else form.department.data[:3].upper()
+        form.name.data = f"{dept_code} {form.section.data} {form.year.data}-{form.semester.data}"
+        
+        classroom = Classroom(
+            name=form.name.data,
+            department=form.department.data,
+            year=form.year.data,
+            semester=form.semester.data,
+            section=form.section.data,
+            academic_year=form.academic_year.data or f"{datetime.now().year}-{datetime.now().year + 1}",
+            created_at=datetime.utcnow(),
+            is_active=True
+        )
+        
+        try:
+            db.session.add(classroom)
+            db.session.commit()
+            flash(f'Classroom "{classroom.name}" created successfully', 'success')
+            return redirect(url_for('admin.admin_classrooms'))
+        except Exception:
+            db.session.rollback()
+            flash('Error creating classroom. This classroom may already exist.', 'error')
+            logger.exception('Error creating classroom')
+    
+    return render_template('admin/add_classroom.html', form=form)
+
+@bp.route('/classrooms/check-duplicate', methods=['POST'])
+@login_required
+@admin_required
+def check_classroom_duplicate():
+    data = request.get_json()
+    
+    if not data:
+        return jsonify({'error': 'No data provided'}), 400
+    
+    department = data.get('department')
+    year = data.get('year')
+    semester = data.get('semester')
+    section = data.get('section')
+    
+    if not all([department, year, semester, section]):
+        return jsonify({'error': 'Missing required fields'}), 400
+    
+    # Check if classroom already exists
+    existing_classroom = Classroom.query.filter_by(
+        department=department,
+        year=year,
+        semester=semester,
+        section=section,
+        is_active=True
+    ).first()
+    
+    return jsonify({
+        'exists': existing_classroom is not None,
+        'classroom_name': existing_classroom.get_classroom_name() if existing_classroom else None
+    })
+
+@bp.route('/classrooms/<int:classroom_id>/assign', methods=['GET', 'POST'])
+@query_budget(10)
+@login_required
+@admin_required
+def admin_assign_classroom(classroom_id):
+    classroom = Classroom.query.get_or_404(classroom_id)
+    form = ClassroomAssignmentForm()
+    
+    # Populate classroom choices (just this one)
+    form.classroom_id.choices = [(classroom.id, classroom.get_classroom_name())]
+    form.classroom_id.data = classroom.id
+    
+    # Get selected user type from URL parameters or form data (default to students)
+    user_type = request.args.get('user_type') or request.form.get('user_type', 'student')
+    form.user_type.data = user_type
+    
+    # Users that can be picked for the selected type; the picker searches them
+    # with admin_search_users and the form checks submitted IDs against them
+    if user_type == 'student':
+        # Students can only be assigned to one classroom
+        form.user_ids.query = User.query.filter_by(role='student', is_active=True, classroom_id=None)
+        search_url = url_for('admin.admin_search_users', role='student', unassigned=1)
+    else:
+        # Faculty can be assigned to multiple classrooms
+        form.user_ids.query = User.query.filter_by(role='faculty', is_active=True)
+        search_url = url_for('admin.admin_search_users', role='faculty')
+    available_count = form.user_ids.query.order_by(None).count()
+    
+    if request.method == 'POST' and form.validate_on_submit():
+        try:
+            # One statement for the whole selection (see bulk.py)
+            if user_type == 'student':
+                assigned_count = assign_students(classroom, form.user_ids.data)
+            else:
+                assigned_count = assign_faculty(classroom, form.user_ids.data, assigned_by=current_user.id)
+            db.session.commit()
+            flash(f'Successfully assigned {assigned_count} {user_type}s to {classroom.name}', 'success')
+            return redirect(url_for('admin.admin_classrooms'))
+        except Exception:
+            db.session.rollback()
+            flash('Error assigning users to classroom. Please try again.', 'error')
+    
+    # Get current assignments
+    current_students = User.query.filter_by(classroom_id=classroom.id, role='student').all()
+    
+    # Get current faculty assignments using the new relationship table
+    current_faculty_assignments = ClassroomAssignment.query.filter_by(
+        classroom_id=classroom.id, 
+        is_active=True
+    ).join(User, ClassroomAssignment.user_id == User.id).filter(
+        User.role == 'faculty'
+    ).options(contains_eager(ClassroomAssignment.user)).all()
+    current_faculty = [assignment.user for assignment in current_faculty_assignments]
+    
+    # Classrooms the whole section can be moved to
+    other_classrooms = Classroom.query.filter(
+        Classroom.is_active == True, Classroom.id != classroom.id
+    ).order_by(Classroom.department, Classroom.year, Classroom.semester, Classroom.section).all()
+    
+    return render_template('admin/assign_classroom.html', 
+                         form=form, 
+                         search_url=search_url,
+                         available_count=available_count,
+                         other_classrooms=other_classrooms,
+                         classroom=classroom,
+                         current_students=current_students,
+                         current_faculty=current_faculty)
+
+@bp.route('/classrooms/<int:classroom_id>/move', methods=['POST'])
+@login_required
+@admin_required
+def admin_move_classroom(classroom_id):
+    """Move a whole section into another classroom, e.g. to promote it to the next semester"""
+    classroom = Classroom.query.get_or_404(classroom_id)
+    target = Classroom.query.filter_by(id=request.form.get('target_classroom_id', type=int), is_active=True).first()
+    if target is None or target.id == classroom.id:
+        flash('Please choose another active classroom to move to.', 'error')
+        return redirect(url_for('admin.admin_assign_classroom', classroom_id=classroom_id))
+    
+    try:
+        students, faculty = move_classroom(classroom, target, include_faculty='include_faculty' in request.form,
+                                           assigned_by=current_user.id)
+        db.session.commit()
+        flash(f'Moved {students} students and {faculty} faculty from {classroom.name} to {target.name}', 'success')
+    except Exception:
+        db.session.rollback()
+        logger.exception('Error moving classroom %s to %s', classroom_id, target.id)
+        flash('Error moving the classroom. Please try again.', 'error')
+        return redirect(url_for('admin.admin_assign_classroom', classroom_id=classroom_id))
+    return redirect(url_for('admin.admin_assign_classroom', classroom_id=target.id))
+
+@bp.route('/classrooms/<int:classroom_id>/remove/<int:user_id>')
+@login_required
+@admin_required
+def admin_remove_from_classroom(classroom_id, user_id):
+    user = User.query.get_or_404(user_id)
+    classroom = Classroom.query.get_or_404(classroom_id)
+    
+    if user.role == 'student':
+        # Students: remove from classroom_id field
+        user.set_classroom(None)
+    else:
+        # Faculty: deactivate the classroom assignment
+        assignment = ClassroomAssignment.query.filter_by(
+            user_id=user_id,
+            classroom_id=classroom_id,
+            is_active=True
+        ).first()
+        
+        if assignment:
+            assignment.is_active = False
+        else:
+            flash('Assignment not found.', 'error')
+            return redirect(url_for('admin.admin_assign_classroom', classroom_id=classroom_id))
+    
+    try:
+        db.session.commit()
+        flash(f'{user.get_full_name()} removed from {classroom.name}', 'success')
+    except Exception:
+        db.session.rollback()
+        flash('Error removing user from classroom. Please try again.', 'error')
+    
+    return redirect(url_for('admin.admin_assign_classroom', classroom_id=classroom_id))
+
+@bp.route('/users/search')
+@login_required
+@admin_required
+def admin_search_users():
+    """
+    Typeahead results for the user pickers (static/js/user-picker.js): active
+    users of one role whose name, ID or email starts with the words in ``q``,
+    optionally limited to a department, a classroom or students without one.
+    """
+    role = request.args.get('role', 'student')
+    if role not in ('student', 'faculty'):
+        abort(400)
+    page = max(request.args.get('page', 1, type=int), 1)
+    
+    query = User.query.filter(User.role == role, User.is_active == True)
+    if request.args.get('department'):
+        query = query.filter(User.department == request.args['department'])
+    if request.args.get('classroom_id', type=int):
+        query = query.filter(User.classroom_id == request.args.get('classroom_id', type=int))
+    if request.args.get('unassigned'):
+        query = query.filter(User.classroom_id.is_(None))
+    
+    # Every word has to be the start of one of the columns, so 'ann sm' finds Ann Smith
+    for word in request.args.get('q', '').split()[:5]:
+        prefix = word.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        query = query.filter(or_(*[
+            column.ilike(prefix, escape='\\')
+            for column in (User.first_name, User.last_name, User.student_id, User.faculty_id, User.email)
+        ]))
+    
+    # One extra row tells us whether there is another page, without a COUNT
+    rows = query.with_entities(User.id, User.first_name, User.last_name, User.student_id, User.faculty_id)\
+        .order_by(User.first_name, User.last_name, User.id)\
+        .offset((page - 1) * USER_SEARCH_PAGE_SIZE).limit(USER_SEARCH_PAGE_SIZE + 1).all()
+    
+    return jsonify({
+        'results': [{'id': row.id, 'text': user_choice_label(row)} for row in rows[:USER_SEARCH_PAGE_SIZE]],
+        'more': len(rows) > USER_SEARCH_PAGE_SIZE,
+    })
+
+# Admin - Course Enrollments (Keep existing for backward compatibility)
+@bp.route('/enrollments')
+@query_budget(6)
+@login_required
+@admin_required
+def admin_enrollments():
+    page = request.args.get('page', 1, type=int)
+    
+    # One page of enrollments with student, course and course faculty loaded alongside
+    enrollments = db.session.query(Enrollment)\
+        .join(User, Enrollment.student_id == User.id)\
+        .join(Course, Enrollment.course_id == Course.id)\
+        .options(contains_eager(Enrollment.student),
+                 contains_eager(Enrollment.course).joinedload(Course.faculty))\
+        .filter(Enrollment.is_active == True)\
+        .order_by(Course.name, User.first_name, User.last_name, Enrollment.id)\
+        .paginate(page=page, per_page=50, error_out=False)
+    
+    # Get counts
+    total_enrollments = enrollments.total
+    courses_with_students = Course.query.filter(Course.active_enrollment_count > 0).count()
+    students_enrolled = db.session.query(User.id).join(Enrollment).filter(Enrollment.is_active == True, User.role == 'student').distinct().count()
+    
+    return render_template('admin/enrollments.html',
+                         enrollments=enrollments,
+                         total_enrollments=total_enrollments,
+                         courses_with_students=courses_with_students,
+                         students_enrolled=students_enrolled)
+
+@bp.route('/enrollments/add', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def admin_add_enrollment():
+    form = BulkEnrollmentForm()
+    
+    # Populate course choices
+    courses = Course.query.filter_by(is_active=True).order_by(Course.name).all()
+    form.course_id.choices = [(c.id, f"{c.code} - {c.name}") for c in courses]
+    
+    # Students are picked with the typeahead (admin_search_users); submitted IDs
+    # are checked against this query
+    form.student_ids.query = User.query.filter_by(role='student', is_active=True)
+    
+    # Whole classrooms or departments can be enrolled in one go
+    form.classroom_id.choices = [(0, 'No Classroom')] + [
+        (c.id, f"{c.name} ({c.department} - Year {c.year})") for c in
+        Classroom.query.filter_by(is_active=True).order_by(Classroom.department, Classroom.year,
+                                                           Classroom.semester, Classroom.section)
+    ]
+    form.department.choices = [('', 'No Department')] + [
+        (d.name, f"{d.name} ({d.code})") for d in Department.query.filter_by(is_active=True).order_by(Department.name)
+    ]
+    
+    if form.validate_on_submit():
+        course = Course.query.get(form.course_id.data)
+        
+        # Every picked student, plus everyone in the chosen classroom or department
+        chosen = [User.id.in_(form.student_ids.data)]
+        if form.classroom_id.data:
+            chosen.append(User.classroom_id == form.classroom_id.data)
+        if form.department.data:
+            chosen.append(User.department == form.department.data)
+        students = select(User.id).where(User.role == 'student', User.is_active == True, or_(*chosen))
+        
+        try:
+            enrolled_count, already_count, already_enrolled = enroll_students(course.id, students)
+            db.session.commit()
+            flash(f'Successfully enrolled {enrolled_count} students in {course.name}', 'success')
+            if already_count:
+                others = f' and {already_count - len(already_enrolled)} more' if already_count > len(already_enrolled) else ''
+                flash(f'Note: {", ".join(already_enrolled)}{others} were already enrolled', 'info')
+            return redirect(url_for('admin.admin_enrollments'))
+        except Exception:
+            db.session.rollback()
+            logger.exception('Error enrolling students')
+            flash('Error enrolling students. Please try again.', 'error')
+    
+    return render_template('admin/add_enrollment.html', form=form)
+
+@bp.route('/enrollments/remove/<int:enrollment_id>')
+@login_required
+@admin_required
+def admin_remove_enrollment(enrollment_id):
+    enrollment = Enrollment.query.get_or_404(enrollment_id)
+    enrollment.is_active = False
+    
+    try:
+        db.session.commit()
+        flash('Student removed from course successfully', 'success')
+    except Exception:
+        db.session.rollback()
+        flash('Error removing enrollment. Please try again.', 'error')
+    
+    return redirect(url_for('admin.admin_enrollments'))
+
+def _attendance_filters(args):
+    """Attendance overview filters; the date range defaults to the last 30 days"""
+    from datetime import timedelta
+    
+    return {
+        'department': args.get('department', ''),
+        'year': args.get('year', type=int),
+        'semester': args.get('semester', type=int),
+        'section': args.get('section', ''),
+        'date_from': args.get('date_from') or (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d'),
+        'date_to': args.get('date_to') or datetime.now().strftime('%Y-%m-%d'),
+    }
+
+def _filter_attendance(query, filters):
+    """Apply _attendance_filters() to a query that already joins the student as User"""
+    return query.filter(Attendance.date >= filters['date_from'],
+                        Attendance.date <= filters['date_to'],
+                        *classroom_filter(filters['department'], filters['year'],
+                                          filters['semester'], filters['section']))
+
+@bp.route('/attendance-overview')
+@login_required
+@admin_required
+@reads_from_replica
+def admin_attendance_overview():
+    filters = _attendance_filters(request.args)
+    
+    # Totals per classroom, labelled from Classroom
+    rows = attendance_by_classroom(
+        Attendance.date >= filters['date_from'],
+        Attendance.date <= filters['date_to'],
+        *classroom_filter(filters['department'], filters['year'], filters['semester'], filters['section'])
+    )
+    attendance_stats = [format_attendance_stat(row) for row in rows]
+    
+    # Get filter options
+    options = classroom_filter_options()
+    
+    # Calculate overall statistics
+    total_attendance_records = sum(stat['total_records'] for stat in attendance_stats)
+    total_present = sum(stat['present_count'] for stat in attendance_stats)
+    total_absent = sum(stat['absent_count'] for stat in attendance_stats)
+    total_late = sum(stat['late_count'] for stat in attendance_stats)
+    
+    overall_stats = {
+        'total_records': total_attendance_records,
+        'present_count': total_present,
+        'absent_count': total_absent,
+        'late_count': total_late,
+        'present_percentage': round((total_present / total_attendance_records * 100), 1) if total_attendance_records > 0 else 0,
+        'absent_percentage': round((total_absent / total_attendance_records * 100), 1) if total_attendance_records > 0 else 0,
+        'late_percentage': round((total_late / total_attendance_records * 100), 1) if total_attendance_records > 0 else 0,
+        'total_classes': len(set(f"{stat['department']}-{stat['year']}-{stat['semester']}-{stat['section']}" for stat in attendance_stats)),
+        'total_classrooms': len(attendance_stats)
+    }
+    
+    return render_template('admin/attendance_overview.html',
+                         attendance_stats=attendance_stats,
+                         overall_stats=overall_stats,
+                         departments=options['departments'],
+                         years=options['years'],
+                         semesters=options['semesters'],
+                         sections=options['sections'],
+                         filters=filters)
+
+@bp.route('/attendance-overview/export')
+@login_required
+@admin_required
+@reads_from_replica
+def admin_export_attendance():
+    """Every attendance record matching the overview filters, one row per student per day"""
+    fmt = request.args.get('format', 'csv')
+    if fmt not in FORMATS:
+        abort(400)
+    
+    filters = _attendance_filters(request.args)
+    marker = aliased(User)
+    statement = _filter_attendance(
+        select(Attendance.date, User.student_id, User.first_name, User.last_name, User.department,
+               User.year, User.semester, User.section, Classroom.name, Attendance.status,
+               func.coalesce(marker.first_name + ' ' + marker.last_name, ''), Attendance.marked_at,
+               Attendance.notes)
+        .select_from(Attendance)
+        .join(User, Attendance.student_id == User.id)
+        .outerjoin(Classroom, User.classroom_id == Classroom.id)
+        .outerjoin(marker, Attendance.marked_by == marker.id),
+        filters
+    ).order_by(Attendance.date, Attendance.id)
+    
+    header = ['Date', 'Student ID', 'First Name', 'Last Name', 'Department', 'Year', 'Semester',
+              'Section', 'Classroom', 'Status', 'Marked By', 'Marked At', 'Notes']
+    return export_response(fmt, f"attendance_{filters['date_from']}_to_{filters['date_to']}", header,
+                           stream_from_replica(stream_rows(statement)))
+
+# Department Management Routes
+@bp.route('/departments')
+@query_budget(4)
+@login_required
+@admin_required
+def admin_departments():
+    # Lecturers loaded in one query for the lecturer counts
+    departments = Department.query.options(selectinload(Department.lecturers))\
+        .order_by(Department.created_at.desc()).all()
+    return render_template('admin/departments.html', departments=departments)
+
+@bp.route('/departments/add', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def admin_add_department():
+    form = DepartmentForm()
+    
+    if form.validate_on_submit():
+        # Handle image upload
+        image_filename = None
+        if form.image.data:
+            image_filename = save_uploaded_file(form.image.data, 'departments')
+            # Ensure proper path format for web access
+            if image_filename and not image_filename.startswith('/static/'):
+                image_filename = f'/static/uploads/{image_filename}'
+        
+        department = Department(
+            name=form.name.data,
+            code=form.code.data.upper(),
+            program=form.program.data,
+            description=form.description.data,
+            image=image_filename
+        )
+        
+        try:
+            db.session.add(department)
+            db.session.commit()
+            invalidate(public_api.DEPARTMENTS_CACHE_KEY)
+            flash(f'Department "{department.name}" has been created successfully!', 'success')
+            return redirect(url_for('admin.admin_departments'))
+        except Exception as e:
+            db.session.rollback()
+            if 'UNIQUE constraint failed' in str(e):
+                flash('Department name or code already exists. Please use a different name/code.', 'error')
+            else:
+                flash('An error occurred while creating the department.', 'error')
+    
+    return render_template('admin/add_department.html', form=form, action='add')
+
+@bp.route('/departments/<int:department_id>/edit', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def admin_edit_department(department_id):
+    department = Department.query.get_or_404(department_id)
+    form = DepartmentForm(obj=department)
+    
+    if form.validate_on_submit():
+        # Handle image upload
+        if form.image.data:
+            image_filename = save_uploaded_file(form.image.data, 'departments')
+            # Ensure proper path format for web access
+            if image_filename and not image_filename.startswith('/static/'):
+                department.image = f'/static/uploads/{image_filename}'
+            else:
+                department.image = image_filename
+        
+        department.name = form.name.data
+        department.code = form.code.data.upper()
+        department.program = form.program.data
+        department.description = form.description.data
+        
+        try:
+            db.session.commit()
+            invalidate(public_api.DEPARTMENTS_CACHE_KEY)
+            flash(f'Department "{department.name}" has been updated successfully!', 'success')
+            return redirect(url_for('admin.admin_departments'))
+        except Exception:
+            db.session.rollback()
+            flash('An error occurred while updating the department.', 'error')
+    
+    return render_template('admin/add_department.html', form=form, department=department, action='edit')
+
+@bp.route('/departments/<int:department_id>/lecturers')
+@query_budget(4)
+@login_required
+@admin_required
+def admin_department_lecturers(department_id):
+    department = Department.query.get_or_404(department_id)
+    lecturers = Lecturer.query.filter_by(department_id=department_id).order_by(Lecturer.display_order, Lecturer.name).all()
+    return render_template('admin/department_lecturers.html', department=department, lecturers=lecturers)
+
+@bp.route('/departments/<int:department_id>/lecturers/add', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def admin_add_lecturer(department_id):
+    department = Department.query.get_or_404(department_id)
+    form = LecturerForm()
+    form.department_id.choices = [(department.id, department.name)]
+    form.department_id.data = department.id
+    
+    if form.validate_on_submit():
+        # Handle photo upload
+        photo_filename = None
+        if form.photo.data:
+            photo_filename = save_uploaded_file(form.photo.data, 'lecturers')
+        
+        lecturer = Lecturer(
+            name=form.name.data,
+            photo=photo_filename,
+            experience=form.experience.data,
+            qualification=form.qualification.data,
+            specialization=form.specialization.data,
+            designation=form.designation.data,
+            email=form.email.data,
+            phone=form.phone.data,
+            department_id=form.department_id.data,
+            display_order=form.display_order.data or 0
+        )
+        
+        db.session.add(lecturer)
+        db.session.commit()
+        flash(f'Lecturer "{lecturer.name}" has been added successfully!', 'success')
+        return redirect(url_for('admin.admin_department_lecturers', department_id=department.id))
+    
+    return render_template('admin/add_lecturer.html', form=form, department=department, action='add')
+
+@bp.route('/lecturers/<int:lecturer_id>/edit', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def admin_edit_lecturer(lecturer_id):
+    lecturer = Lecturer.query.get_or_404(lecturer_id)
+    form = LecturerForm(obj=lecturer)
+    form.department_id.choices = [(dept.id, dept.name) for dept in Department.query.filter_by(is_active=True).all()]
+    
+    if form.validate_on_submit():
+        # Handle photo upload
+        if form.photo.data:
+            photo_filename = save_uploaded_file(form.photo.data, 'lecturers')
+            lecturer.photo = photo_filename
+        
+        lecturer.name = form.name.data
+        lecturer.experience = form.experience.data
+        lecturer.qualification = form.qualification.data
+        lecturer.specialization = form.specialization.data
+        lecturer.designation = form.designation.data
+        lecturer.email = form.email.data
+        lecturer.phone = form.phone.data
+        lecturer.department_id = form.department_id.data
+        lecturer.display_order = form.display_order.data or 0
+        
+        db.session.commit()
+        flash(f'Lecturer "{lecturer.name}" has been updated successfully!', 'success')
+        return redirect(url_for('admin.admin_department_lecturers', department_id=lecturer.department_id))
+    
+    return render_template('admin/add_lecturer.html', form=form, lecturer=lecturer, department=lecturer.department, action='edit')
+
+@bp.route('/departments/<int:department_id>/reviews')
+@query_budget(4)
+@login_required
+@admin_required
+def admin_department_reviews(department_id):
+    department = Department.query.get_or_404(department_id)
+    reviews = StudentReview.query.filter_by(department_id=department_id).order_by(StudentReview.created_at.desc()).all()
+    return render_template('admin/department_reviews.html', department=department, reviews=reviews)
+
+@bp.route('/departments/<int:department_id>/reviews/add', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def admin_add_student_review(department_id):
+    department = Department.query.get_or_404(department_id)
+    form = StudentReviewForm()
+    form.department_id.choices = [(department.id, department.name)]
+    form.department_id.data = department.id
+    
+    if form.validate_on_submit():
+        # Handle photo upload
+        photo_filename = None
+        if form.photo.data:
+            photo_filename = save_uploaded_file(form.photo.data, 'student_reviews')
+        
+        review = StudentReview(
+            student_name=form.student_name.data,
+            photo=photo_filename,
+            review_text=form.review_text.data,
+            rating=form.rating.data,
+            department_id=form.department_id.data,
+            student_batch=form.student_batch.data,
+            current_position=form.current_position.data,
+            is_approved=True  # Admin-created reviews are auto-approved
+        )
+        
+        # Retry mechanism for database operations
+        max_retries = 3
+        for attempt in range(max_retries):
+            try:
+                db.session.add(review)
+                db.session.commit()
+                break
+            except Exception as e:
+                db.session.rollback()
+                if attempt == max_retries - 1:
+                    flash(f'Error saving review: {str(e)}', 'error')
+                    return render_template('admin/add_student_review.html', form=form, department=department, action='add')
+                import time
+                time.sleep(0.5)  # Brief delay before retry
+        flash(f'Student review from "{review.student_name}" has been added successfully!', 'success')
+        return redirect(url_for('admin.admin_department_reviews', department_id=department.id))
+    
+    return render_template('admin/add_student_review.html', form=form, department=department, action='add')
+
+@bp.route('/reviews/<int:review_id>/approve', methods=['POST'])
+@login_required
+@admin_required
+def admin_approve_review(review_id):
+    review = StudentReview.query.get_or_404(review_id)
+    review.is_approved = not review.is_approved
+    
+    try:
+        db.session.commit()
+        status = "approved" if review.is_approved else "unapproved"
+        flash(f'Review from "{review.student_name}" has been {status}!', 'success')
+    except Exception as e:
+        db.session.rollback()
+        flash(f'Error updating review: {str(e)}', 'error')
+    
+    return redirect(url_for('admin.admin_department_reviews', department_id=review.department_id))
+
+@bp.route('/reviews/<int:review_id>/delete', methods=['POST'])
+@login_required
+@admin_required
+def admin_delete_review(review_id):
+    review = StudentReview.query.get_or_404(review_id)
+    department_id = review.department_id
+    
+    try:
+        # The photo file is deleted on commit unless another record uses it
+        db.session.delete(review)
+        db.session.commit()
+        flash(f'Review from "{review.student_name}" has been deleted!', 'success')
+    except Exception as e:
+        db.session.rollback()
+        flash(f'Error deleting review: {str(e)}', 'error')
+    
+    return redirect(url_for('admin.admin_department_reviews', department_id=department_id))
+
+@bp.route('/reviews/<int:review_id>/edit', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def admin_edit_student_review(review_id):
+    review = StudentReview.query.get_or_404(review_id)
+    form = StudentReviewForm(obj=review)
+    form.department_id.choices = [(dept.id, dept.name) for dept in Department.query.filter_by(is_active=True).all()]
+    
+    if form.validate_on_submit():
+        # Handle photo upload
+        if form.photo.data:
+            photo_filename = save_uploaded_file(form.photo.data, 'student_reviews')
+            review.photo = photo_filename
+        
+        review.student_name = form.student_name.data
+        review.review_text = form.review_text.data
+        review.rating = form.rating.data
+        review.department_id = form.department_id.data
+        review.student_batch = form.student_batch.data
+        review.current_position = form.current_position.data
+        
+        db.session.commit()
+        flash(f'Student review from "{review.student_name}" has been updated successfully!', 'success')
+        return redirect(url_for('admin.admin_department_reviews', department_id=review.department_id))
+    
+    return render_template('admin/add_student_review.html', form=form, review=review, department=review.department, action='edit')
+
+@bp.route('/import-students', methods=['GET', 'POST'])
+@login_required
+@admin_required
+def admin_import_students():
+    # pandas/openpyxl are only loaded by the routes that need them
+    from excel_utils import process_excel_file
+
+    form = ExcelImportForm()
+    
+    # Populate department choices
+    departments = Department.query.filter_by(is_active=True).order_by(Department.name).all()
+    form.department.choices = [(d.name, f"{d.name} ({d.code})") for d in departments]
+    
+    # Populate classroom choices
+    classrooms = Classroom.query.all()
+    form.classroom_id.choices = [(0, 'No Classroom Assignment')] + [(c.id, f"{c.name} ({c.department} - {c.year}{c.section})") for c in classrooms]
+    
+    if form.validate_on_submit():
+        # Handle file upload
+        if 'excel_file' not in request.files:
+            flash('No file selected', 'error')
+            return redirect(request.url)
+        
+        file = request.files['excel_file']
+        if file.filename == '':
+            flash('No file selected', 'error')
+            return redirect(request.url)
+        
+        if file and file.filename.lower().endswith(('.xlsx', '.xls')):
+            # Save uploaded file temporarily
+            filename = secure_filename(file.filename)
+            temp_filepath = os.path.join('/tmp', f"{uuid.uuid4()}_{filename}")
+            file.save(temp_filepath)
+            logger.debug('Saved import upload to %s', temp_filepath)
+            
+            try:
+                # Process Excel file
+                result = process_excel_file(
+                    temp_filepath,
+                    form.default_password.data,
+                    form.department.data,
+                    form.classroom_id.data
+                )
+                
+                if not result['success']:
+                    flash(f"Error processing file: {result['error']}", 'error')
+                    return render_template('admin/import_students.html', form=form)
+                
+                # Show preview if there are errors or valid data
+                if result['errors'] or result['valid_data']:
+                    return render_template('admin/import_preview.html', 
+                                         form=form, 
+                                         result=result,
+                                         temp_file=temp_filepath)
+                else:
+                    flash('No valid data found in Excel file', 'warning')
+                    return render_template('admin/import_students.html', form=form)
+                    
+            except Exception as e:
+                flash(f'Error processing Excel file: {str(e)}', 'error')
+                if os.path.exists(temp_filepath):
+                    os.remove(temp_filepath)
+                return render_template('admin/import_students.html', form=form)
+        else:
+            flash('Please upload a valid Excel file (.xlsx or .xls)', 'error')
+    
+    # Pass classroom data for JavaScript filtering
+    classrooms_data = [{'id': c.id, 'name': c.name, 'department': c.department, 'year': c.year, 'section': c.section} for c in classrooms]
+    
+    return render_template('admin/import_students.html', form=form, classrooms_data=classrooms_data)
+
+@bp.route('/confirm-import', methods=['POST'])
+@login_required
+@admin_required
+def admin_confirm_import():
+    """Confirm and execute the student import"""
+    from excel_utils import process_excel_file, create_students_from_data
+
+    temp_file = request.form.get('temp_file')
+    action = request.form.get('action')
+    
+    logger.debug('Import confirmation: action=%s temp_file=%s', action, temp_file)
+    
+    if action == 'confirm' and temp_file and os.path.exists(temp_file):
+        try:
+            # Re-process the file to get valid data
+            form_data = request.form
+            
+            result = process_excel_file(
+                temp_file,
+                form_data.get('default_password'),
+                form_data.get('department'),
+                int(form_data.get('classroom_id', 0)) if form_data.get('classroom_id') != '0' else None
+            )
+            
+            logger.debug('Import file processed: valid=%s errors=%s',
+                         result.get('valid_count'), result.get('error_count'))
+            
+            if result['success'] and result['valid_data']:
+                # Create students
+                creation_result = create_students_from_data(result['valid_data'])
+                
+                logger.info('Student import finished: created=%s failed=%s',
+                            creation_result.get('created_count'), creation_result.get('failed_count'))
+                
+                if creation_result['success']:
+                    flash(f"Successfully imported {creation_result['created_count']} students!", 'success')
+                    if creation_result['failed_count'] > 0:
+                        flash(f"Failed to import {creation_result['failed_count']} students", 'warning')
+                        # Display details of failed students
+                        for failed in creation_result.get('failed_students', []):
+                            flash(f"Failed to import {failed['name']}: {failed['error']}", 'error')
+                else:
+                    flash(f"Error creating students: {creation_result.get('error', 'Unknown error')}", 'error')
+            else:
+                flash('No valid student data to import', 'error')
+                
+        except Exception as e:
+            logger.exception('Student import failed')
+            flash(f'Error during import: {str(e)}', 'error')
+        finally:
+            # Clean up temp file
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+    else:
+        flash('Invalid import request', 'error')
+    
+    return redirect(url_for('admin.admin_users'))
+
+@bp.route('/download-template')
+@login_required
+@admin_required
+def admin_download_template():
+    """Download Excel template for student import"""
+    from flask import Response
+    import io
+    import pandas as pd
+    from excel_utils import create_sample_excel_template
+    
+    # Create sample template
+    df = create_sample_excel_template()
+    
+    # Create Excel file in memory
+    output = io.BytesIO()
+    with pd.ExcelWriter(output, engine='openpyxl') as writer:
+        df.to_excel(writer, sheet_name='Students', index=False)
+    
+    output.seek(0)
+    
+    return Response(
+        output.getvalue(),
+        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        headers={'Content-Disposition': 'attachment; filename=student_import_template.xlsx'}
+    )
@@ -0,0 +1,135 @@
+"""
+Public JSON API used by the college website.
+
+The queries and serializers live in public_api.py, shared with asgi_api.py.
+"""
+
+import logging
+from flask import Blueprint, request, jsonify
+from extensions import db, csrf
+from caching import remember
+from query_monitor import query_budget
+import public_api
+
+bp = Blueprint('api', __name__, url_prefix='/api')
+# Public, cookie-less endpoints called from the website
+csrf.exempt(bp)
+logger = logging.getLogger(__name__)
+
+# Cached public lists: fresh for a minute, then served while being refreshed
+API_CACHE_TIMEOUT = 60
+API_CACHE_STALE = 300
+
+
+@bp.route('/test', methods=['GET'])
+def api_test():
+    """Simple test API endpoint"""
+    return jsonify({'success': True, 'message': 'API is working'}), 200
+
+def _departments_payload():
+    departments = db.session.scalars(public_api.departments_query()).all()
+    return public_api.departments_payload(departments)
+
+@bp.route('/departments', methods=['GET'])
+@query_budget(2)
+def api_departments():
+    """API endpoint for listing all departments"""
+    try:
+        payload = remember(public_api.DEPARTMENTS_CACHE_KEY, _departments_payload,
+                           API_CACHE_TIMEOUT, API_CACHE_STALE)
+        return jsonify(payload), 200
+        
+    except Exception as e:
+        logger.exception('Departments API error')
+        return jsonify({
+            'success': False,
+            'message': f'Failed to fetch departments: {str(e)}'
+        }), 500
+
+@bp.route('/banners', methods=['GET'])
+@query_budget(2)
+def api_banners():
+    """API endpoint for listing all active banners"""
+    try:
+        banners = db.session.scalars(public_api.banners_query()).all()
+        return jsonify(public_api.banners_payload(banners)), 200
+        
+    except Exception as e:
+        logger.exception('Banners API error')
+        return jsonify({
+            'success': False,
+            'message': f'Failed to fetch banners: {str(e)}'
+        }), 500
+
+@bp.route('/enquiry', methods=['POST'])
+def api_enquiry():
+    """API endpoint for handling enquiry submissions"""
+    try:
+        enquiry = public_api.build_enquiry(request.get_json(silent=True))
+    except public_api.ApiError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+    try:
+        db.session.add(enquiry)
+        db.session.commit()
+        return jsonify(public_api.enquiry_created_payload(enquiry)), 201
+        
+    except Exception:
+        db.session.rollback()
+        logger.exception('Enquiry API error')
+        return jsonify({
+            'success': False,
+            'message': 'Failed to submit enquiry. Please try again.'
+        }), 500
+
+@bp.route('/events', methods=['GET'])
+@query_budget(2)
+def api_events():
+    """Public API endpoint for fetching events from announcements with category='event'"""
+    try:
+        filters = public_api.events_filters(request.args)
+        events = db.session.scalars(public_api.events_query(filters)).unique().all()
+        return jsonify(public_api.events_payload(events, filters)), 200
+        
+    except Exception as e:
+        logger.exception('Events API error')
+        return jsonify({
+            'success': False,
+            'message': f'Failed to fetch events: {str(e)}'
+        }), 500
+
+@bp.route('/announcements', methods=['GET'])
+@query_budget(2)
+def api_announcements():
+    """Public API endpoint for fetching announcements"""
+    try:
+        filters = public_api.announcements_filters(request.args)
+        announcements = db.session.scalars(public_api.announcements_query(filters)).unique().all()
+        return jsonify(public_api.announcements_payload(announcements, filters)), 200
+        
+    except Exception as e:
+        logger.exception('Announcements API error')
+        return jsonify({
+            'success': False,
+            'message': f'Failed to fetch announcements: {str(e)}'
+        }), 500
+
+@bp.route('/notifications', methods=['GET'])
+@query_budget(2)
+def api_notifications():
+    """Public API endpoint for fetching notifications"""
+    try:
+        filters = public_api.notifications_filters(request.args)
+    except public_api.ApiError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+    try:
+        notifications = db.session.scalars(public_api.notifications_query(filters)).unique().all()
+        return jsonify(public_api.notifications_payload(notifications, filters)), 200
+        
+    except Exception as e:
+        logger.exception('Notifications API error')
+        return jsonify({
+            'success': False,
+            'message': f'Failed to fetch notifications: {str(e)}'
+        }), 500
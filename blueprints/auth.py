@@ -0,0 +1,96 @@
+"""
+Login, registration and the role-based landing redirect
+"""
+
+from flask import Blueprint, render_template, request, redirect, url_for, flash
+from flask_login import login_user, logout_user, login_required, current_user
+from werkzeug.security import check_password_hash, generate_password_hash
+from extensions import db
+from models import Department, User
+from forms import LoginForm, RegisterForm
+
+bp = Blueprint('auth', __name__)
+
+
+@bp.route('/')
+def index():
+    if current_user.is_authenticated:
+        if current_user.role == 'admin':
+            return redirect(url_for('admin.admin_dashboard'))
+        elif current_user.role == 'faculty':
+            return redirect(url_for('faculty.faculty_dashboard'))
+        else:
+            return redirect(url_for('student.student_dashboard'))
+    return redirect(url_for('auth.login'))
+
+@bp.route('/login', methods=['GET', 'POST'])
+def login():
+    if current_user.is_authenticated:
+        return redirect(url_for('auth.index'))
+    
+    form = LoginForm()
+    if form.validate_on_submit():
+        user = User.query.filter_by(email=form.email.data).first()
+        if user and check_password_hash(user.password_hash, form.password.data):
+            if user.is_active:
+                login_user(user)
+                next_page = request.args.get('next')
+                if next_page:
+                    return redirect(next_page)
+                return redirect(url_for('auth.index'))
+            else:
+                flash('Your account has been deactivated. Please contact administrator.', 'error')
+        else:
+            flash('Invalid email or password.', 'error')
+    
+    return render_template('login.html', form=form)
+
+@bp.route('/register', methods=['GET', 'POST'])
+def register():
+    form = RegisterForm()
+    
+    # Populate department choices
+    departments = Department.query.filter_by(is_active=True).order_by(Department.name).all()
+    form.department.choices = [(d.name, f"{d.name} ({d.code})") for d in departments]
+    
+    if form.validate_on_submit():
+        # Check if user already exists
+        if User.query.filter_by(email=form.email.data).first():
+            flash('Email address already registered.', 'error')
+            return render_template('register.html', form=form)
+        
+        if User.query.filter_by(username=form.username.data).first():
+            flash('Username already taken.', 'error')
+            return render_template('register.html', form=form)
+        
+        if User.query.filter_by(student_id=form.student_id.data).first():
+            flash('Student ID already registered.', 'error')
+            return render_template('register.html', form=form)
+        
+        # Create new user
+        user = User(
+            username=form.username.data,
+            email=form.email.data,
+            password_hash=generate_password_hash(form.password.data),
+            first_name=form.first_name.data,
+            last_name=form.last_name.data,
+            phone=form.phone.data,
+            department=form.department.data,
+            student_id=form.student_id.data,
+            role='student'
+        )
+        
+        db.session.add(user)
+        db.session.commit()
+        
+        flash('Registration successful! You can now log in.', 'success')
+        return redirect(url_for('auth.login'))
+    
+    return render_template('register.html', form=form)
+
+@bp.route('/logout')
+@login_required
+def logout():
+    logout_user()
+    flash('You have been logged out.', 'info')
+    return redirect(url_for('auth.login'))
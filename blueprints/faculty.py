@@ -0,0 +1,514 @@
+"""
+Faculty dashboard, attendance marking and attendance reports
+"""
+
+import logging
+from datetime import datetime
+from flask import Blueprint, render_template, request, redirect, url_for, flash
+from flask_login import login_required, current_user
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import joinedload
+from extensions import db
+from utils import faculty_required
+from query_monitor import query_budget
+from replica import reads_from_replica
+from reports import attendance_by_classroom, classroom_filter, classroom_filter_options, format_attendance_stat
+from models import Announcement, Attendance, Classroom, ClassroomAssignment, Event, User
+
+bp = Blueprint('faculty', __name__, url_prefix='/faculty')
+logger = logging.getLogger(__name__)
+
+STUDENTS_PER_PAGE = 50
+
+
+# Faculty Routes
+@bp.route('/dashboard')
+@login_required
+@faculty_required
+def faculty_dashboard():
+    # Get recent announcements
+    announcements = Announcement.query.filter(
+        or_(Announcement.target_audience == 'all', Announcement.target_audience == 'faculty'),
+        Announcement.is_active == True
+    ).order_by(Announcement.is_pinned.desc(), Announcement.created_at.desc()).limit(5).all()
+    
+    # Get upcoming events
+    events = Event.query.filter(
+        Event.event_date >= datetime.now(),
+        Event.is_active == True
+    ).order_by(Event.event_date).limit(5).all()
+    
+    # Calculate attendance statistics for classroom-based system
+    total_students = User.query.filter_by(role='student', is_active=True).count()
+    
+    # Count attendance marked today by this faculty
+    today = datetime.now().date()
+    attendance_marked_today = Attendance.query.filter_by(
+        marked_by=current_user.id,
+        date=today
+    ).count()
+    
+    # Count active students in the faculty's department
+    active_students = User.query.filter_by(
+        role='student', 
+        department=current_user.department,
+        is_active=True
+    ).count() if current_user.department else total_students
+    
+    return render_template('faculty/dashboard.html',
+                         total_students=total_students,
+                         attendance_marked_today=attendance_marked_today,
+                         active_students=active_students,
+                         announcements=announcements,
+                         events=events)
+
+@bp.route('/attendance', methods=['GET', 'POST'])
+@login_required
+@faculty_required
+def faculty_attendance():
+    students = []
+    existing_attendance = {}
+    
+    # Get the faculty's assigned classrooms using the new relationship table
+    faculty_assignments = ClassroomAssignment.query.filter_by(
+        user_id=current_user.id, 
+        is_active=True
+    ).all()
+    assigned_classrooms = [assignment.classroom for assignment in faculty_assignments]
+    
+    
+    # Get filter parameters for classroom-based filtering
+    department = request.args.get('department', '')
+    year = request.args.get('year', type=int)
+    semester = request.args.get('semester', type=int)
+    section = request.args.get('section', '')
+    classroom_id = request.args.get('classroom_id', type=int)
+    attendance_date = request.args.get('date')
+    
+    # Don't set default filters - only show students when filters are explicitly applied
+    
+    if request.method == 'POST':
+        # Process attendance submission from form data
+        attendance_date_str = request.form.get('date')
+        if attendance_date_str:
+            try:
+                attendance_date_obj = datetime.strptime(attendance_date_str, '%Y-%m-%d').date()
+                
+                # Validate date is not in the future
+                today = datetime.now().date()
+                if attendance_date_obj > today:
+                    flash('Cannot mark attendance for future dates.', 'error')
+                    return redirect(url_for('faculty.faculty_attendance'))
+                
+                # Get student attendances from form
+                student_attendances = {}
+                for key, value in request.form.items():
+                    if key.startswith('attendance_'):
+                        student_id = key.replace('attendance_', '')
+                        student_attendances[student_id] = value
+                
+                if not student_attendances:
+                    flash('No attendance data found. Please select students and mark their attendance.', 'warning')
+                    return redirect(url_for('faculty.faculty_attendance'))
+                
+                # Delete existing attendance only for the students being marked
+                student_ids = [int(sid) for sid in student_attendances.keys()]
+                logger.debug('Marking attendance for %d students', len(student_ids))
+                
+                try:
+                    # Use synchronize_session=False for better performance with bulk operations
+                    deleted_count = Attendance.query.filter(
+                        Attendance.marked_by == current_user.id,
+                        Attendance.date == attendance_date_obj,
+                        Attendance.student_id.in_(student_ids)
+                    ).delete(synchronize_session=False)
+                    
+                    logger.debug('Deleted %d existing attendance records', deleted_count)
+                    
+                    # Commit the deletion before inserting new records
+                    db.session.commit()
+                except Exception:
+                    db.session.rollback()
+                    logger.exception('Failed to delete existing attendance records')
+                    flash('Error updating attendance records. Please try again.', 'error')
+                    return redirect(url_for('faculty.faculty_attendance'))
+                
+                # Prepare batch of attendance records
+                attendance_records = []
+                for student_id, status in student_attendances.items():
+                    try:
+                        attendance_records.append({
+                            'student_id': int(student_id),
+                            'course_id': None,  # No course requirement for classroom-based attendance
+                            'date': attendance_date_obj,
+                            'status': status,
+                            'marked_by': current_user.id,
+                            'marked_at': datetime.utcnow()
+                        })
+                    except ValueError:
+                        flash(f'Invalid student ID: {student_id}', 'error')
+                        return redirect(url_for('faculty.faculty_attendance'))
+                
+                try:
+                    # Use bulk insert for better performance
+                    db.session.bulk_insert_mappings(Attendance, attendance_records)
+                    db.session.commit()
+                    
+                    # Log the batch operation (sampled, this fires on every submission)
+                    logger.info('Batch inserted %d attendance records for %s',
+                                len(attendance_records), attendance_date_obj,
+                                extra={'event': 'attendance.batch_insert', 'marked_by': current_user.id})
+                except Exception:
+                    db.session.rollback()
+                    logger.exception('Failed to batch insert attendance records')
+                    flash('Error saving attendance records. Please try again.', 'error')
+                    return redirect(url_for('faculty.faculty_attendance'))
+                
+                flash(f'Attendance marked successfully for {len(student_attendances)} students!', 'success')
+                return redirect(url_for('faculty.faculty_attendance'))
+            except Exception as e:
+                db.session.rollback()
+                flash(f'Error marking attendance: {str(e)}', 'error')
+                logger.exception('Error marking attendance')
+    
+    # Only show students when filters are applied
+    students = []
+    
+    # Check if any filters are applied
+    filters_applied = any([department, year, semester, section, classroom_id, attendance_date])
+    
+    if filters_applied:
+        # Build student query based on faculty's assigned classrooms and manual filters
+        student_query = User.query.filter(User.role == 'student', User.is_active == True)
+        
+        # Always filter by assigned classrooms if faculty has them
+        if assigned_classrooms:
+            if classroom_id:
+                # Filter by specific classroom
+                student_query = student_query.filter(User.classroom_id == classroom_id)
+            else:
+                # Filter by all assigned classrooms
+                classroom_ids = [classroom.id for classroom in assigned_classrooms]
+                student_query = student_query.filter(User.classroom_id.in_(classroom_ids))
+        
+        # Apply manual filters if provided
+        if department:
+            student_query = student_query.filter(User.department == department)
+        if year:
+            try:
+                year_int = int(year)
+                student_query = student_query.filter(User.year == year_int)
+            except (ValueError, TypeError):
+                pass
+        if semester:
+            try:
+                semester_int = int(semester)
+                student_query = student_query.filter(User.semester == semester_int)
+            except (ValueError, TypeError):
+                pass
+        if section:
+            student_query = student_query.filter(User.section == section)
+        
+        # Execute query
+        students = student_query.order_by(User.first_name, User.last_name).all()
+    
+    # Get existing attendance for the date if specified
+    if attendance_date:
+        try:
+            date_obj = datetime.strptime(attendance_date, '%Y-%m-%d').date()
+            # Use a single query with joins to get all required data
+            attendance_records = db.session.query(
+                Attendance, User
+            ).join(
+                User, User.id == Attendance.student_id
+            ).filter(
+                Attendance.marked_by == current_user.id,
+                Attendance.date == date_obj,
+                User.is_active == True
+            ).all()
+            
+            # Process results
+            existing_attendance = {
+                str(record.Attendance.student_id): record.Attendance.status 
+                for record in attendance_records
+            }
+        except Exception:
+            logger.exception('Error getting attendance records')
+    
+    # Get available filter options based on faculty's assigned classrooms
+    if assigned_classrooms:
+        # If faculty is assigned to classrooms, show options from those classrooms
+        departments = list(set([c.department for c in assigned_classrooms if c.department]))
+        years = list(set([c.year for c in assigned_classrooms if c.year]))
+        semesters = list(set([c.semester for c in assigned_classrooms if c.semester]))
+        sections = list(set([c.section for c in assigned_classrooms if c.section]))
+    else:
+        # Manual filtering options for faculty not assigned to specific classroom
+        departments = db.session.query(User.department).filter(User.role == 'student', User.department.isnot(None)).distinct().all()
+        years = db.session.query(User.year).filter(User.role == 'student', User.year.isnot(None)).distinct().order_by(User.year).all()
+        semesters = db.session.query(User.semester).filter(User.role == 'student', User.semester.isnot(None)).distinct().order_by(User.semester).all()
+        sections = db.session.query(User.section).filter(User.role == 'student', User.section.isnot(None)).distinct().order_by(User.section).all()
+        
+        departments = [d[0] for d in departments if d[0]]
+        years = [y[0] for y in years if y[0]]
+        semesters = [s[0] for s in semesters if s[0]]
+        sections = [sec[0] for sec in sections if sec[0]]
+    
+    return render_template('faculty/attendance.html',
+                         students=students,
+                         existing_attendance=existing_attendance,
+                         selected_date=attendance_date,
+                         assigned_classrooms=assigned_classrooms,
+                         departments=departments,
+                         years=years,
+                         semesters=semesters,
+                         sections=sections,
+                         filters={
+                             'department': department,
+                             'year': year,
+                             'semester': semester,
+                             'section': section,
+                             'classroom_id': classroom_id
+                         })
+
+@bp.route('/attendance-reports/generate', methods=['POST'])
+@login_required
+@faculty_required
+def generate_attendance_report():
+    from tasks import generate_attendance_report as gen_report
+    
+    classroom_id = request.form.get('classroom_id', type=int)
+    date_from = request.form.get('date_from')
+    date_to = request.form.get('date_to')
+    
+    if not all([classroom_id, date_from, date_to]):
+        flash('Please provide classroom and date range.', 'error')
+        return redirect(url_for('faculty.faculty_attendance_reports'))
+    
+    try:
+        # Convert dates to datetime objects
+        date_from = datetime.strptime(date_from, '%Y-%m-%d').date()
+        date_to = datetime.strptime(date_to, '%Y-%m-%d').date()
+        
+        # Start async task
+        task = gen_report.delay(classroom_id, [date_from, date_to])
+        
+        flash('Report generation started. You will be notified when it\'s ready.', 'info')
+        return redirect(url_for('faculty.faculty_attendance_reports'))
+    except Exception as e:
+        flash(f'Error starting report generation: {str(e)}', 'error')
+        return redirect(url_for('faculty.faculty_attendance_reports'))
+
+@bp.route('/attendance-reports')
+@login_required
+@faculty_required
+@reads_from_replica
+def faculty_attendance_reports():
+    from datetime import timedelta
+    
+    # Get the faculty's assigned classrooms using the new relationship table
+    faculty_assignments = ClassroomAssignment.query.filter_by(
+        user_id=current_user.id, 
+        is_active=True
+    ).all()
+    assigned_classrooms = [assignment.classroom for assignment in faculty_assignments]
+    
+    # Get filter parameters
+    department = request.args.get('department', '')
+    year = request.args.get('year', type=int)
+    semester = request.args.get('semester', type=int)
+    section = request.args.get('section', '')
+    date_from = request.args.get('date_from')
+    date_to = request.args.get('date_to')
+    
+    # Set default date range (last 30 days)
+    if not date_from:
+        date_from = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
+    if not date_to:
+        date_to = datetime.now().strftime('%Y-%m-%d')
+    
+    # Don't set default filters - show no records when no filters are applied
+    
+    # Attendance marked by the current faculty, only for active students
+    criteria = [
+        Attendance.marked_by == current_user.id,
+        Attendance.date >= date_from,
+        Attendance.date <= date_to,
+        User.is_active == True,
+    ]
+    
+    # Filter by assigned classrooms if faculty has them
+    classroom_ids = [classroom.id for classroom in assigned_classrooms]
+    if classroom_ids:
+        criteria.append(User.classroom_id.in_(classroom_ids))
+    
+    # Page through the classrooms; only show data when filters are applied
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', 10, type=int)  # 10 items per page
+    if any([department, year, semester, section]):
+        rows = attendance_by_classroom(*criteria, *classroom_filter(department, year, semester, section))
+    else:
+        rows = []
+    total_count = len(rows)
+    total_pages = (total_count + per_page - 1) // per_page
+    if not rows:
+        page = 1
+    
+    # Calculate percentages and format data; students are counted per classroom, not per record
+    attendance_stats = [
+        dict(format_attendance_stat(row), total_students=row.student_count if row.student_count is not None else row.total_students)
+        for row in rows[(page - 1) * per_page:page * per_page]
+    ]
+    
+    # Get filter options from assigned classrooms (not just from existing attendance records)
+    if classroom_ids:
+        filter_options = classroom_filter_options(Classroom.id.in_(classroom_ids))
+    else:
+        # Fallback: classrooms of the students this faculty has marked attendance for
+        filter_options = classroom_filter_options(Classroom.id.in_(
+            select(User.classroom_id).join(Attendance, User.id == Attendance.student_id)
+            .where(Attendance.marked_by == current_user.id)
+        ))
+    
+    # Unpack filter options
+    departments = filter_options['departments']
+    years = filter_options['years']
+    semesters = filter_options['semesters']
+    sections = filter_options['sections']
+    
+    # Calculate overall statistics
+    total_attendance_records = sum(stat['total_records'] for stat in attendance_stats)
+    total_present = sum(stat['present_count'] for stat in attendance_stats)
+    total_absent = sum(stat['absent_count'] for stat in attendance_stats)
+    total_late = sum(stat['late_count'] for stat in attendance_stats)
+    
+    overall_stats = {
+        'total_records': total_attendance_records,
+        'present_count': total_present,
+        'absent_count': total_absent,
+        'late_count': total_late,
+        'present_percentage': round((total_present / total_attendance_records * 100), 1) if total_attendance_records > 0 else 0,
+        'absent_percentage': round((total_absent / total_attendance_records * 100), 1) if total_attendance_records > 0 else 0,
+        'late_percentage': round((total_late / total_attendance_records * 100), 1) if total_attendance_records > 0 else 0,
+        'total_classes': len(set(f"{stat['department']}-{stat['year']}-{stat['semester']}-{stat['section']}" for stat in attendance_stats)),
+        'total_classrooms': len(attendance_stats)
+    }
+    
+    filters = {
+        'department': department,
+        'year': year,
+        'semester': semester,
+        'section': section,
+        'date_from': date_from,
+        'date_to': date_to
+    }
+    
+    return render_template('faculty/attendance_reports.html',
+                         attendance_stats=attendance_stats,
+                         overall_stats=overall_stats,
+                         departments=departments,
+                         years=years,
+                         semesters=semesters,
+                         sections=sections,
+                         filters=filters,
+                         assigned_classrooms=assigned_classrooms,
+                         total_count=total_count,
+                         page=page,
+                         per_page=per_page,
+                         total_pages=total_pages)
+
+@bp.route('/students')
+@query_budget(8)
+@login_required
+@faculty_required
+def faculty_students():
+    """Faculty view of students from their assigned classrooms"""
+    # Get filter parameters
+    classroom_id = request.args.get('classroom_id', type=int)
+    department = request.args.get('department', '')
+    year = request.args.get('year', type=int)
+    semester = request.args.get('semester', type=int)
+    section = request.args.get('section', '')
+    page = request.args.get('page', 1, type=int)
+    
+    # Get the classroom(s) assigned to this faculty using the new relationship table
+    faculty_assignments = ClassroomAssignment.query.filter_by(
+        user_id=current_user.id, 
+        is_active=True
+    ).options(joinedload(ClassroomAssignment.classroom)).all()
+    
+    if not faculty_assignments:
+        # If faculty is not assigned to any classroom, show all students (a page at a time)
+        query = User.query.filter_by(role='student', is_active=True).order_by(
+            User.department, User.year, User.semester, User.section, User.first_name, User.id
+        )
+        assigned_classrooms = []
+    else:
+        assigned_classrooms = [assignment.classroom for assignment in faculty_assignments]
+        
+        # Build student query based on filters
+        if classroom_id:
+            # Filter by specific classroom
+            query = User.query.filter(
+                User.role == 'student', 
+                User.is_active == True, 
+                User.classroom_id == classroom_id
+            ).order_by(User.first_name, User.last_name, User.id)
+        else:
+            # Get students from all classrooms assigned to this faculty
+            classroom_ids = [assignment.classroom_id for assignment in faculty_assignments]
+            query = User.query.filter(
+                User.role == 'student', 
+                User.is_active == True, 
+                User.classroom_id.in_(classroom_ids)
+            ).order_by(User.first_name, User.last_name, User.id)
+    
+    students = query.paginate(page=page, per_page=STUDENTS_PER_PAGE, error_out=False)
+    
+    # Get statistics
+    total_students = students.total
+    total_classrooms = db.session.query(func.count()).select_from(
+        query.order_by(None).with_entities(User.department, User.year, User.semester, User.section)
+        .distinct().subquery()
+    ).scalar()
+    
+    # Group students by classroom parameters for better organization
+    students_by_classroom = {}
+    for student in students.items:
+        if assigned_classrooms:
+            # Group by individual student's classroom parameters
+            classroom_key = f"{student.department or 'N/A'} - Year {student.year or 'N/A'} Sem {student.semester or 'N/A'} Section {student.section or 'N/A'}"
+        else:
+            # Group by individual student's classroom parameters
+            classroom_key = f"{student.department or 'N/A'} - Year {student.year or 'N/A'} Sem {student.semester or 'N/A'} Section {student.section or 'N/A'}"
+        
+        if classroom_key not in students_by_classroom:
+            students_by_classroom[classroom_key] = []
+        students_by_classroom[classroom_key].append(student)
+    
+    # Get recent attendance for these students (marked by this faculty)
+    from datetime import datetime, timedelta
+    today = datetime.now().date()
+    week_ago = today - timedelta(days=7)
+    
+    recent_attendance = db.session.query(Attendance).join(User, Attendance.student_id == User.id).filter(
+        Attendance.marked_by == current_user.id,
+        Attendance.date >= week_ago,
+        User.role == 'student',
+        User.is_active == True
+    ).order_by(Attendance.date.desc()).limit(10).all()
+    
+    return render_template('faculty/students.html',
+                         students=students,
+                         students_by_classroom=students_by_classroom,
+                         assigned_classrooms=assigned_classrooms,
+                         total_students=total_students,
+                         total_classrooms=total_classrooms,
+                         recent_attendance=recent_attendance,
+                         filters={
+                             'classroom_id': classroom_id,
+                             'department': department,
+                             'year': year,
+                             'semester': semester,
+                             'section': section
+                         })
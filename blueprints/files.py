@@ -0,0 +1,32 @@
+"""
+Uploaded files: the ``upload_url`` template filter and presigned redirects
+"""
+
+from flask import Blueprint, abort, redirect
+
+from storage import REDIRECT_PREFIX, get_storage
+from uploads import upload_url
+
+bp = Blueprint('files', __name__, url_prefix=REDIRECT_PREFIX.rstrip('/'))
+
+
+@bp.app_template_filter('upload_url')
+def upload_url_filter(stored):
+    """URL of an upload from the value stored on a model, whatever the backend"""
+    return upload_url(stored)
+
+
+@bp.route('/<path:key>')
+def download(key):
+    """
+    Send the browser straight to the storage backend (a presigned URL for a
+    private S3 bucket) so the app never streams file bytes itself
+    """
+    storage = get_storage()
+    if key.startswith('.') or '/.' in key:
+        abort(404)
+    response = redirect(storage.download_url(key), 302)
+    # Shorter than the presigned URL's lifetime so a cached redirect never points at an expired URL
+    response.cache_control.private = True
+    response.cache_control.max_age = min(300, getattr(storage, 'presign_expires', 300))
+    return response
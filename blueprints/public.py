@@ -0,0 +1,53 @@
+"""
+Public website pages: department listings and the enquiry form
+"""
+
+from flask import Blueprint, render_template, redirect, url_for, flash, abort
+from extensions import db
+from models import Department, Enquiry, Lecturer, StudentReview
+from forms import EnquiryForm
+
+bp = Blueprint('public', __name__)
+
+
+# Public Routes (for enquiries)
+@bp.route('/enquiry', methods=['GET', 'POST'])
+def public_enquiry():
+    form = EnquiryForm()
+    
+    if form.validate_on_submit():
+        enquiry = Enquiry(
+            name=form.name.data,
+            email=form.email.data,
+            phone=form.phone.data,
+            course_interested=form.course_interested.data,
+            message=form.message.data
+        )
+        
+        db.session.add(enquiry)
+        db.session.commit()
+        
+        flash('Your enquiry has been submitted successfully! We will contact you soon.', 'success')
+        return redirect(url_for('public.public_enquiry'))
+    
+    return render_template('enquiry.html', form=form)
+
+# Public Department Views
+@bp.route('/departments')
+def public_departments():
+    departments = Department.query.filter_by(is_active=True).order_by(Department.name).all()
+    return render_template('public/departments.html', departments=departments)
+
+@bp.route('/departments/<int:department_id>')
+def public_department_detail(department_id):
+    department = Department.query.get_or_404(department_id)
+    if not department.is_active:
+        abort(404)
+    
+    lecturers = Lecturer.query.filter_by(department_id=department_id, is_active=True).order_by(Lecturer.display_order, Lecturer.name).all()
+    reviews = StudentReview.query.filter_by(department_id=department_id, is_approved=True).order_by(StudentReview.created_at.desc()).limit(6).all()
+    
+    return render_template('public/department_detail.html', 
+                         department=department, 
+                         lecturers=lecturers, 
+                         reviews=reviews)
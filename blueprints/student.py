@@ -0,0 +1,204 @@
+"""
+Student dashboard, profile, attendance and feedback pages
+"""
+
+from datetime import datetime
+from flask import Blueprint, render_template, redirect, url_for, flash
+from flask_login import login_required, current_user
+from sqlalchemy import or_
+from extensions import db
+from utils import student_required, save_uploaded_file
+from models import Announcement, Attendance, Course, Department, Enrollment, Event, Feedback
+from forms import FeedbackForm, ProfileForm
+
+bp = Blueprint('student', __name__, url_prefix='/student')
+
+
+# Student Routes
+@bp.route('/dashboard')
+@login_required
+@student_required
+def student_dashboard():
+    # Get recent announcements
+    announcements = Announcement.query.filter(
+        or_(Announcement.target_audience == 'all', Announcement.target_audience == 'students'),
+        Announcement.is_active == True
+    ).order_by(Announcement.is_pinned.desc(), Announcement.created_at.desc()).limit(5).all()
+    
+    # Get upcoming events
+    events = Event.query.filter(
+        Event.event_date >= datetime.now(),
+        Event.is_active == True
+    ).order_by(Event.event_date).limit(5).all()
+    
+    # Get enrolled courses
+    enrolled_courses = db.session.query(Course).join(Enrollment).filter(
+        Enrollment.student_id == current_user.id,
+        Enrollment.is_active == True,
+        Course.is_active == True
+    ).all()
+    
+    # Get attendance summary
+    attendance_summary = []
+    for course in enrolled_courses:
+        total_classes = Attendance.query.filter_by(
+            student_id=current_user.id,
+            course_id=course.id
+        ).count()
+        
+        present_classes = Attendance.query.filter_by(
+            student_id=current_user.id,
+            course_id=course.id,
+            status='present'
+        ).count()
+        
+        percentage = (present_classes / total_classes * 100) if total_classes > 0 else 0
+        attendance_summary.append({
+            'course': course,
+            'total': total_classes,
+            'present': present_classes,
+            'percentage': round(percentage, 2)
+        })
+    
+    # Also get classroom-based attendance (where course_id is NULL)
+    classroom_attendance = Attendance.query.filter_by(
+        student_id=current_user.id,
+        course_id=None
+    ).all()
+    
+    if classroom_attendance:
+        total_classroom = len(classroom_attendance)
+        present_classroom = len([a for a in classroom_attendance if a.status == 'present'])
+        percentage_classroom = (present_classroom / total_classroom * 100) if total_classroom > 0 else 0
+        
+        attendance_summary.append({
+            'course': {'name': 'Classroom Attendance', 'code': 'CLASS'},
+            'total': total_classroom,
+            'present': present_classroom,
+            'percentage': round(percentage_classroom, 2)
+        })
+    
+    return render_template('student/dashboard.html',
+                         announcements=announcements,
+                         events=events,
+                         attendance_summary=attendance_summary)
+
+@bp.route('/profile', methods=['GET', 'POST'])
+@login_required
+@student_required
+def student_profile():
+    form = ProfileForm(obj=current_user)
+    
+    # Populate department choices
+    departments = Department.query.filter_by(is_active=True).order_by(Department.name).all()
+    form.department.choices = [('', 'Select Department (Optional)')] + [(d.name, f"{d.name} ({d.code})") for d in departments]
+    
+    if form.validate_on_submit():
+        current_user.first_name = form.first_name.data
+        current_user.last_name = form.last_name.data
+        current_user.phone = form.phone.data
+        current_user.address = form.address.data
+        current_user.date_of_birth = form.date_of_birth.data
+        current_user.department = form.department.data
+        
+        # Handle profile image upload
+        if form.profile_image.data:
+            filename = save_uploaded_file(form.profile_image.data, 'profiles')
+            if filename:
+                current_user.profile_image = filename
+        
+        db.session.commit()
+        flash('Profile updated successfully!', 'success')
+        return redirect(url_for('student.student_profile'))
+    
+    return render_template('student/profile.html', form=form)
+
+@bp.route('/attendance')
+@login_required
+@student_required
+def student_attendance():
+    # Get enrolled courses
+    enrolled_courses = db.session.query(Course).join(Enrollment).filter(
+        Enrollment.student_id == current_user.id,
+        Enrollment.is_active == True,
+        Course.is_active == True
+    ).all()
+    
+    attendance_data = []
+    for course in enrolled_courses:
+        records = Attendance.query.filter_by(
+            student_id=current_user.id,
+            course_id=course.id
+        ).order_by(Attendance.date.desc()).all()
+        
+        total_classes = len(records)
+        present_classes = len([r for r in records if r.status == 'present'])
+        percentage = (present_classes / total_classes * 100) if total_classes > 0 else 0
+        
+        attendance_data.append({
+            'course': course,
+            'records': records,
+            'total_classes': total_classes,
+            'present_classes': present_classes,
+            'percentage': round(percentage, 2)
+        })
+    
+    # Also get classroom-based attendance (where course_id is NULL)
+    classroom_records = Attendance.query.filter_by(
+        student_id=current_user.id,
+        course_id=None
+    ).order_by(Attendance.date.desc()).all()
+    
+    if classroom_records:
+        total_classroom = len(classroom_records)
+        present_classroom = len([r for r in classroom_records if r.status == 'present'])
+        percentage_classroom = (present_classroom / total_classroom * 100) if total_classroom > 0 else 0
+        
+        attendance_data.append({
+            'course': {'name': 'Classroom Attendance', 'code': 'CLASS'},
+            'records': classroom_records,
+            'total_classes': total_classroom,
+            'present_classes': present_classroom,
+            'percentage': round(percentage_classroom, 2)
+        })
+    
+    return render_template('student/attendance.html', attendance_data=attendance_data)
+
+# Student Feedback Route
+@bp.route('/feedback', methods=['GET', 'POST'])
+@login_required
+@student_required
+def student_feedback():
+    form = FeedbackForm()
+    
+    # Get courses the student is enrolled in
+    enrolled_courses = db.session.query(Course).join(Enrollment).filter(
+        Enrollment.student_id == current_user.id,
+        Enrollment.is_active == True,
+        Course.is_active == True
+    ).all()
+    
+    form.course_id.choices = [(0, 'General Feedback (not course specific)')] + [(c.id, f"{c.code} - {c.name}") for c in enrolled_courses]
+    
+    if form.validate_on_submit():
+        feedback = Feedback(
+            student_id=current_user.id,
+            course_id=form.course_id.data if form.course_id.data > 0 else None,
+            category=form.category.data,
+            subject=form.subject.data,
+            message=form.message.data,
+            rating=form.rating.data if form.rating.data > 0 else None
+        )
+        
+        db.session.add(feedback)
+        db.session.commit()
+        
+        flash('Your feedback has been submitted successfully!', 'success')
+        return redirect(url_for('student.student_feedback'))
+    
+    # Get user's previous feedback
+    previous_feedback = Feedback.query.filter_by(student_id=current_user.id).order_by(
+        Feedback.created_at.desc()
+    ).limit(10).all()
+    
+    return render_template('student/feedback.html', form=form, previous_feedback=previous_feedback)
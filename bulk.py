@@ -0,0 +1,173 @@
+"""
+Set-based writes for classroom assignment and course enrollment.
+
+Each operation is a fixed number of statements however many users it
+touches: assigning a 60-student section is one UPDATE instead of a SELECT and
+an UPDATE per student. The functions only add statements to the current
+transaction; the caller commits.
+
+Students belong to one classroom through User.classroom_id, with the
+classroom's department/year/semester/section copied onto the user for
+filtering (see User.set_classroom; repair_classroom_fields fixes copies
+that have drifted). Faculty can teach several classrooms through ClassroomAssignment
+rows, which are deactivated rather than deleted, so re-assigning someone
+reactivates their old row (user_id/classroom_id is unique). Enrollments work
+the same way (student_id/course_id is unique).
+"""
+
+from datetime import datetime
+
+from sqlalchemy import Select, func, literal, or_, select, true, update
+
+from extensions import db
+from models import Classroom, ClassroomAssignment, Enrollment, User
+
+
+def dialect_insert(model, session=None):
+    """insert() for the session's database, which has on_conflict_do_nothing/do_update"""
+    dialect = (session or db.session).get_bind().dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f'INSERT ... ON CONFLICT is not supported on {dialect}')
+    return insert(model)
+
+
+def _classroom_fields(classroom):
+    """The values User.set_classroom() sets, for an UPDATE"""
+    fields = {field: getattr(classroom, field) for field in User.CLASSROOM_FIELDS}
+    return {'classroom_id': classroom.id, **fields}
+
+
+def _classroom_field_drift():
+    """Correlated classroom values for each copied field, and the criterion for students whose copy differs"""
+    values = {
+        field: select(getattr(Classroom, field)).where(Classroom.id == User.classroom_id).scalar_subquery()
+        for field in User.CLASSROOM_FIELDS
+    }
+    drifted = or_(*(getattr(User, field).is_distinct_from(value) for field, value in values.items()))
+    return values, (User.role == 'student', User.classroom_id.isnot(None), drifted)
+
+
+def classroom_field_drift(limit=20):
+    """(count, up to ``limit`` user IDs) of students whose copied classroom fields are out of date"""
+    criteria = _classroom_field_drift()[1]
+    count = db.session.scalar(select(func.count(User.id)).where(*criteria))
+    ids = db.session.scalars(select(User.id).where(*criteria).order_by(User.id).limit(limit)).all()
+    return count, ids
+
+
+def repair_classroom_fields():
+    """Copy the classroom fields again onto every student whose copy has drifted; returns how many"""
+    values, criteria = _classroom_field_drift()
+    return db.session.execute(
+        update(User).where(*criteria).values(values).execution_options(synchronize_session=False)
+    ).rowcount
+
+
+def assign_students(classroom, user_ids):
+    """Put the given students in ``classroom``; returns how many were updated"""
+    if not user_ids:
+        return 0
+    result = db.session.execute(
+        update(User)
+        .where(User.id.in_(set(user_ids)), User.role == 'student')
+        .values(_classroom_fields(classroom))
+        .execution_options(synchronize_session='fetch')
+    )
+    return result.rowcount
+
+
+def _activate_assignments(user_ids, classroom_id, assigned_by):
+    """INSERT ... SELECT of active assignments, reactivating rows that already exist"""
+    now = datetime.utcnow()
+    statement = dialect_insert(ClassroomAssignment).from_select(
+        ['user_id', 'classroom_id', 'assigned_at', 'assigned_by', 'is_active'],
+        select(User.id, literal(classroom_id), literal(now), literal(assigned_by), true())
+        .where(User.id.in_(user_ids), User.role == 'faculty')
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=['user_id', 'classroom_id'],
+        set_={'is_active': True, 'assigned_at': now, 'assigned_by': assigned_by},
+        where=ClassroomAssignment.is_active == False
+    )
+    return db.session.execute(statement).rowcount
+
+
+def assign_faculty(classroom, user_ids, assigned_by=None):
+    """
+    Assign the given faculty to ``classroom``, reactivating earlier assignments.
+    Returns how many assignments were created or reactivated.
+    """
+    if not user_ids:
+        return 0
+    return _activate_assignments(set(user_ids), classroom.id, assigned_by)
+
+
+def move_classroom(source, target, include_faculty=False, assigned_by=None):
+    """
+    Move every student of ``source`` into ``target``, e.g. to promote a whole
+    section to its next-semester classroom. With ``include_faculty`` the
+    faculty assignments move too: they are created on ``target`` and
+    deactivated on ``source``. Returns (students moved, faculty moved).
+    """
+    students = db.session.execute(
+        update(User)
+        .where(User.classroom_id == source.id, User.role == 'student')
+        .values(_classroom_fields(target))
+        .execution_options(synchronize_session='fetch')
+    ).rowcount
+
+    faculty = 0
+    if include_faculty:
+        active_on_source = (ClassroomAssignment.classroom_id == source.id, ClassroomAssignment.is_active == True)
+        # Faculty already teaching the target class are left as they are
+        _activate_assignments(select(ClassroomAssignment.user_id).where(*active_on_source), target.id,
+                              assigned_by)
+        faculty = db.session.execute(
+            update(ClassroomAssignment)
+            .where(*active_on_source)
+            .values(is_active=False)
+            .execution_options(synchronize_session='fetch')
+        ).rowcount
+    return students, faculty
+
+
+def enroll_students(course_id, students, sample_size=10):
+    """
+    Enroll students in a course: ``students`` is a list of user IDs or a
+    select() of them, e.g. every student of a classroom or department.
+    Inactive enrollments are reactivated with one UPDATE and the rest are
+    inserted with one INSERT ... SELECT ... ON CONFLICT DO NOTHING.
+
+    Returns (enrolled, already_enrolled, names) where ``names`` holds up to
+    ``sample_size`` of the students who were already enrolled.
+    """
+    if not isinstance(students, Select):
+        students = set(students)
+    existing = (Enrollment.course_id == course_id, Enrollment.student_id.in_(students))
+
+    already = select(User.first_name, User.last_name)\
+        .join(Enrollment, Enrollment.student_id == User.id)\
+        .where(*existing, Enrollment.is_active == True)
+    already_count = db.session.scalar(select(func.count()).select_from(already.subquery()))
+    names = [f"{first} {last}" for first, last in
+             db.session.execute(already.order_by(User.first_name, User.last_name).limit(sample_size))]
+
+    now = datetime.utcnow()
+    reactivated = db.session.execute(
+        update(Enrollment)
+        .where(*existing, Enrollment.is_active == False)
+        .values(is_active=True, enrollment_date=now)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    inserted = db.session.execute(
+        dialect_insert(Enrollment).from_select(
+            ['student_id', 'course_id', 'enrollment_date', 'is_active'],
+            select(User.id, literal(course_id), literal(now), true())
+            .where(User.id.in_(students), User.role == 'student')
+        ).on_conflict_do_nothing(index_elements=['student_id', 'course_id'])
+    ).rowcount
+    return reactivated + inserted, already_count, names
@@ -0,0 +1,188 @@
+"""
+Cache helpers on top of the Flask-Caching ``cache``, for values that are
+expensive to compute and read by many workers at once.
+
+remember() returns a cached value, or computes and caches it, with:
+
+- single flight: on a miss one worker computes the value under a short
+  lock taken with cache.add() (SET NX on Redis) while the others wait for
+  it, so an empty key at peak time costs one computation, not one per
+  request;
+- probabilistic early expiration: each read of an entry close to its
+  expiry refreshes it with a probability that grows as expiry nears and
+  with how long the value took to compute, so one request refreshes it
+  before it expires instead of every request after;
+- stale-while-revalidate: for ``stale`` seconds past its expiry an entry
+  is still served while one worker refreshes it in the background, in a
+  thread or (for module-level functions) the refresh_cached Celery task;
+- compression: values whose pickle exceeds COMPRESS_THRESHOLD bytes are
+  stored zlib-compressed.
+
+A cache that cannot be reached is logged and the value computed directly,
+rather than failing the request.
+"""
+
+import logging
+import math
+import pickle
+import random
+import threading
+import time
+import zlib
+from collections import namedtuple
+from importlib import import_module
+
+from flask import current_app
+
+from extensions import cache
+
+logger = logging.getLogger(__name__)
+
+# How long a computation may hold the lock before another worker may take over
+LOCK_TIMEOUT = 30
+# How long a worker waits for another one's computation before doing its own
+LOCK_WAIT = 5
+LOCK_POLL_INTERVAL = 0.05
+# Pickled values larger than this are compressed
+COMPRESS_THRESHOLD = 16 * 1024
+# Early expiration: higher refreshes earlier (1.0 is the usual choice)
+DEFAULT_BETA = 1.0
+
+# What is stored under the key: the pickled value plus when it expires
+# (time.time()) and how long it took to compute, in seconds
+Entry = namedtuple('Entry', 'data compressed expires_at delta')
+
+
+def _lock_key(key):
+    return f'lock:{key}'
+
+
+def _pack(value, timeout, delta):
+    data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    compressed = len(data) > COMPRESS_THRESHOLD
+    if compressed:
+        data = zlib.compress(data)
+    expires_at = time.time() + timeout if timeout else math.inf
+    return Entry(data, compressed, expires_at, delta)
+
+
+def _unpack(entry):
+    data = zlib.decompress(entry.data) if entry.compressed else entry.data
+    return pickle.loads(data)
+
+
+def _should_refresh(entry, beta):
+    """True once the entry has expired, and with growing probability as it nears expiry"""
+    return time.time() - entry.delta * beta * math.log(1.0 - random.random()) >= entry.expires_at
+
+
+def _timeout(timeout):
+    return current_app.config.get('CACHE_DEFAULT_TIMEOUT', 300) if timeout is None else timeout
+
+
+def store(key, value, timeout=None, stale=0, delta=0.0):
+    """
+    Cache ``value`` under ``key`` for ``timeout`` seconds, plus ``stale``
+    seconds during which remember() still serves it while refreshing it
+    """
+    timeout = _timeout(timeout)
+    try:
+        cache.set(key, _pack(value, timeout, delta), timeout=timeout + stale if timeout else 0)
+    except Exception as e:
+        logger.warning('Could not cache %s: %s', key, e)
+    return value
+
+
+def refresh(key, compute, timeout=None, stale=0):
+    """Compute the value of ``key`` now and replace the cached entry; returns the value"""
+    started = time.monotonic()
+    value = compute()
+    return store(key, value, timeout, stale, time.monotonic() - started)
+
+
+def peek(key):
+    """The cached value of ``key``, fresh or stale, or None"""
+    entry = cache.get(key)
+    return _unpack(entry) if entry is not None else None
+
+
+def invalidate(key):
+    """Drop the cached value of ``key``, e.g. after the rows behind it change"""
+    try:
+        cache.delete(key)
+    except Exception as e:
+        logger.warning('Could not invalidate %s: %s', key, e)
+
+
+def _refresh_and_unlock(key, compute, timeout, stale):
+    try:
+        refresh(key, compute, timeout, stale)
+    except Exception:
+        logger.exception('Background refresh of %s failed', key)
+    finally:
+        cache.delete(_lock_key(key))
+
+
+def _refresh_thread(app, key, compute, timeout, stale):
+    with app.app_context():
+        _refresh_and_unlock(key, compute, timeout, stale)
+
+
+def refresh_by_name(key, function, timeout=None, stale=0):
+    """Refresh ``key`` with the function named 'module:qualname' and release its lock (refresh_cached)"""
+    module, name = function.split(':')
+    _refresh_and_unlock(key, getattr(import_module(module), name), timeout, stale)
+
+
+def _refresh_in_background(key, compute, timeout, stale, background):
+    if background == 'celery':
+        from tasks import refresh_cached
+        try:
+            refresh_cached.delay(key, f'{compute.__module__}:{compute.__qualname__}', timeout, stale)
+            return
+        except Exception as e:
+            # No broker: refresh in a thread instead
+            logger.warning('Could not queue a refresh of %s: %s', key, e)
+    app = current_app._get_current_object()
+    threading.Thread(target=_refresh_thread, args=(app, key, compute, timeout, stale), daemon=True).start()
+
+
+def remember(key, compute, timeout=None, stale=0, beta=DEFAULT_BETA, background='thread'):
+    """
+    The cached value of ``key``, computed with ``compute()`` (which must not
+    return None) on a miss.
+
+    ``timeout`` is how long a value stays fresh (CACHE_DEFAULT_TIMEOUT by
+    default); ``stale`` how much longer it is served while being refreshed
+    in the background. ``background`` is 'thread', or 'celery' to refresh
+    in the refresh_cached task, for module-level functions only.
+    """
+    try:
+        entry = cache.get(key)
+        if entry is None:
+            locked = cache.add(_lock_key(key), 1, timeout=LOCK_TIMEOUT)
+        elif _should_refresh(entry, beta):
+            # One reader refreshes; everyone, that one included, gets the current value meanwhile
+            if cache.add(_lock_key(key), 1, timeout=LOCK_TIMEOUT):
+                _refresh_in_background(key, compute, timeout, stale, background)
+            return _unpack(entry)
+        else:
+            return _unpack(entry)
+    except Exception as e:
+        logger.warning('Cache unavailable for %s, computing it: %s', key, e)
+        return compute()
+
+    if locked:
+        try:
+            return refresh(key, compute, timeout, stale)
+        finally:
+            cache.delete(_lock_key(key))
+
+    deadline = time.monotonic() + LOCK_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(LOCK_POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return _unpack(entry)
+    logger.warning('Gave up waiting %ss for %s to be computed; computing it here', LOCK_WAIT, key)
+    return compute()
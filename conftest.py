@@ -0,0 +1,68 @@
+"""
+Shared test fixtures: a web app on a fresh SQLite database whose first user
+is an admin, and a test client signed in as that admin.
+
+A test module adds its own rows by overriding ``app`` (``def app(app):``)
+and its own settings by overriding ``app_config``.
+"""
+
+import pytest
+
+from app import create_app
+from extensions import db
+from models import User
+
+
+@pytest.fixture
+def app_config():
+    """Settings merged over the test defaults"""
+    return {}
+
+
+@pytest.fixture
+def make_app(tmp_path):
+    """``make_app(**config)``: a web app on an empty database in tmp_path, tables created"""
+
+    def make(**config):
+        app = create_app(dict({
+            'TESTING': True,
+            'WTF_CSRF_ENABLED': False,
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'test.db'}",
+            'UPLOAD_FOLDER': str(tmp_path / 'uploads'),
+            'IMAGE_PIPELINE': 'off',
+        }, **config), profile='web')
+        with app.app_context():
+            db.create_all()
+        return app
+
+    return make
+
+
+@pytest.fixture
+def app(make_app, app_config):
+    """The app with one user, the admin (id 1)"""
+    app = make_app(**app_config)
+    with app.app_context():
+        db.session.add(User(username='admin', email='admin@example.com', password_hash='x', role='admin',
+                            first_name='Ada', last_name='Admin'))
+        db.session.commit()
+    return app
+
+
+@pytest.fixture
+def login():
+    """``login(client, user_id)`` signs the test client in as that user"""
+
+    def login(client, user_id):
+        with client.session_transaction() as session:
+            session['_user_id'] = str(user_id)
+            session['_fresh'] = True
+        return client
+
+    return login
+
+
+@pytest.fixture
+def client(app, login):
+    """A test client signed in as the admin"""
+    return login(app.test_client(), 1)
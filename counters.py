@@ -0,0 +1,176 @@
+"""
+Denormalized counters, so list pages don't COUNT on every view:
+
+- Classroom.student_count: students whose classroom_id points at it
+- Classroom.faculty_count: active ClassroomAssignment rows
+- Course.active_enrollment_count: active Enrollment rows
+- Department.approved_review_count / rating_sum: approved StudentReviews
+
+Counters are recomputed rather than incremented, with one UPDATE per table
+setting each counter to a correlated COUNT/SUM over the child rows:
+
+- on flush, for the parents whose child rows were added, deleted or changed
+  (tracked per row, so both the old and the new classroom of a student who
+  moves are refreshed);
+- on commit, after a bulk ORM statement (update(User), INSERT ... SELECT,
+  ...), whose rows cannot be told apart, for every parent whose counter
+  no longer matches.
+
+reconcile() does the latter for every table and is run periodically by the
+reconcile_counters task, to repair drift from writes that bypass the
+session (raw SQL, psql) or from concurrent transactions.
+"""
+
+import logging
+
+from sqlalchemy import event, func, inspect, or_, select, update
+
+from extensions import db
+from models import Classroom, ClassroomAssignment, Course, Department, Enrollment, StudentReview, User
+
+logger = logging.getLogger(__name__)
+
+# Child model: (parent model, foreign key, other columns that change the counters)
+TRACKED = {
+    User: (Classroom, 'classroom_id', ('role',)),
+    ClassroomAssignment: (Classroom, 'classroom_id', ('is_active',)),
+    Enrollment: (Course, 'course_id', ('is_active',)),
+    StudentReview: (Department, 'department_id', ('is_approved', 'rating')),
+}
+
+
+def _counter_values(model):
+    """Counter column name: correlated subquery computing its value"""
+    if model is Classroom:
+        return {
+            'student_count': select(func.count(User.id))
+            .where(User.classroom_id == Classroom.id, User.role == 'student').scalar_subquery(),
+            'faculty_count': select(func.count(ClassroomAssignment.id))
+            .where(ClassroomAssignment.classroom_id == Classroom.id, ClassroomAssignment.is_active == True)
+            .scalar_subquery(),
+        }
+    if model is Course:
+        return {
+            'active_enrollment_count': select(func.count(Enrollment.id))
+            .where(Enrollment.course_id == Course.id, Enrollment.is_active == True).scalar_subquery(),
+        }
+    if model is Department:
+        approved = (StudentReview.department_id == Department.id, StudentReview.is_approved == True)
+        return {
+            'approved_review_count': select(func.count(StudentReview.id)).where(*approved).scalar_subquery(),
+            'rating_sum': select(func.coalesce(func.sum(StudentReview.rating), 0)).where(*approved)
+            .scalar_subquery(),
+        }
+    raise ValueError(f'{model.__name__} has no counters')
+
+
+def refresh(connection, model, ids=None):
+    """
+    Recompute the counters of ``model`` for the given primary keys, or only
+    where they have drifted if ``ids`` is None. Returns the rows updated.
+    """
+    values = _counter_values(model)
+    statement = update(model.__table__).values(values)
+    if ids is None:
+        statement = statement.where(or_(*(model.__table__.c[name] != value for name, value in values.items())))
+    elif ids:
+        statement = statement.where(model.__table__.c.id.in_(ids))
+    else:
+        return 0
+    return connection.execute(statement).rowcount
+
+
+def reconcile(session=None):
+    """Repair every drifted counter; returns {table: rows repaired}"""
+    session = session or db.session
+    connection = session.connection()
+    repaired = {model.__tablename__: refresh(connection, model) for model in (Classroom, Course, Department)}
+    _expire(session, dict.fromkeys((Classroom, Course, Department)))
+    if any(repaired.values()):
+        logger.warning('Repaired drifted counters: %s', repaired)
+    return repaired
+
+
+def _expire(session, stale):
+    """Expire loaded counters so the next access reads the refreshed values"""
+    for state in list(session.identity_map.all_states()):
+        ids = stale.get(state.class_, ())
+        if ids is None or state.identity[0] in ids:
+            session.expire(state.obj(), list(_counter_values(state.class_)))
+
+
+# Tracking
+
+def _parent_ids(obj, foreign_key, columns, changed_only):
+    state = inspect(obj)
+    if changed_only and not any(state.attrs[name].history.has_changes() for name in (foreign_key, *columns)):
+        return set()
+    # Both the old and the new parent of a changed row
+    return {value for value in state.attrs[foreign_key].history.sum() if value is not None}
+
+
+def _after_flush(session, flush_context):
+    touched = session.info.setdefault('counters', {})
+    for objects, changed_only in ((session.new, False), (session.dirty, True), (session.deleted, False)):
+        for obj in objects:
+            tracked = TRACKED.get(type(obj))
+            if tracked is None:
+                continue
+            parent, foreign_key, columns = tracked
+            ids = _parent_ids(obj, foreign_key, columns, changed_only)
+            if ids:
+                touched.setdefault(parent, set()).update(ids)
+
+
+def _after_flush_postexec(session, flush_context):
+    touched = session.info.pop('counters', None)
+    if not touched:
+        return
+    connection = session.connection()
+    for model, ids in touched.items():
+        refresh(connection, model, ids)
+    _expire(session, touched)
+
+
+def _do_orm_execute(orm_execute_state):
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    tracked = TRACKED.get(mapper.class_) if mapper is not None else None
+    if tracked is not None:
+        orm_execute_state.session.info.setdefault('stale_counters', set()).add(tracked[0])
+
+
+def _before_commit(session):
+    stale = session.info.pop('stale_counters', None)
+    if not stale:
+        return
+    connection = session.connection()
+    for model in stale:
+        refresh(connection, model)
+    _expire(session, dict.fromkeys(stale))
+
+
+def _after_rollback(session, previous_transaction):
+    session.info.pop('counters', None)
+    session.info.pop('stale_counters', None)
+
+
+def _load_old_value(target, value, oldvalue, initiator):
+    pass
+
+
+def init_counters(db):
+    """Keep the counter columns up to date on every flush and commit"""
+    if event.contains(db.session, 'after_flush', _after_flush):
+        return
+    for model, (parent, foreign_key, columns) in TRACKED.items():
+        for name in (foreign_key, *columns):
+            # Load the previous value on assignment, even if expired, so the
+            # flush history has the old parent to refresh
+            event.listen(getattr(model, name), 'set', _load_old_value, active_history=True)
+    event.listen(db.session, 'after_flush', _after_flush)
+    event.listen(db.session, 'after_flush_postexec', _after_flush_postexec)
+    event.listen(db.session, 'do_orm_execute', _do_orm_execute)
+    event.listen(db.session, 'before_commit', _before_commit)
+    event.listen(db.session, 'after_soft_rollback', _after_rollback)
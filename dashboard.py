@@ -0,0 +1,86 @@
+"""
+Admin dashboard snapshot.
+
+Everything admin_dashboard shows is computed into one snapshot dict: the
+student/faculty/department counts, the latest announcements and new
+enquiries, and attendance totals per day for the last 30 days. The
+refresh_dashboard_snapshot Celery task recomputes it every minute and
+stores it in the cache; the view renders from the cached copy. Should the
+task fall behind, the view serves the last snapshot for up to
+SNAPSHOT_STALE seconds while one worker recomputes it in the background,
+and only computes it itself (once, under a lock, see caching.py) when the
+cache has none. The snapshot carries its ``computed_at`` time, which the
+page shows.
+
+The snapshot holds plain dicts, not model instances, so it can be pickled
+into Redis and rendered without a database session.
+"""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import case, func, select
+
+from caching import refresh, remember
+from extensions import db
+from models import Announcement, Attendance, Department, Enquiry, User
+
+SNAPSHOT_KEY = 'admin_dashboard_snapshot'
+# Fresh for 1.5 refresh intervals, so the task normally replaces it first
+SNAPSHOT_TIMEOUT = 90
+# Then served while a request refreshes it, if the task has stopped
+SNAPSHOT_STALE = 600
+RECENT_ITEMS = 5
+ATTENDANCE_DAYS = 30
+
+
+def _count(model, *criteria):
+    return db.session.scalar(select(func.count(model.id)).where(*criteria))
+
+
+def compute_snapshot():
+    """Run the dashboard queries and return the snapshot"""
+    announcements = db.session.execute(
+        select(Announcement.title, Announcement.content, Announcement.category,
+               Announcement.is_pinned, Announcement.created_at)
+        .where(Announcement.is_active == True)
+        .order_by(Announcement.created_at.desc())
+        .limit(RECENT_ITEMS)
+    ).mappings()
+    enquiries = db.session.execute(
+        select(Enquiry.name, Enquiry.email, Enquiry.course_interested, Enquiry.status, Enquiry.created_at)
+        .where(Enquiry.status == 'new')
+        .order_by(Enquiry.created_at.desc())
+        .limit(RECENT_ITEMS)
+    ).mappings()
+    since = datetime.now().date() - timedelta(days=ATTENDANCE_DAYS)
+    attendance = db.session.execute(
+        select(
+            Attendance.date,
+            func.count(Attendance.id).label('total_records'),
+            func.sum(case((Attendance.status == 'present', 1), else_=0)).label('present_count'),
+        )
+        .where(Attendance.date >= since)
+        .group_by(Attendance.date)
+        .order_by(Attendance.date.desc())
+        .limit(10)
+    ).mappings()
+
+    return {
+        'computed_at': datetime.now(),
+        'total_students': _count(User, User.role == 'student', User.is_active == True),
+        'total_faculty': _count(User, User.role == 'faculty', User.is_active == True),
+        'total_departments': _count(Department, Department.is_active == True),
+        'recent_announcements': [dict(row) for row in announcements],
+        'recent_enquiries': [dict(row) for row in enquiries],
+        'attendance_stats': [dict(row) for row in attendance],
+    }
+
+
+def refresh_snapshot():
+    """Recompute the snapshot and replace the cached copy"""
+    return refresh(SNAPSHOT_KEY, compute_snapshot, SNAPSHOT_TIMEOUT, SNAPSHOT_STALE)
+
+
+def get_snapshot():
+    """The cached snapshot, computed here if the cache has none"""
+    return remember(SNAPSHOT_KEY, compute_snapshot, SNAPSHOT_TIMEOUT, SNAPSHOT_STALE)
@@ -1,8 +1,11 @@
+import logging
 import pandas as pd
 import re
 from werkzeug.security import generate_password_hash
 from models import User, Classroom
-from app import db
+from extensions import db
+
+logger = logging.getLogger(__name__)
 
 def validate_email(email):
     """Validate email format"""
@@ -150,30 +153,17 @@ def create_students_from_data(valid_data):
     created_students = []
     failed_students = []
     
-    print(f"DEBUG: create_students_from_data called with {len(valid_data)} students")
+    logger.debug('Creating %d students from import data', len(valid_data))
     
     try:
         for i, student_data in enumerate(valid_data):
-            print(f"DEBUG: Processing student {i+1}: {student_data.get('first_name')} {student_data.get('last_name')}")
             try:
                 # Get classroom info if classroom_id is provided
-                year = None
-                semester = None
-                section = None
-                
-                print(f"DEBUG: Student classroom_id: {student_data.get('classroom_id')}")
+                classroom = None
                 if student_data.get('classroom_id'):
                     classroom = Classroom.query.get(student_data['classroom_id'])
-                    print(f"DEBUG: Found classroom: {classroom}")
-                    if classroom:
-                        year = classroom.year
-                        semester = classroom.semester
-                        section = classroom.section
-                        print(f"DEBUG: Assigned year={year}, semester={semester}, section={section} from classroom {classroom.name}")
-                    else:
-                        print(f"DEBUG: Classroom not found for ID {student_data['classroom_id']}")
-                else:
-                    print("DEBUG: No classroom_id provided")
+                    if not classroom:
+                        logger.warning('Classroom %s not found for imported student', student_data['classroom_id'])
                 
                 # Create new user
                 user = User(
@@ -186,14 +176,12 @@ def create_students_from_data(valid_data):
                     department=student_data['department'],
                     student_id=student_data['student_id'],
                     role='student',
-                    is_active=True,
-                    classroom_id=student_data['classroom_id'],
-                    year=year,
-                    semester=semester,
-                    section=section
+                    is_active=True
                 )
+                if classroom:
+                    # The classroom's department wins over the import's default
+                    user.set_classroom(classroom)
                 
-                print(f"DEBUG: Created user object for {student_data['first_name']} {student_data['last_name']}")
                 db.session.add(user)
                 created_students.append({
                     'name': f"{student_data['first_name']} {student_data['last_name']}",
@@ -202,17 +190,16 @@ def create_students_from_data(valid_data):
                 })
                 
             except Exception as e:
-                print(f"DEBUG: Error creating student {i+1}: {str(e)}")
+                logger.warning('Error creating imported student on row %d: %s', i + 1, e)
                 failed_students.append({
                     'name': f"{student_data['first_name']} {student_data['last_name']}",
                     'email': student_data['email'],
                     'error': str(e)
                 })
         
-        print(f"DEBUG: Committing {len(created_students)} students to database...")
         # Commit all changes
         db.session.commit()
-        print(f"DEBUG: Successfully committed {len(created_students)} students")
+        logger.info('Committed %d imported students', len(created_students))
         
         return {
             'success': True,
@@ -0,0 +1,80 @@
+"""
+Streaming CSV and XLSX exports.
+
+Rows come from streaming.stream_rows() (a server-side cursor on PostgreSQL)
+and are written out as they arrive, so an export of a million attendance
+records runs in bounded memory.
+
+CSV responses are generated while the query runs and the first bytes go out
+immediately. XLSX files are zip archives that can only be finished once every
+row is known; openpyxl's write-only mode spools the rows to a temporary file
+and the finished workbook is then streamed from disk in chunks.
+"""
+
+import csv
+import io
+import tempfile
+from datetime import datetime
+
+from flask import Response, stream_with_context
+
+CHUNK_SIZE = 64 * 1024
+FORMATS = ('csv', 'xlsx')
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+
+def _safe(value):
+    """Stop spreadsheet apps from evaluating cell text as a formula"""
+    if isinstance(value, str) and value[:1] in ('=', '+', '-', '@', '\t', '\r'):
+        return "'" + value
+    return value
+
+
+def _csv_chunks(header, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write('\ufeff')  # BOM so Excel opens UTF-8 correctly
+    writer.writerow(header)
+    # Send the header straight away, before the query has produced anything
+    yield buffer.getvalue().encode('utf-8')
+    buffer.seek(0)
+    buffer.truncate()
+    for row in rows:
+        writer.writerow([_safe(value) for value in row])
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
+
+
+def _xlsx_chunks(title, header, rows):
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title[:31])
+    sheet.append(header)
+    for row in rows:
+        sheet.append([_safe(value) for value in row])
+    with tempfile.TemporaryFile() as spool:
+        workbook.save(spool)
+        spool.seek(0)
+        for chunk in iter(lambda: spool.read(CHUNK_SIZE), b''):
+            yield chunk
+
+
+def export_response(fmt, name, header, rows):
+    """
+    Streaming download of ``rows`` (an iterable of sequences) as CSV or XLSX.
+    ``name`` becomes the file name, with today's date appended.
+    """
+    filename = f"{name}_{datetime.now().strftime('%Y-%m-%d')}.{fmt}"
+    if fmt == 'xlsx':
+        body, mimetype = _xlsx_chunks(name, header, rows), XLSX_MIMETYPE
+    else:
+        body, mimetype = _csv_chunks(header, rows), 'text/csv; charset=utf-8'
+    response = Response(stream_with_context(body), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    # Tell nginx not to buffer the whole download before passing it on
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
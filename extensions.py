@@ -1,18 +1,15 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
 from flask_caching import Cache
+from flask_wtf.csrf import CSRFProtect
 from sqlalchemy.orm import DeclarativeBase
-import os
 
 class Base(DeclarativeBase):
     pass
 
 db = SQLAlchemy(model_class=Base)
 login_manager = LoginManager()
+csrf = CSRFProtect()
 
-# Configure caching
-cache = Cache(config={
-    'CACHE_TYPE': 'redis',
-    'CACHE_REDIS_URL': os.getenv('REDIS_URL', 'redis://localhost:6379/0'),
-    'CACHE_DEFAULT_TIMEOUT': 300  # 5 minutes default
-})
\ No newline at end of file
+# Configured from the app config (CACHE_*, see app.create_app)
+cache = Cache()
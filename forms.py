@@ -2,7 +2,48 @@ from flask_wtf import FlaskForm
 from flask_wtf.file import FileField, FileAllowed
 from wtforms import StringField, PasswordField, TextAreaField, SelectField, SelectMultipleField, DateField, IntegerField, BooleanField, DateTimeField, HiddenField, SubmitField
 from wtforms.validators import DataRequired, Email, Length, EqualTo, Optional, NumberRange
+from wtforms.validators import ValidationError
 from wtforms.widgets import TextArea
+from models import User
+
+
+def user_choice_label(user):
+    """'Name (student or faculty ID)' for a User or a row with the same columns"""
+    return f"{user.first_name} {user.last_name} ({user.student_id or user.faculty_id or 'N/A'})"
+
+
+class UserPickerField(SelectMultipleField):
+    """
+    User IDs chosen with the typeahead picker (static/js/user-picker.js)
+    instead of a list of every user. Set ``query`` to the users that may be
+    picked (by default the active users of ``role``, if given); submitted IDs
+    are checked against it with one IN query, and only those users become
+    choices, so a re-rendered form keeps the selection.
+    """
+
+    def __init__(self, label=None, validators=None, role=None, **kwargs):
+        kwargs.setdefault('coerce', int)
+        super().__init__(label, validators, choices=[], **kwargs)
+        self.role = role
+        self.query = None
+
+    def allowed_users(self):
+        if self.query is not None:
+            return self.query
+        if self.role is not None:
+            return User.query.filter_by(role=self.role, is_active=True)
+        raise ValueError(f'UserPickerField {self.name!r} has no query: set form.{self.name}.query in the view')
+
+    def pre_validate(self, form):
+        if not self.data:
+            return
+        rows = self.allowed_users().filter(User.id.in_(set(self.data))).with_entities(
+            User.id, User.first_name, User.last_name, User.student_id, User.faculty_id
+        ).all()
+        self.choices = [(row.id, user_choice_label(row)) for row in rows]
+        missing = set(self.data) - {row.id for row in rows}
+        if missing:
+            raise ValidationError(f'{len(missing)} of the selected users can no longer be picked here.')
 
 class LoginForm(FlaskForm):
     email = StringField('Email', validators=[DataRequired(), Email()])
@@ -149,7 +190,19 @@ class EnrollmentForm(FlaskForm):
     
 class BulkEnrollmentForm(FlaskForm):
     course_id = SelectField('Course', coerce=int, validators=[DataRequired()])
-    student_ids = SelectMultipleField('Students', coerce=int, validators=[DataRequired()])
+    student_ids = UserPickerField('Students', validators=[Optional()], role='student')
+    classroom_id = SelectField('Every Student in Classroom', coerce=int, validators=[Optional()],
+                               choices=[(0, 'No Classroom')])
+    department = SelectField('Every Student in Department', validators=[Optional()],
+                             choices=[('', 'No Department')])
+    
+    def validate(self, extra_validators=None):
+        if not super().validate(extra_validators):
+            return False
+        if not (self.student_ids.data or self.classroom_id.data or self.department.data):
+            self.student_ids.errors.append('Pick students, a classroom or a department.')
+            return False
+        return True
 
 class ClassroomForm(FlaskForm):
     name = StringField('Classroom Name', validators=[DataRequired(), Length(max=100)])
@@ -187,7 +240,7 @@ class ClassroomForm(FlaskForm):
 
 class ClassroomAssignmentForm(FlaskForm):
     classroom_id = SelectField('Classroom', coerce=int, validators=[DataRequired()])
-    user_ids = SelectMultipleField('Students/Faculty', coerce=int, validators=[DataRequired()])
+    user_ids = UserPickerField('Students/Faculty', validators=[DataRequired()])
     user_type = SelectField('User Type', validators=[DataRequired()],
                            choices=[('student', 'Students'), ('faculty', 'Faculty')])
 
@@ -0,0 +1,136 @@
+"""
+Gunicorn configuration for production.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Worker count and type come from the machine unless overridden:
+    GUNICORN_WORKER_CLASS   gthread (default), sync or gevent
+    GUNICORN_WORKERS        defaults to 2*CPU+1 for sync, CPU+1 otherwise
+    GUNICORN_MAX_WORKERS    upper bound for the computed default, default 8
+    GUNICORN_THREADS        threads per gthread worker, default 4
+    GUNICORN_CONNECTIONS    concurrent greenlets per gevent worker, default 200
+    GUNICORN_PRELOAD        load the app once in the master, default on (never with gevent)
+    GUNICORN_BIND / PORT    listen address, default 0.0.0.0:5000
+    GUNICORN_TIMEOUT        worker timeout in seconds, default 120
+
+With preload on, the master imports the app once and forks workers from it,
+so code and read-only data are shared copy-on-write. The master never serves
+requests, but it did open database connections while importing, so each
+worker disposes of the inherited pool right after fork and the logging
+listener thread (which does not survive fork) is restarted.
+
+Schema creation and the default admin check run once before any worker
+starts instead of in every worker: on the app the master preloaded, or,
+without preload, in a ``flask init-db`` subprocess for the same app URI.
+The hooks always use the app gunicorn was told to serve (wsgi:app, main:app).
+
+gevent workers monkey-patch the standard library after fork, which is too
+late for anything the master imported: sockets, locks and database
+connections created before the patch stay blocking. So with gevent the app
+is never preloaded. psycopg2 talks to PostgreSQL in C, outside the
+patched sockets; install psycogreen (``pip install psycogreen``) or every
+query blocks the whole worker.
+"""
+
+import gc
+import os
+import subprocess
+import sys
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def _cpu_count():
+    try:
+        # Respects container CPU pinning, unlike os.cpu_count()
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _default_workers(worker_class, cpus, max_workers):
+    if worker_class == 'sync':
+        # Sync workers block on every DB call, so oversubscribe the CPUs
+        workers = 2 * cpus + 1
+    else:
+        # Threads/greenlets provide the I/O concurrency; one process per core
+        workers = cpus + 1
+    return max(2, min(workers, max_workers))
+
+
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread').lower()
+if worker_class == 'gevent':
+    try:
+        import gevent  # noqa: F401
+    except ImportError:
+        worker_class = 'gthread'
+
+bind = os.environ.get('GUNICORN_BIND', f"0.0.0.0:{os.environ.get('PORT', '5000')}")
+workers = _env_int('GUNICORN_WORKERS', _default_workers(worker_class, _cpu_count(),
+                                                        _env_int('GUNICORN_MAX_WORKERS', 8)))
+if worker_class == 'gthread':
+    threads = _env_int('GUNICORN_THREADS', 4)
+elif worker_class == 'gevent':
+    worker_connections = _env_int('GUNICORN_CONNECTIONS', 200)
+
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1').lower() in ('1', 'true', 'yes')
+if worker_class == 'gevent':
+    # The master must not import the app before the workers patch the stdlib
+    preload_app = False
+timeout = _env_int('GUNICORN_TIMEOUT', 120)
+graceful_timeout = 30
+keepalive = 5
+# Recycle workers now and then so slow leaks (e.g. pandas in Excel imports) cannot accumulate
+max_requests = _env_int('GUNICORN_MAX_REQUESTS', 2000)
+max_requests_jitter = max_requests // 10
+
+accesslog = '-'
+errorlog = '-'
+
+
+def on_starting(server):
+    """Create tables and the default admin once, before any worker starts"""
+    if not preload_app:
+        # Keep the app out of the master (gevent has to patch before it is imported)
+        subprocess.run([sys.executable, '-m', 'flask', '--app', server.app.app_uri, 'init-db'], check=True)
+    else:
+        from app import init_db
+        from extensions import db
+
+        # The app the master preloaded, whichever module it came from
+        app = server.app.wsgi()
+        init_db(app)
+        with app.app_context():
+            db.engine.dispose()
+    server.log.info('Database initialised; starting %s %s workers', workers, worker_class)
+
+
+def when_ready(server):
+    # Move everything loaded so far into the permanent generation so the
+    # collector does not touch (and un-share) those pages in the workers
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    from logging_config import setup_logging
+
+    setup_logging()
+
+    if worker_class == 'gevent':
+        try:
+            from psycogreen.gevent import patch_psycopg
+            patch_psycopg()
+        except ImportError:
+            server.log.warning('psycogreen is not installed; psycopg2 calls will block the gevent loop')
+
+    if preload_app:
+        from extensions import db
+
+        app = server.app.wsgi()
+        with app.app_context():
+            # Drop connections inherited from the master without closing them,
+            # the master still owns the sockets
+            db.engine.dispose(close=False)
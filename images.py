@@ -0,0 +1,273 @@
+"""
+Responsive variants for uploaded images.
+
+Uploads are saved as-is by utils.save_uploaded_file, which leaves phone photos
+at several megabytes with their EXIF data (camera, GPS position) intact. After
+the upload is committed a Celery task (tasks.process_uploaded_image) stores a
+copy of the original without metadata, points the record at it, and renders
+it at a few widths as WebP, AVIF when the Pillow build supports it, and the
+original format as a fallback:
+
+    static/uploads/banners/<sha256>.jpg
+    static/uploads/banners/_variants/<sha256>-640.webp
+    static/uploads/banners/_variants/<sha256>-640.jpg
+    ...
+
+Uploads are content-addressed (see uploads.py) and variants are named after
+the file they were made from, so every URL here is immutable; files are never
+rewritten in place.
+
+The result is stored on the model's ``image_variants`` JSON column and turned
+into ``srcset`` strings by ``responsive_image()`` for the public API. Until the
+task has run (or when it fails) the column is null and clients fall back to
+the plain image URL, so uploads never wait on image processing.
+
+Which models carry images is listed in IMAGE_FIELDS; ``init_image_pipeline``
+watches those columns and queues the task whenever one changes.
+
+Config:
+    IMAGE_PIPELINE      'celery' (default) or 'off'
+    UPLOAD_URL_PREFIX   URL the upload folder is served from, default /static/uploads/
+"""
+
+import io
+import logging
+import os
+
+from sqlalchemy import event, inspect
+
+from storage import get_storage
+from uploads import UPLOAD_FIELDS, VARIANT_DIR, store_stream, upload_url
+
+logger = logging.getLogger(__name__)
+
+VARIANT_WIDTHS = (320, 640, 1280, 1920)
+# Originals larger than this are scaled down when they are rewritten
+MAX_ORIGINAL_WIDTH = 2560
+QUALITY = {'webp': 80, 'avif': 60, 'jpeg': 82}
+# Refuse to decode anything bigger than this (decompression bombs)
+MAX_PIXELS = 40_000_000
+
+# Every tracked upload column holds an image
+IMAGE_FIELDS = UPLOAD_FIELDS
+
+FALLBACK_FORMATS = {'JPEG': 'jpeg', 'PNG': 'png', 'GIF': 'png'}
+EXTENSIONS = {'webp': 'webp', 'avif': 'avif', 'jpeg': 'jpg', 'png': 'png'}
+MIME_TYPES = {'webp': 'image/webp', 'avif': 'image/avif', 'jpeg': 'image/jpeg', 'png': 'image/png'}
+
+
+def avif_supported():
+    from PIL import features
+
+    try:
+        # Registers the AVIF codec on Pillow builds that lack it
+        import pillow_avif  # noqa: F401
+    except ImportError:
+        pass
+    from PIL import Image
+    return 'AVIF' in Image.SAVE or bool(features.check('avif'))
+
+
+def _open(storage, key):
+    from PIL import Image, ImageOps
+
+    Image.MAX_IMAGE_PIXELS = MAX_PIXELS
+    with storage.open(key) as source:
+        image = Image.open(source)
+        image.load()
+    source_format = image.format
+    # Apply the EXIF orientation before the EXIF data is dropped
+    image = ImageOps.exif_transpose(image)
+    return image, source_format
+
+
+def _flatten(image, fmt):
+    """Convert to a mode the target format can store"""
+    has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+    if fmt == 'jpeg':
+        if has_alpha:
+            from PIL import Image
+
+            rgba = image.convert('RGBA')
+            background = Image.new('RGB', rgba.size, (255, 255, 255))
+            background.paste(rgba, mask=rgba.getchannel('A'))
+            return background
+        return image.convert('RGB') if image.mode != 'RGB' else image
+    if has_alpha:
+        return image.convert('RGBA') if image.mode != 'RGBA' else image
+    return image.convert('RGB') if image.mode not in ('RGB', 'L') else image
+
+
+def _encode(image, fmt):
+    options = {}
+    if fmt in QUALITY:
+        options['quality'] = QUALITY[fmt]
+    if fmt == 'jpeg':
+        options.update(optimize=True, progressive=True)
+    elif fmt == 'png':
+        options['optimize'] = True
+    elif fmt == 'webp':
+        options['method'] = 4
+    # No exif/xmp arguments: nothing but the pixels (and the colour profile) is written
+    icc_profile = image.info.get('icc_profile')
+    if icc_profile:
+        options['icc_profile'] = icc_profile
+    buffer = io.BytesIO()
+    _flatten(image, fmt).save(buffer, format=fmt.upper(), **options)
+    buffer.seek(0)
+    return buffer
+
+
+def _resize(image, width):
+    from PIL import Image
+
+    height = max(1, round(image.height * width / image.width))
+    resized = image.resize((width, height), Image.LANCZOS)
+    resized.info = dict(image.info)
+    return resized
+
+
+def generate_variants(relative_path, storage=None, widths=VARIANT_WIDTHS):
+    """
+    Store a metadata-free copy of an uploaded image and write its responsive
+    variants.
+
+    Returns the dict stored in ``image_variants``:
+        {'original': 'banners/<sha256>.jpg', 'width': 1280, 'height': 720,
+         'variants': {'webp': [{'width': 320, 'path': 'banners/_variants/<sha256>-320.webp'}, ...], ...}}
+    where ``original`` is the stripped copy the record should point at, or
+    None when the file is not a still image Pillow can read.
+    """
+    from PIL import Image, UnidentifiedImageError
+
+    storage = storage or get_storage()
+    try:
+        image, source_format = _open(storage, relative_path)
+    except (FileNotFoundError, UnidentifiedImageError, Image.DecompressionBombError, OSError) as e:
+        logger.warning('Cannot process image %s: %s', relative_path, e)
+        return None
+
+    if getattr(image, 'is_animated', False) or source_format not in FALLBACK_FORMATS:
+        # Animated GIFs would lose their frames; leave them (and anything unknown) alone
+        return None
+
+    fallback = FALLBACK_FORMATS[source_format]
+    if image.width > MAX_ORIGINAL_WIDTH:
+        image = _resize(image, MAX_ORIGINAL_WIDTH)
+
+    folder, filename = os.path.split(relative_path)
+    original = relative_path
+    if source_format != 'GIF':
+        # Store the original again, minus EXIF/XMP (GIFs carry neither)
+        original = store_stream(_encode(image, fallback), folder, filename, storage)
+
+    formats = ['webp'] + (['avif'] if avif_supported() else []) + [fallback]
+    sizes = sorted({w for w in widths if w < image.width} | {image.width})
+
+    stem = os.path.splitext(os.path.basename(original))[0]
+    variant_folder = os.path.join(folder, VARIANT_DIR)
+
+    variants = {fmt: [] for fmt in formats}
+    for width in sizes:
+        resized = image if width == image.width else _resize(image, width)
+        for fmt in formats:
+            path = os.path.join(variant_folder, f'{stem}-{width}.{EXTENSIONS[fmt]}').replace('\\', '/')
+            storage.put(path, _encode(resized, fmt), MIME_TYPES[fmt])
+            variants[fmt].append({'width': width, 'path': path})
+
+    return {'original': original, 'width': image.width, 'height': image.height, 'variants': variants}
+
+
+def responsive_image(image_variants):
+    """
+    srcset-ready description of an image for API clients:
+
+        {'width': 1280, 'height': 720,
+         'sources': [{'type': 'image/avif', 'srcset': '/static/uploads/... 320w, ...'}, ...],
+         'srcset': '<fallback format srcset>'}
+
+    ``sources`` is ordered best format first, matching <picture><source> order.
+    """
+    if not image_variants or not image_variants.get('variants'):
+        return None
+    variants = image_variants['variants']
+
+    def srcset(entries):
+        return ', '.join(f"{upload_url(entry['path'])} {entry['width']}w" for entry in entries)
+
+    sources = [{'type': MIME_TYPES[fmt], 'srcset': srcset(variants[fmt])}
+               for fmt in ('avif', 'webp') if variants.get(fmt)]
+    fallback = next((variants[fmt] for fmt in ('jpeg', 'png') if variants.get(fmt)), [])
+    return {
+        'width': image_variants.get('width'),
+        'height': image_variants.get('height'),
+        'sources': sources,
+        'srcset': srcset(fallback),
+    }
+
+
+# Queueing
+
+def _changed_images(session):
+    """(model, object, field) for every image column changed in this flush"""
+    for obj in list(session.new) + list(session.dirty):
+        model = type(obj).__name__
+        field = IMAGE_FIELDS.get(model)
+        if field is None:
+            continue
+        history = inspect(obj).attrs[field].history
+        if history.has_changes() and history.added:
+            yield model, obj, field
+
+
+def _before_flush(session, flush_context, instances):
+    pending = session.info.setdefault('image_pipeline', {'objects': []})
+    for model, obj, field in _changed_images(session):
+        # The old variants go with the old file (see uploads.release)
+        obj.image_variants = None
+        pending['objects'].append((model, obj, field))
+
+
+def _after_flush(session, flush_context):
+    # Primary keys exist now; keep plain values so nothing is loaded after commit
+    pending = session.info.get('image_pipeline')
+    if not pending:
+        return
+    jobs = pending.setdefault('jobs', [])
+    for model, obj, field in pending['objects']:
+        path = getattr(obj, field)
+        if path:
+            jobs.append((model, obj.id, path))
+    pending['objects'] = []
+
+
+def _after_commit(session):
+    pending = session.info.pop('image_pipeline', None)
+    if not pending:
+        return
+    from flask import current_app
+
+    if current_app.config.get('IMAGE_PIPELINE', 'celery') == 'off':
+        return
+    from tasks import process_uploaded_image
+
+    for model, object_id, path in pending.get('jobs', []):
+        try:
+            # Fail fast if the broker is down; the upload itself has succeeded
+            process_uploaded_image.apply_async((model, object_id, path), retry=False)
+        except Exception as e:
+            logger.warning('Could not queue image processing for %s %s: %s', model, object_id, e)
+
+
+def _after_rollback(session, previous_transaction):
+    session.info.pop('image_pipeline', None)
+
+
+def init_image_pipeline(db):
+    """Queue variant generation whenever an image column is committed"""
+    if event.contains(db.session, 'before_flush', _before_flush):
+        return
+    event.listen(db.session, 'before_flush', _before_flush)
+    event.listen(db.session, 'after_flush', _after_flush)
+    event.listen(db.session, 'after_commit', _after_commit)
+    event.listen(db.session, 'after_soft_rollback', _after_rollback)
@@ -0,0 +1,188 @@
+"""
+Structured logging setup.
+
+Log records are written as JSON lines (or plain text with LOG_FORMAT=text)
+tagged with the id of the request that produced them. Handlers only push
+records onto an in-memory queue; a QueueListener thread does the actual
+stdout I/O so request threads never block on it.
+
+Environment variables:
+    LOG_LEVEL         root level, default INFO
+    LOG_LEVELS        per-module overrides, e.g. "routes=DEBUG,sqlalchemy.engine=WARNING"
+    LOG_FORMAT        "json" (default) or "text"
+    LOG_SAMPLE_RATES  per-event sampling, e.g. "attendance.batch_insert=0.1"
+
+High-volume call sites tag their records with an event name so they can be
+sampled: ``logger.info('...', extra={'event': 'attendance.batch_insert'})``.
+"""
+
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import uuid
+from datetime import datetime, timezone
+
+from flask import g, has_request_context, request
+
+# Attributes present on every LogRecord; anything else was passed via ``extra``
+_RESERVED_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_listener = None
+
+
+def _parse_mapping(value):
+    """Parse "a=1,b=2" into {'a': '1', 'b': '2'}"""
+    mapping = {}
+    for item in (value or '').split(','):
+        if '=' in item:
+            key, val = item.split('=', 1)
+            mapping[key.strip()] = val.strip()
+    return mapping
+
+
+class RequestContextFilter(logging.Filter):
+    """Attach the current request id, method and path to every record"""
+
+    def filter(self, record):
+        if has_request_context():
+            record.request_id = g.get('request_id')
+            record.method = request.method
+            record.path = request.path
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Drop a fraction of records tagged with a sampled ``event`` name"""
+
+    def __init__(self, rates, rng=None):
+        super().__init__()
+        self.rates = {event: float(rate) for event, rate in rates.items()}
+        self.rng = rng or random.Random()
+
+    def filter(self, record):
+        rate = self.rates.get(getattr(record, 'event', None))
+        if rate is None or rate >= 1:
+            return True
+        keep = self.rng.random() < rate
+        if keep:
+            record.sample_rate = rate
+        return keep
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED_ATTRS and not key.startswith('_') and value is not None:
+                entry[key] = value
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exc_info'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)s [%(name)s] %(message)s')
+
+    def format(self, record):
+        message = super().format(record)
+        request_id = getattr(record, 'request_id', None)
+        return f'{message} request_id={request_id}' if request_id else message
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that keeps the traceback separate from the message"""
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def setup_logging(stream=None):
+    """
+    Route all logging through a QueueHandler on the root logger.
+
+    Safe to call more than once; later calls restart the listener thread, which
+    is what a forked worker needs since threads do not survive fork().
+    """
+    global _listener
+
+    if _listener is not None:
+        try:
+            _listener.stop()
+        except Exception:
+            pass
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = _QueueHandler(log_queue)
+    queue_handler.addFilter(RequestContextFilter())
+    queue_handler.addFilter(SamplingFilter(_parse_mapping(os.environ.get('LOG_SAMPLE_RATES'))))
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    if os.environ.get('LOG_FORMAT', 'json').lower() == 'text':
+        output.setFormatter(TextFormatter())
+    else:
+        output.setFormatter(JsonFormatter())
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(os.environ.get('LOG_LEVEL', 'INFO').upper())
+
+    for name, level in _parse_mapping(os.environ.get('LOG_LEVELS')).items():
+        logging.getLogger(name).setLevel(level.upper())
+
+    _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def ensure_logging():
+    """Set up logging unless this process already has (create_app calls this)"""
+    if _listener is None:
+        setup_logging()
+
+
+def stop_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(stop_logging)
+
+
+def init_request_logging(app):
+    """Assign every request an id, honouring an upstream X-Request-ID header"""
+
+    @app.before_request
+    def _assign_request_id():
+        g.request_id = request.headers.get('X-Request-ID') or uuid.uuid4().hex
+
+    @app.after_request
+    def _return_request_id(response):
+        request_id = g.get('request_id')
+        if request_id:
+            response.headers['X-Request-ID'] = request_id
+        return response
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Move uploads saved under the old random names (name_<uuid8>.jpg) into the
+content-addressed store used by uploads.py, and point the records at them.
+
+Duplicate files collapse into one: static/uploads/departments/eec_30e060ed.jpg
+and eec_b8aa0a16.jpg hold the same bytes and end up as a single
+departments/<sha256>.jpg. Old files are deleted once nothing references them.
+
+Files are read from UPLOAD_FOLDER and written to the configured storage
+backend, so with UPLOAD_STORAGE=s3 this also copies them into the bucket
+(the local files are then left in place).
+
+    python migrate_content_addressed_uploads.py            # migrate
+    python migrate_content_addressed_uploads.py --dry-run  # only report
+"""
+
+import argparse
+import os
+import sys
+from sqlalchemy.exc import SQLAlchemyError
+
+
+def migrate(dry_run=False):
+    import models
+    from app import create_app
+    from extensions import db
+    from uploads import (UPLOAD_FIELDS, is_content_addressed, relative_upload_path, release,
+                         store_file, upload_url_prefix)
+
+    app = create_app({'IMAGE_PIPELINE': 'off'}, profile='worker')
+    upload_folder = app.config['UPLOAD_FOLDER']
+    with app.app_context():
+        old_paths = set()
+        for model_name, field in UPLOAD_FIELDS.items():
+            model = getattr(models, model_name)
+            column = getattr(model, field)
+            rows = db.session.execute(
+                db.select(model.id, column).where(column.isnot(None), column != '')
+            ).all()
+            moved = 0
+            for object_id, stored in rows:
+                path = relative_upload_path(stored)
+                if is_content_addressed(path):
+                    continue
+                source = os.path.join(upload_folder, path)
+                if not os.path.exists(source):
+                    print(f"⚠️  {model_name} {object_id}: {stored} is missing on disk")
+                    continue
+                if dry_run:
+                    print(f"   {model_name} {object_id}: {stored}")
+                    moved += 1
+                    continue
+                new_path = store_file(source, os.path.dirname(path), path)
+                new_value = upload_url_prefix() + new_path if stored.startswith(upload_url_prefix()) else new_path
+                # Core update: nothing to queue or release through the session hooks
+                db.session.execute(db.update(model).where(model.id == object_id).values({column: new_value}))
+                old_paths.add(path)
+                moved += 1
+            db.session.commit()
+            print(f"✅ {model_name}: {moved} of {len(rows)} uploads {'to move' if dry_run else 'moved'}")
+
+        if not dry_run:
+            with db.engine.connect() as connection:
+                removed = sum(release(connection, path, grace_seconds=0) for path in old_paths)
+            print(f"✅ Deleted {removed} old files")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dry-run', action='store_true', help='list the uploads that would be moved')
+    args = parser.parse_args()
+
+    print("🔄 Moving uploads to content-addressed names...")
+    try:
+        migrate(dry_run=args.dry_run)
+    except SQLAlchemyError as e:
+        print(f"❌ Database error: {e}")
+        sys.exit(1)
+    print("✅ Migration completed successfully!")
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Generate the image variants used by images.py for images uploaded before
+the pipeline existed. The image_variants columns themselves come from
+migration 0004 (``flask --app app db-upgrade``).
+
+    python migrate_image_variants.py
+
+The processing runs in this process instead of queueing Celery tasks, so it
+works without a broker.
+"""
+
+import sys
+from sqlalchemy.exc import SQLAlchemyError
+
+
+def backfill():
+    import models
+    import tasks
+    from app import create_app
+    from extensions import db
+    from images import IMAGE_FIELDS
+
+    app = create_app({'IMAGE_PIPELINE': 'off'}, profile='worker')
+    tasks._flask_app = app
+    with app.app_context():
+        for model_name, field in IMAGE_FIELDS.items():
+            model = getattr(models, model_name)
+            column = getattr(model, field)
+            pending = db.session.execute(
+                db.select(model.id, column).where(column.isnot(None), column != '', model.image_variants.is_(None))
+            ).all()
+            db.session.commit()
+            for object_id, path in pending:
+                # Same work the Celery task does, run here
+                print(f"   {tasks.process_uploaded_image(model_name, object_id, path)}")
+            print(f"✅ {model_name}: processed {len(pending)} images")
+
+
+if __name__ == "__main__":
+    print("🔄 Generating variants for existing images...")
+    try:
+        backfill()
+    except SQLAlchemyError as e:
+        print(f"❌ Database error: {e}")
+        sys.exit(1)
+    print("✅ Backfill completed successfully!")
@@ -0,0 +1,55 @@
+"""
+Alembic schema migrations.
+
+A new database gets its tables from db.create_all() and is stamped with the
+latest revision (see app.create_tables). Existing databases are brought up to
+date with ``flask db-upgrade``, which runs the revisions in versions/ and
+first stamps a database that predates migrations with BASELINE, the schema
+create_all() produced before revisions existed.
+
+New revisions: ``alembic revision --autogenerate -m "..."``, then edit the
+result to use helpers.py for anything that must not lock a live table.
+"""
+
+import os
+
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from sqlalchemy import inspect
+
+# The schema create_all() produced before revisions existed (before the counter
+# and image_variants columns)
+BASELINE = '0001'
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'alembic.ini')
+
+
+def alembic_config():
+    return Config(ALEMBIC_INI)
+
+
+def current_revision(connection):
+    return MigrationContext.configure(connection).get_current_revision()
+
+
+def stamp(revision='head'):
+    """Record ``revision`` as applied without running anything; call inside an app context"""
+    command.stamp(alembic_config(), revision)
+
+
+def upgrade(revision='head'):
+    """
+    Run the pending revisions up to ``revision``; call inside an app
+    context. An empty database is left to create_tables().
+    """
+    from extensions import db
+
+    with db.engine.connect() as connection:
+        if not inspect(connection).has_table('user'):
+            return False
+        legacy = current_revision(connection) is None
+    if legacy:
+        stamp(BASELINE)
+    command.upgrade(alembic_config(), revision)
+    return True
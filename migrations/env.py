@@ -0,0 +1,57 @@
+"""
+Alembic environment: runs against the app's database and models
+
+Each revision runs in a transaction of its own, so one that uses
+helpers.autocommit_block() (CREATE INDEX CONCURRENTLY, batched backfills)
+does not hold locks taken by the others. On SQLite, autogenerate renders
+ALTERs in batch mode (copy and swap the table), the only way SQLite can
+change most columns and constraints.
+"""
+
+from alembic import context
+from flask import current_app, has_app_context
+
+
+def _app():
+    if has_app_context():
+        return current_app._get_current_object()
+    from app import create_app
+    return create_app(profile='worker')
+
+
+def run_migrations_offline():
+    import models  # noqa: F401
+    from extensions import db
+
+    with _app().app_context():
+        context.configure(
+            url=db.engine.url.render_as_string(hide_password=False),
+            target_metadata=db.metadata,
+            literal_binds=True,
+            render_as_batch=db.engine.dialect.name == 'sqlite',
+            transaction_per_migration=True,
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+def run_migrations_online():
+    import models  # noqa: F401
+    from extensions import db
+
+    with _app().app_context():
+        with db.engine.connect() as connection:
+            context.configure(
+                connection=connection,
+                target_metadata=db.metadata,
+                render_as_batch=connection.dialect.name == 'sqlite',
+                transaction_per_migration=True,
+            )
+            with context.begin_transaction():
+                context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
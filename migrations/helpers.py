@@ -0,0 +1,109 @@
+"""
+Building blocks for revisions that run against a live database.
+
+- create_index()/drop_index() build and drop indexes CONCURRENTLY on
+  PostgreSQL, so writes to the table carry on during the build. They are
+  idempotent, which also covers databases whose tables create_all() made
+  with the index already in place.
+- add_columns() adds columns that are missing, through batch mode so the
+  same revision works on SQLite.
+- backfill() fills a column in primary-key ranges, committing each batch,
+  instead of one UPDATE that locks every row until it finishes.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+BACKFILL_BATCH_SIZE = 5000
+
+
+def is_postgresql():
+    return op.get_bind().dialect.name == 'postgresql'
+
+
+def autocommit_block():
+    """
+    Run statements outside the revision's transaction: required for
+    CONCURRENTLY, and lets a backfill commit batch by batch
+    """
+    return op.get_context().autocommit_block()
+
+
+def _columns(table):
+    return {column['name'] for column in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def _invalid_index(name):
+    """True if a failed CREATE INDEX CONCURRENTLY left ``name`` behind, unusable"""
+    return bool(op.get_bind().execute(sa.text(
+        "SELECT 1 FROM pg_index JOIN pg_class ON pg_class.oid = pg_index.indexrelid "
+        "WHERE pg_class.relname = :name AND NOT pg_index.indisvalid"
+    ), {'name': name}).first())
+
+
+def create_index(name, table, columns, **kw):
+    """
+    CREATE INDEX IF NOT EXISTS, CONCURRENTLY on PostgreSQL. Takes
+    op.create_index() keywords such as unique=True, postgresql_where=,
+    sqlite_where= and postgresql_include=.
+    """
+    if not is_postgresql():
+        op.create_index(name, table, columns, if_not_exists=True, **kw)
+        return
+    with autocommit_block():
+        if _invalid_index(name):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+        op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True, **kw)
+
+
+def drop_index(name, table):
+    """DROP INDEX IF EXISTS, CONCURRENTLY on PostgreSQL"""
+    if not is_postgresql():
+        op.drop_index(name, table_name=table, if_exists=True)
+        return
+    with autocommit_block():
+        op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+
+def add_columns(table, *columns):
+    """Add the columns ``table`` does not have yet; returns the names added"""
+    existing = _columns(table)
+    missing = [column for column in columns if column.name not in existing]
+    if missing:
+        with op.batch_alter_table(table) as batch:
+            for column in missing:
+                batch.add_column(column)
+    return [column.name for column in missing]
+
+
+def drop_columns(table, *names):
+    """Drop the named columns that ``table`` still has (batch mode, so SQLite copies the table)"""
+    existing = _columns(table)
+    present = [name for name in names if name in existing]
+    if present:
+        with op.batch_alter_table(table) as batch:
+            for name in present:
+                batch.drop_column(name)
+
+
+def backfill(table, values, *criteria, batch_size=None):
+    """
+    UPDATE ``table`` (a sa.table() with an ``id`` column) SET ``values``
+    for the rows matching ``criteria``, ``batch_size`` ids at a time
+    (BACKFILL_BATCH_SIZE by default) with a commit after each batch.
+    Returns the number of rows updated.
+    """
+    batch_size = batch_size or BACKFILL_BATCH_SIZE
+    bind = op.get_bind()
+    low, high = bind.execute(sa.select(sa.func.min(table.c.id), sa.func.max(table.c.id))).one()
+    if low is None:
+        return 0
+    updated = 0
+    with autocommit_block():
+        for start in range(low, high + 1, batch_size):
+            updated += bind.execute(
+                sa.update(table)
+                .where(table.c.id.between(start, start + batch_size - 1), *criteria)
+                .values(values)
+            ).rowcount
+    return updated
@@ -0,0 +1,19 @@
+"""Baseline: the schema db.create_all() built before migrations
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 00:00:00
+"""
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    pass
+
+
+def downgrade():
+    pass
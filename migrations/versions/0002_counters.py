@@ -0,0 +1,66 @@
+"""Denormalized counters on classroom, course and department
+
+Adds the columns counters.py maintains and fills them in from the child
+rows, a batch of ids at a time.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 00:00:00
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations import helpers
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+COUNTERS = {
+    'classroom': ('student_count', 'faculty_count'),
+    'course': ('active_enrollment_count',),
+    'department': ('approved_review_count', 'rating_sum'),
+}
+
+classroom = sa.table('classroom', sa.column('id'), sa.column('student_count'), sa.column('faculty_count'))
+course = sa.table('course', sa.column('id'), sa.column('active_enrollment_count'))
+department = sa.table('department', sa.column('id'), sa.column('approved_review_count'), sa.column('rating_sum'))
+user = sa.table('user', sa.column('id'), sa.column('classroom_id'), sa.column('role'))
+assignment = sa.table('classroom_assignments', sa.column('id'), sa.column('classroom_id'), sa.column('is_active'))
+enrollment = sa.table('enrollment', sa.column('id'), sa.column('course_id'), sa.column('is_active'))
+review = sa.table('student_review', sa.column('id'), sa.column('department_id'), sa.column('is_approved'),
+                  sa.column('rating'))
+
+
+def _count(table, *criteria):
+    return sa.select(sa.func.count(table.c.id)).where(*criteria).scalar_subquery()
+
+
+def upgrade():
+    for table, names in COUNTERS.items():
+        helpers.add_columns(table, *(
+            sa.Column(name, sa.Integer(), nullable=False, server_default='0') for name in names
+        ))
+
+    helpers.backfill(classroom, {
+        'student_count': _count(user, user.c.classroom_id == classroom.c.id, user.c.role == 'student'),
+        'faculty_count': _count(assignment, assignment.c.classroom_id == classroom.c.id,
+                                assignment.c.is_active == sa.true()),
+    })
+    helpers.backfill(course, {
+        'active_enrollment_count': _count(enrollment, enrollment.c.course_id == course.c.id,
+                                          enrollment.c.is_active == sa.true()),
+    })
+    approved = (review.c.department_id == department.c.id, review.c.is_approved == sa.true())
+    helpers.backfill(department, {
+        'approved_review_count': _count(review, *approved),
+        'rating_sum': sa.select(sa.func.coalesce(sa.func.sum(review.c.rating), 0)).where(*approved)
+        .scalar_subquery(),
+    })
+
+
+def downgrade():
+    for table, names in COUNTERS.items():
+        helpers.drop_columns(table, *names)
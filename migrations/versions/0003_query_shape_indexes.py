@@ -0,0 +1,52 @@
+"""Indexes tuned to the app's query shapes (see benchmarks/index_advisor.py)
+
+- attendance: (student_id, date) carrying status, and (marked_by, date,
+  student_id), replace the two-column indexes; (status, date) is dropped
+- announcement: partial WHERE is_active indexes for the listings
+- classroom_assignments: (assigned_at) is dropped
+
+Indexes are built before the ones they replace are dropped, CONCURRENTLY
+on PostgreSQL, so reads keep an index and writes are not blocked.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 00:00:00
+"""
+
+import sqlalchemy as sa
+
+from migrations import helpers
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+active = sa.column('is_active') == sa.true()
+
+
+def upgrade():
+    helpers.create_index('idx_attendance_student_date_status', 'attendance', ['student_id', 'date'],
+                         postgresql_include=['status'])
+    helpers.create_index('idx_attendance_marker_date_student', 'attendance', ['marked_by', 'date', 'student_id'])
+    helpers.create_index('idx_announcement_active_category', 'announcement',
+                         ['category', 'is_pinned', 'created_at'], postgresql_where=active, sqlite_where=active)
+    helpers.create_index('idx_announcement_active_pinned', 'announcement', ['is_pinned', 'created_at'],
+                         postgresql_where=active, sqlite_where=active)
+
+    helpers.drop_index('idx_attendance_student_date', 'attendance')
+    helpers.drop_index('idx_attendance_marked_by_date', 'attendance')
+    helpers.drop_index('idx_attendance_status_date', 'attendance')
+    helpers.drop_index('idx_assignment_assigned_at', 'classroom_assignments')
+
+
+def downgrade():
+    helpers.create_index('idx_attendance_student_date', 'attendance', ['student_id', 'date'])
+    helpers.create_index('idx_attendance_marked_by_date', 'attendance', ['marked_by', 'date'])
+    helpers.create_index('idx_attendance_status_date', 'attendance', ['status', 'date'])
+    helpers.create_index('idx_assignment_assigned_at', 'classroom_assignments', ['assigned_at'])
+
+    helpers.drop_index('idx_announcement_active_pinned', 'announcement')
+    helpers.drop_index('idx_announcement_active_category', 'announcement')
+    helpers.drop_index('idx_attendance_marker_date_student', 'attendance')
+    helpers.drop_index('idx_attendance_student_date_status', 'attendance')
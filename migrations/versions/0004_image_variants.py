@@ -0,0 +1,30 @@
+"""image_variants on every table that stores an uploaded image (see images.py)
+
+The variants themselves are generated by the image pipeline; images
+uploaded before this revision are processed by migrate_image_variants.py.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 00:00:00
+"""
+
+import sqlalchemy as sa
+
+from migrations import helpers
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+TABLES = ('user', 'department', 'lecturer', 'student_review', 'banner')
+
+
+def upgrade():
+    for table in TABLES:
+        helpers.add_columns(table, sa.Column('image_variants', sa.JSON()))
+
+
+def downgrade():
+    for table in TABLES:
+        helpers.drop_columns(table, 'image_variants')
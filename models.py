@@ -15,6 +15,7 @@ class User(UserMixin, db.Model):
     address = db.Column(db.Text)
     date_of_birth = db.Column(db.Date)
     profile_image = db.Column(db.String(200))
+    image_variants = db.Column(db.JSON)  # Resized copies, see images.py
     department = db.Column(db.String(100))
     year = db.Column(db.Integer)  # 1, 2, 3, 4 for students
     semester = db.Column(db.Integer)  # 1, 2, 3, 4, 5, 6, 7, 8
@@ -60,6 +61,15 @@ class User(UserMixin, db.Model):
     def get_full_name(self):
         return f"{self.first_name} {self.last_name}"
 
+    # Copied from the student's classroom for filtering; see set_classroom()
+    CLASSROOM_FIELDS = ('department', 'year', 'semester', 'section')
+
+    def set_classroom(self, classroom):
+        """Put the student in ``classroom`` (or in none), copying its department/year/semester/section"""
+        self.classroom_id = classroom.id if classroom else None
+        for field in self.CLASSROOM_FIELDS:
+            setattr(self, field, getattr(classroom, field) if classroom else None)
+
     def __repr__(self):
         return f'<User {self.username}>'
 
@@ -70,8 +80,12 @@ class Department(db.Model):
     program = db.Column(db.String(20), nullable=False)  # UG, PG, Diploma
     description = db.Column(db.Text)
     image = db.Column(db.String(200))  # Department image for website
+    image_variants = db.Column(db.JSON)  # Resized copies, see images.py
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     is_active = db.Column(db.Boolean, default=True)
+    # Maintained by counters.py
+    approved_review_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_sum = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     
     # Relationships
     lecturers = db.relationship('Lecturer', backref='department', lazy=True, cascade='all, delete-orphan')
@@ -81,11 +95,9 @@ class Department(db.Model):
         return len([l for l in self.lecturers if l.is_active])
     
     def get_average_rating(self):
-        if not self.student_reviews:
+        if not self.approved_review_count:
             return 0
-        total_rating = sum(review.rating for review in self.student_reviews if review.is_approved)
-        approved_reviews = len([r for r in self.student_reviews if r.is_approved])
-        return round(total_rating / approved_reviews, 1) if approved_reviews > 0 else 0
+        return round(self.rating_sum / self.approved_review_count, 1)
     
     def __repr__(self):
         return f'<Department {self.name}>'
@@ -94,6 +106,7 @@ class Lecturer(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     photo = db.Column(db.String(200))  # Profile photo
+    image_variants = db.Column(db.JSON)  # Resized copies, see images.py
     experience = db.Column(db.String(100))  # e.g., "5 years"
     qualification = db.Column(db.String(200))  # Educational qualification
     specialization = db.Column(db.String(200))  # Area of expertise
@@ -112,6 +125,7 @@ class StudentReview(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     student_name = db.Column(db.String(100), nullable=False)
     photo = db.Column(db.String(200))  # Student photo
+    image_variants = db.Column(db.JSON)  # Resized copies, see images.py
     review_text = db.Column(db.Text, nullable=False)
     rating = db.Column(db.Integer, nullable=False)  # 1 to 5 stars
     department_id = db.Column(db.Integer, db.ForeignKey('department.id'), nullable=False)
@@ -136,6 +150,9 @@ class Classroom(db.Model):
     academic_year = db.Column(db.String(20))  # e.g., "2023-24"
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     is_active = db.Column(db.Boolean, default=True)
+    # Maintained by counters.py
+    student_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    faculty_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     
     # Add unique constraint to prevent duplicate classrooms
     __table_args__ = (
@@ -168,6 +185,7 @@ class Course(db.Model):
     faculty_id = db.Column(db.Integer, db.ForeignKey('user.id'))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     is_active = db.Column(db.Boolean, default=True)
+    active_enrollment_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # See counters.py
     
     # Relationships
     course_attendance = db.relationship('Attendance', backref='course', lazy=True)
@@ -206,12 +224,11 @@ class Attendance(db.Model):
     __table_args__ = (
         # For date-based queries
         db.Index('idx_attendance_date', date),
-        # For student attendance history
-        db.Index('idx_attendance_student_date', student_id, date),
-        # For faculty marking history
-        db.Index('idx_attendance_marked_by_date', marked_by, date),
-        # For status-based queries
-        db.Index('idx_attendance_status_date', status, date),
+        # For student attendance history; status is carried along so the
+        # per-student summaries don't read the rows (PostgreSQL)
+        db.Index('idx_attendance_student_date_status', student_id, date, postgresql_include=['status']),
+        # For faculty marking history and the re-mark delete in faculty_attendance
+        db.Index('idx_attendance_marker_date_student', marked_by, date, student_id),
         # For course attendance
         db.Index('idx_attendance_course_date', course_id, date),
     )
@@ -236,6 +253,16 @@ class Announcement(db.Model):
     # Relationships
     creator = db.relationship('User', backref='announcements')
 
+    # Listings show active announcements, pinned first then newest
+    __table_args__ = (
+        # For /api/events and category filters
+        db.Index('idx_announcement_active_category', category, is_pinned, created_at,
+                 postgresql_where=is_active == True, sqlite_where=is_active == True),
+        # For /api/announcements
+        db.Index('idx_announcement_active_pinned', is_pinned, created_at,
+                 postgresql_where=is_active == True, sqlite_where=is_active == True),
+    )
+
     def __repr__(self):
         return f'<Announcement {self.title}>'
 
@@ -260,6 +287,7 @@ class Banner(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     image_path = db.Column(db.String(300), nullable=False)
+    image_variants = db.Column(db.JSON)  # Resized copies, see images.py
     link_url = db.Column(db.String(500))
     description = db.Column(db.Text)
     display_order = db.Column(db.Integer, default=0)
@@ -356,8 +384,6 @@ class ClassroomAssignment(db.Model):
         db.Index('idx_assignment_user_active', user_id, is_active),
         # For classroom assignment queries
         db.Index('idx_assignment_classroom_active', classroom_id, is_active),
-        # For assignment history
-        db.Index('idx_assignment_assigned_at', assigned_at),
         # For assigner queries
         db.Index('idx_assignment_assigned_by', assigned_by),
     )
@@ -0,0 +1,283 @@
+"""
+Queries and serializers for the public /api/* endpoints.
+
+Shared by the Flask views in blueprints/api.py and the async app in asgi_api.py, so
+both serving modes return identical JSON. Every function here builds a
+SQLAlchemy ``select()`` or works on plain dicts; nothing touches a session,
+which lets the same statement run on ``db.session`` or an ``AsyncSession``.
+Relationships used by the serializers are eager-loaded in the statements
+because lazy loading is not available under asyncio.
+"""
+
+from datetime import date, datetime
+
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload
+from werkzeug.http import http_date
+
+from images import responsive_image
+from uploads import upload_url
+from models import Announcement, Banner, Department, Enquiry, Notification
+
+MAX_LIMIT = 100
+
+
+class ApiError(ValueError):
+    """A client error reported as ``{'success': False, 'message': ...}`` with a 400"""
+
+
+def _flag(args, name, default):
+    return (args.get(name) or default).lower() == 'true'
+
+
+def _limit(args, default):
+    try:
+        limit = int(args.get('limit', default))
+    except (TypeError, ValueError):
+        limit = default
+    if limit > MAX_LIMIT:
+        limit = MAX_LIMIT
+    if limit < 1:
+        limit = 10
+    return limit
+
+
+def _parse_date(value, name):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise ApiError(f'Invalid {name} format. Use YYYY-MM-DD')
+
+
+def json_default(value):
+    """Render dates the way Flask's jsonify does"""
+    if isinstance(value, (date, datetime)):
+        return http_date(value)
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def _creator_name(item):
+    return item.creator.get_full_name() if item.creator else 'Unknown'
+
+
+# Departments
+
+# Cache key of the /api/departments payload (blueprints/api.py)
+DEPARTMENTS_CACHE_KEY = 'api:departments'
+
+
+def departments_query():
+    return select(Department).filter_by(is_active=True).order_by(Department.name)
+
+
+def departments_payload(departments):
+    department_list = [{
+        'id': dept.id,
+        'name': dept.name,
+        'code': dept.code,
+        'program': dept.program,
+        'description': dept.description,
+        'image_url': upload_url(dept.image),
+        'image': responsive_image(dept.image_variants),
+        'created_at': dept.created_at.isoformat() if dept.created_at else None
+    } for dept in departments]
+    return {'success': True, 'departments': department_list, 'total': len(department_list)}
+
+
+# Banners
+
+def banners_query():
+    return (select(Banner).filter_by(is_active=True)
+            .order_by(Banner.display_order, Banner.created_at.desc()))
+
+
+def banners_payload(banners):
+    banner_list = [{
+        'id': banner.id,
+        'title': banner.title,
+        'image_url': banner.image_path,
+        'image': responsive_image(banner.image_variants),
+        'link_url': banner.link_url,
+        'description': banner.description,
+        'display_order': banner.display_order,
+        'created_at': banner.created_at.isoformat() if banner.created_at else None,
+        'created_by': banner.created_by
+    } for banner in banners]
+    return {'success': True, 'banners': banner_list, 'total': len(banner_list)}
+
+
+# Events (announcements with category='event')
+
+def events_filters(args):
+    return {
+        'category': args.get('category', ''),
+        'target_audience': args.get('target_audience', ''),
+        'limit': _limit(args, 3),
+        'active_only': _flag(args, 'active_only', 'true'),
+    }
+
+
+def events_query(filters):
+    query = select(Announcement).options(joinedload(Announcement.creator)).filter(Announcement.category == 'event')
+    if filters['active_only']:
+        query = query.filter_by(is_active=True)
+    if filters['target_audience']:
+        query = query.filter(Announcement.target_audience == filters['target_audience'])
+    return (query.order_by(Announcement.is_pinned.desc(), Announcement.created_at.desc())
+            .limit(filters['limit']))
+
+
+def events_payload(events, filters):
+    events_data = [{
+        'id': event.id,
+        'title': event.title,
+        'content': event.content,
+        'category': event.category,
+        'target_audience': event.target_audience,
+        'is_pinned': event.is_pinned,
+        'created_at': event.created_at.isoformat(),
+        'expires_at': event.expires_at.isoformat() if event.expires_at else None,
+        'creator': _creator_name(event)
+    } for event in events]
+    return {
+        'success': True,
+        'data': events_data,
+        'count': len(events_data),
+        'filters_applied': {
+            'category': 'event',  # Always 'event' for this endpoint
+            'target_audience': filters['target_audience'],
+            'active_only': filters['active_only'],
+            'limit': filters['limit']
+        }
+    }
+
+
+# Announcements
+
+def announcements_filters(args):
+    return {
+        'category': args.get('category', ''),
+        'target_audience': args.get('target_audience', ''),
+        'limit': _limit(args, 50),
+        'active_only': _flag(args, 'active_only', 'true'),
+    }
+
+
+def announcements_query(filters):
+    query = select(Announcement).options(joinedload(Announcement.creator))
+    if filters['active_only']:
+        query = query.filter_by(is_active=True)
+    if filters['category']:
+        query = query.filter(Announcement.category == filters['category'])
+    if filters['target_audience']:
+        query = query.filter(Announcement.target_audience == filters['target_audience'])
+    return (query.order_by(Announcement.is_pinned.desc(), Announcement.created_at.desc())
+            .limit(filters['limit']))
+
+
+def announcements_payload(announcements, filters):
+    announcements_data = [{
+        'id': announcement.id,
+        'title': announcement.title,
+        'content': announcement.content,
+        'category': announcement.category,
+        'event_date': announcement.event_date,
+        'link': announcement.link,
+        'target_audience': announcement.target_audience,
+        'is_pinned': announcement.is_pinned,
+        'created_at': announcement.created_at.isoformat(),
+        'expires_at': announcement.expires_at.isoformat() if announcement.expires_at else None,
+        'creator': _creator_name(announcement)
+    } for announcement in announcements]
+    return {
+        'success': True,
+        'data': announcements_data,
+        'count': len(announcements_data),
+        'filters_applied': dict(filters)
+    }
+
+
+# Notifications
+
+def notifications_filters(args):
+    """Raises ApiError for malformed dates"""
+    filters = {
+        'type': args.get('type', ''),
+        'important_only': _flag(args, 'important_only', 'false'),
+        'active_only': _flag(args, 'active_only', 'true'),
+        'date_from': args.get('date_from', ''),
+        'date_to': args.get('date_to', ''),
+        'limit': _limit(args, 50),
+    }
+    # Validate up front so both serving modes reject bad input before querying
+    if filters['date_from']:
+        _parse_date(filters['date_from'], 'date_from')
+    if filters['date_to']:
+        _parse_date(filters['date_to'], 'date_to')
+    return filters
+
+
+def notifications_query(filters):
+    query = select(Notification).options(joinedload(Notification.creator))
+    if filters['active_only']:
+        query = query.filter_by(is_active=True)
+    if filters['type']:
+        query = query.filter(Notification.notification_type == filters['type'])
+    if filters['important_only']:
+        query = query.filter_by(is_important=True)
+    if filters['date_from']:
+        query = query.filter(Notification.issue_date >= _parse_date(filters['date_from'], 'date_from'))
+    if filters['date_to']:
+        query = query.filter(Notification.issue_date <= _parse_date(filters['date_to'], 'date_to'))
+    return (query.order_by(Notification.is_important.desc(), Notification.issue_date.desc(),
+                           Notification.created_at.desc())
+            .limit(filters['limit']))
+
+
+def notifications_payload(notifications, filters):
+    notifications_data = [{
+        'id': notification.id,
+        'title': notification.title,
+        'content': notification.content,
+        'notification_type': notification.notification_type,
+        'document_url': notification.document_url,
+        'reference_number': notification.reference_number,
+        'issue_date': notification.issue_date.isoformat() if notification.issue_date else None,
+        'is_important': notification.is_important,
+        'created_at': notification.created_at.isoformat(),
+        'creator': _creator_name(notification)
+    } for notification in notifications]
+    return {
+        'success': True,
+        'data': notifications_data,
+        'count': len(notifications_data),
+        'filters_applied': dict(filters)
+    }
+
+
+# Enquiries
+
+def build_enquiry(data):
+    """Validate a website enquiry and return an unsaved Enquiry; raises ApiError"""
+    if not data:
+        raise ApiError('No data provided')
+    for field in ('name', 'email', 'mobile'):
+        if not data.get(field):
+            raise ApiError(f'Missing required field: {field}')
+
+    return Enquiry(
+        name=data.get('name'),
+        email=data.get('email'),
+        phone=data.get('mobile'),
+        message=f"Programme: {data.get('programme', 'Not specified')}\n"
+                f"Branch: {data.get('branch', 'Not specified')}\n"
+                f"State: {data.get('state', 'Not specified')}\n"
+                f"City: {data.get('city', 'Not specified')}",
+        course_interested=data.get('branch', ''),
+        status='new',
+        created_at=datetime.utcnow()
+    )
+
+
+def enquiry_created_payload(enquiry):
+    return {'success': True, 'message': 'Enquiry submitted successfully', 'enquiry_id': enquiry.id}
@@ -0,0 +1,171 @@
+"""
+Per-request SQL statement accounting.
+
+Counts every statement executed while a request is being handled, flags
+statements that run repeatedly with different parameters (the usual sign of a
+lazy load inside a loop) and lets views declare a query budget with
+``@query_budget(n)``.
+
+The monitor is active when the app runs in debug or testing mode, or when
+``QUERY_MONITOR`` is set in the config. Set ``QUERY_BUDGET_RAISE`` to make
+budget overruns raise ``QueryBudgetExceeded`` instead of only being logged,
+which is what the test suite wants.
+"""
+
+import logging
+import time
+from collections import Counter
+from functools import wraps
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# A statement executed this many times in one request is reported as a likely N+1
+DEFAULT_REPEAT_THRESHOLD = 3
+
+_listeners_installed = False
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised when a view runs more statements than its declared budget"""
+
+    def __init__(self, endpoint, budget, count, report):
+        self.endpoint = endpoint
+        self.budget = budget
+        self.count = count
+        self.report = report
+        super().__init__(
+            f'{endpoint} executed {count} SQL statements (budget {budget})\n{report}'
+        )
+
+
+class RequestQueryStats:
+    """Statements seen during a single request"""
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.statements = Counter()
+        self.parameters = {}
+
+    def record(self, statement, parameters, duration):
+        self.count += 1
+        self.total_time += duration
+        self.statements[statement] += 1
+        self.parameters.setdefault(statement, set()).add(_freeze(parameters))
+
+    def repeated(self, threshold=DEFAULT_REPEAT_THRESHOLD):
+        """Statements executed at least ``threshold`` times with differing parameters"""
+        return [
+            (statement, count, len(self.parameters[statement]))
+            for statement, count in self.statements.most_common()
+            if count >= threshold and len(self.parameters[statement]) > 1
+        ]
+
+    def report(self, threshold=DEFAULT_REPEAT_THRESHOLD):
+        lines = [f'{self.count} statements in {self.total_time * 1000:.1f} ms']
+        for statement, count, distinct in self.repeated(threshold):
+            lines.append(f'  N+1? x{count} ({distinct} distinct params): {_shorten(statement)}')
+        return '\n'.join(lines)
+
+
+def _freeze(parameters):
+    try:
+        if isinstance(parameters, dict):
+            return tuple(sorted(parameters.items()))
+        if isinstance(parameters, (list, tuple)):
+            return tuple(_freeze(p) if isinstance(p, (dict, list, tuple)) else p for p in parameters)
+        return parameters
+    except TypeError:
+        return repr(parameters)
+
+
+def _shorten(statement, limit=160):
+    statement = ' '.join(statement.split())
+    return statement if len(statement) <= limit else statement[:limit - 3] + '...'
+
+
+def monitor_enabled(app=None):
+    app = app or current_app
+    return bool(app.config.get('QUERY_MONITOR') or app.debug or app.testing)
+
+
+def current_stats():
+    """Return the stats object for the active request, or None outside a monitored request"""
+    if not has_request_context():
+        return None
+    return g.get('_query_stats')
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and '_query_stats' in g:
+        conn.info.setdefault('_query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current_stats()
+    if stats is None:
+        return
+    starts = conn.info.get('_query_start')
+    duration = time.perf_counter() - starts.pop() if starts else 0.0
+    stats.record(statement, parameters, duration)
+
+
+def init_query_monitor(app):
+    """Install the SQLAlchemy listeners and the per-request hooks on ``app``"""
+    global _listeners_installed
+    if not _listeners_installed:
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        _listeners_installed = True
+
+    app.config.setdefault('QUERY_MONITOR', False)
+    app.config.setdefault('QUERY_BUDGET_RAISE', False)
+    app.config.setdefault('QUERY_REPEAT_THRESHOLD', DEFAULT_REPEAT_THRESHOLD)
+
+    @app.before_request
+    def _start_query_stats():
+        if monitor_enabled(app):
+            g._query_stats = RequestQueryStats()
+
+    @app.after_request
+    def _report_query_stats(response):
+        stats = current_stats()
+        if stats is None:
+            return response
+
+        response.headers['X-Query-Count'] = str(stats.count)
+        threshold = app.config['QUERY_REPEAT_THRESHOLD']
+        if stats.repeated(threshold):
+            logger.warning('%s %s: %s', request.method, request.path, stats.report(threshold))
+        else:
+            logger.debug('%s %s: %s', request.method, request.path, stats.report(threshold))
+        return response
+
+
+def query_budget(max_queries):
+    """
+    Declare the maximum number of SQL statements a view may run per request.
+
+    Place it directly under the route decorator so authentication queries are
+    counted too. Overruns are logged, or raised when QUERY_BUDGET_RAISE is set.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            response = f(*args, **kwargs)
+
+            stats = current_stats()
+            if stats is not None and stats.count > max_queries:
+                report = stats.report(current_app.config.get('QUERY_REPEAT_THRESHOLD', DEFAULT_REPEAT_THRESHOLD))
+                if current_app.config.get('QUERY_BUDGET_RAISE'):
+                    raise QueryBudgetExceeded(request.endpoint, max_queries, stats.count, report)
+                logger.warning('%s exceeded its query budget of %d: %s', request.endpoint, max_queries, report)
+            return response
+
+        decorated_function.query_budget = max_queries
+        return decorated_function
+    return decorator
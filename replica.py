@@ -0,0 +1,129 @@
+"""
+Read-replica routing for reporting queries.
+
+When DATABASE_REPLICA_URL is set, the replica is registered as the
+'replica' bind (SQLALCHEMY_BINDS) and the session can send its SELECTs
+there:
+
+- views decorated with ``@reads_from_replica`` (the admin dashboard and the
+  attendance reports) run their reads on the replica;
+- ``with replica_reads():`` does the same for a block, e.g. in Celery tasks;
+- ``stream_from_replica(rows)`` keeps a streamed response's rows on the
+  replica, since they are read after the view has returned.
+
+Writes always go to the primary: flushes, bulk UPDATE/DELETE/INSERT and
+SELECT ... FOR UPDATE are never routed. A user whose request wrote to the
+primary (a flush or a bulk statement) reads from the primary for the next
+REPLICA_STICKY_SECONDS, so they see their own changes even while the
+replica lags behind.
+
+Without a replica configured all of this is a no-op.
+"""
+
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import g, has_request_context, request, session
+from sqlalchemy import event
+
+REPLICA_BIND = 'replica'
+DEFAULT_STICKY_SECONDS = 10
+
+# db.session.info key: route SELECTs to the replica
+_USE_REPLICA = 'use_replica'
+# Flask session key: the user reads from the primary until this timestamp
+_STICKY_UNTIL = '_primary_until'
+
+
+def replica_engine():
+    """The replica's engine, or None if no replica is configured"""
+    from extensions import db
+    return db.engines.get(REPLICA_BIND)
+
+
+@contextmanager
+def replica_reads():
+    """Send the session's SELECTs to the replica inside the block"""
+    from extensions import db
+
+    info = db.session().info
+    previous = info.get(_USE_REPLICA, False)
+    info[_USE_REPLICA] = True
+    try:
+        yield
+    finally:
+        info[_USE_REPLICA] = previous
+
+
+def stream_from_replica(rows):
+    """
+    Wrap a lazy ``rows`` generator (stream_rows()) so that it reads from the
+    replica if the view it came from does. A streamed body is consumed after
+    the view returns, outside @reads_from_replica's block.
+    """
+    from extensions import db
+
+    if not db.session().info.get(_USE_REPLICA):
+        return rows
+    return _iterate_on_replica(rows)
+
+
+def _iterate_on_replica(rows):
+    with replica_reads():
+        yield from rows
+
+
+def reads_from_primary():
+    """True while the current user's recent writes may not have reached the replica"""
+    return has_request_context() and session.get(_STICKY_UNTIL, 0) > time.time()
+
+
+def reads_from_replica(view):
+    """Run a read-only view's queries on the replica, unless the user has just written"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if request.method not in ('GET', 'HEAD') or reads_from_primary():
+            return view(*args, **kwargs)
+        with replica_reads():
+            return view(*args, **kwargs)
+    return wrapper
+
+
+def _route_to_replica(orm_execute_state):
+    if not orm_execute_state.session.info.get(_USE_REPLICA) or not orm_execute_state.is_select:
+        return
+    if orm_execute_state.statement._for_update_arg is not None or 'bind' in orm_execute_state.bind_arguments:
+        return
+    engine = replica_engine()
+    if engine is not None:
+        orm_execute_state.bind_arguments['bind'] = engine
+
+
+def _note_write(session, flush_context):
+    if has_request_context():
+        g.wrote_to_primary = True
+
+
+def _note_bulk_write(orm_execute_state):
+    # Bulk UPDATE/DELETE/INSERT (bulk.py, Query.delete()) write without a flush
+    if orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert:
+        _note_write(orm_execute_state.session, None)
+
+
+def init_replica(app, db):
+    """Register the routing and read-your-writes listeners"""
+    if not event.contains(db.session, 'do_orm_execute', _route_to_replica):
+        event.listen(db.session, 'do_orm_execute', _route_to_replica)
+        event.listen(db.session, 'do_orm_execute', _note_bulk_write)
+        event.listen(db.session, 'after_flush', _note_write)
+
+    if not app.config.get('SQLALCHEMY_BINDS', {}).get(REPLICA_BIND):
+        return
+    sticky_seconds = app.config.get('REPLICA_STICKY_SECONDS', DEFAULT_STICKY_SECONDS)
+
+    @app.after_request
+    def stick_to_primary(response):
+        if g.get('wrote_to_primary'):
+            session[_STICKY_UNTIL] = time.time() + sticky_seconds
+        return response
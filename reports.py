@@ -0,0 +1,105 @@
+"""
+Attendance report queries shared by the admin overview and faculty reports.
+
+Attendance is totalled per User.classroom_id (an integer key, read from
+idx_user_classroom_role) and the much smaller result is joined to Classroom
+once for its name, department/year/semester/section and student count.
+Filters on department/year/semester/section are applied to Classroom too,
+as a subquery of classroom IDs, rather than to the copies on User.
+"""
+
+from sqlalchemy import case, distinct, func, select
+
+from extensions import db
+from models import Attendance, Classroom, User
+
+
+def classroom_filter(department=None, year=None, semester=None, section=None):
+    """Criteria restricting students to the classrooms matching the filters, or () for no filters"""
+    criteria = [column == value for column, value in (
+        (Classroom.department, department), (Classroom.year, year),
+        (Classroom.semester, semester), (Classroom.section, section),
+    ) if value]
+    if not criteria:
+        return ()
+    return (User.classroom_id.in_(select(Classroom.id).where(*criteria)),)
+
+
+def attendance_by_classroom(*criteria):
+    """
+    One row per classroom with its attendance totals for the records
+    matching ``criteria`` (on Attendance and the student as User). Students
+    without a classroom get a row of their own, whose Classroom columns are
+    None.
+    """
+    totals = select(
+        User.classroom_id,
+        func.count(Attendance.id).label('total_records'),
+        func.sum(case((Attendance.status == 'present', 1), else_=0)).label('present_count'),
+        func.sum(case((Attendance.status == 'absent', 1), else_=0)).label('absent_count'),
+        func.sum(case((Attendance.status == 'late', 1), else_=0)).label('late_count'),
+        func.count(distinct(Attendance.student_id)).label('total_students'),
+        func.count(distinct(Attendance.date)).label('total_days'),
+    ).select_from(Attendance)\
+     .join(User, Attendance.student_id == User.id)\
+     .where(*criteria)\
+     .group_by(User.classroom_id)\
+     .subquery()
+
+    statement = select(
+        totals,
+        Classroom.name,
+        Classroom.department,
+        Classroom.year,
+        Classroom.semester,
+        Classroom.section,
+        Classroom.student_count,
+    ).select_from(totals)
+    return db.session.execute(
+        statement.outerjoin(Classroom, Classroom.id == totals.c.classroom_id)
+        # Students without a classroom last
+        .order_by(Classroom.id.is_(None), Classroom.department, Classroom.year, Classroom.semester,
+                  Classroom.section)
+    ).all()
+
+
+def format_attendance_stat(row):
+    """The dict the report templates show for one attendance_by_classroom() row"""
+    total = row.total_records
+    if total > 0:
+        present_percentage = round((row.present_count / total) * 100, 1)
+        absent_percentage = round((row.absent_count / total) * 100, 1)
+        late_percentage = round((row.late_count / total) * 100, 1)
+    else:
+        present_percentage = absent_percentage = late_percentage = 0
+
+    return {
+        'classroom_id': row.classroom_id,
+        'department': row.department or 'N/A',
+        'year': row.year or 'N/A',
+        'semester': row.semester or 'N/A',
+        'section': row.section or 'N/A',
+        'classroom': row.name or 'No Classroom',
+        'total_records': row.total_records,
+        'present_count': row.present_count,
+        'absent_count': row.absent_count,
+        'late_count': row.late_count,
+        'total_students': row.total_students,
+        'total_days': row.total_days,
+        'present_percentage': present_percentage,
+        'absent_percentage': absent_percentage,
+        'late_percentage': late_percentage,
+        'attendance_rate': present_percentage + late_percentage  # Consider late as attended
+    }
+
+
+def classroom_filter_options(*criteria):
+    """Distinct departments, years, semesters and sections of the active classrooms matching ``criteria``"""
+    options = {}
+    for key, column in (('departments', Classroom.department), ('years', Classroom.year),
+                        ('semesters', Classroom.semester), ('sections', Classroom.section)):
+        values = db.session.scalars(
+            select(column).distinct().where(Classroom.is_active == True, column.isnot(None), *criteria)
+        )
+        options[key] = sorted(value for value in values if value)
+    return options
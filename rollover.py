@@ -0,0 +1,210 @@
+"""
+Semester rollover: move every cohort to its next-semester classroom at once.
+
+A Classroom is a slot, unique on (department, year, semester, section), and a
+cohort moves from slot to slot each term. For every active classroom with
+students, the rollover
+
+- finds or creates the classroom one semester on (reactivating it if it
+  was deactivated) and moves its academic_year along,
+- moves the students there with a single UPDATE over a CASE map of old to
+  new classroom (SQL evaluates SET against the old row, so a cohort can move
+  into a slot whose own students are moving out in the same statement),
+- copies the active faculty assignments to the new classrooms and
+  deactivates (archives) the old ones,
+- unassigns students in final-semester classrooms, who have graduated.
+
+It is one transaction whatever the size: a fixed number of statements plus
+one INSERT per classroom created. plan_rollover() computes the same moves
+without writing anything, for a dry run.
+"""
+
+import logging
+import re
+from datetime import datetime
+
+from sqlalchemy import case, func, select, update
+
+from bulk import dialect_insert
+from extensions import db
+from models import Classroom, ClassroomAssignment, Department, User
+
+logger = logging.getLogger(__name__)
+
+FINAL_SEMESTER = 8
+
+
+def classroom_name(department, section, year, semester):
+    """The name admin_add_classroom gives a classroom: DEPT_CODE SECTION YEAR-SEMESTER"""
+    dept = Department.query.filter_by(name=department).first()
+    dept_code = dept.code if dept else department[:3].upper()
+    return f"{dept_code} {section} {year}-{semester}"
+
+
+def next_academic_year(academic_year, semester):
+    """'2023-24' becomes '2024-25' when a cohort moves into an odd (first-of-year) semester"""
+    match = re.fullmatch(r'(\d{4})-(\d{2}|\d{4})', academic_year or '')
+    if not match or semester % 2 == 0:
+        return academic_year
+    start = int(match.group(1)) + 1
+    end = str(start + 1)[-len(match.group(2)):]
+    return f"{start}-{end}"
+
+
+def _counts(column, classroom_ids, *criteria):
+    if not classroom_ids:
+        return {}
+    rows = db.session.execute(
+        select(column, func.count()).where(column.in_(classroom_ids), *criteria).group_by(column)
+    )
+    return dict(rows.all())
+
+
+def plan_rollover(department=None):
+    """
+    Work out the rollover without changing anything. Returns a JSON-friendly
+    dict with the planned ``moves`` (source and target classroom, whether the
+    target has to be created, how many students and faculty move),
+    ``graduating`` classrooms and totals.
+    """
+    query = Classroom.query.filter(Classroom.is_active == True)
+    if department:
+        query = query.filter(Classroom.department == department)
+    classrooms = query.order_by(Classroom.department, Classroom.section, Classroom.semester).all()
+    ids = [classroom.id for classroom in classrooms]
+
+    students = _counts(User.classroom_id, ids, User.role == 'student')
+    faculty = _counts(ClassroomAssignment.classroom_id, ids, ClassroomAssignment.is_active == True)
+    existing = {
+        (c.department, c.year, c.semester, c.section): c
+        for c in Classroom.query.filter(Classroom.department.in_({c.department for c in classrooms}))
+    }
+
+    moves, graduating = [], []
+    for source in classrooms:
+        if not students.get(source.id):
+            continue
+        if source.semester >= FINAL_SEMESTER:
+            graduating.append({'classroom_id': source.id, 'classroom': source.name,
+                               'students': students[source.id]})
+            continue
+        semester = source.semester + 1
+        year = (semester + 1) // 2
+        target = existing.get((source.department, year, semester, source.section))
+        moves.append({
+            'from_id': source.id,
+            'from': source.name,
+            'to_id': target.id if target else None,
+            'to': target.name if target else classroom_name(source.department, source.section, year, semester),
+            'create': target is None,
+            'reactivate': target is not None and not target.is_active,
+            'department': source.department,
+            'section': source.section,
+            'year': year,
+            'semester': semester,
+            'academic_year': next_academic_year(source.academic_year, semester),
+            'students': students[source.id],
+            'faculty': faculty.get(source.id, 0),
+        })
+
+    return {
+        'department': department,
+        'moves': moves,
+        'graduating': graduating,
+        'students_moved': sum(move['students'] for move in moves),
+        'faculty_moved': sum(move['faculty'] for move in moves),
+        'students_graduating': sum(item['students'] for item in graduating),
+        'classrooms_created': sum(move['create'] for move in moves),
+    }
+
+
+def run_rollover(department=None, dry_run=True, performed_by=None):
+    """
+    Plan the rollover and, unless ``dry_run``, apply it in one transaction.
+    Returns the plan, with ``to_id`` filled in for created classrooms.
+    """
+    plan = plan_rollover(department)
+    if dry_run:
+        return plan
+
+    try:
+        moves = plan['moves']
+        # Create (or reactivate) the target classrooms
+        for move in moves:
+            if move['create']:
+                target = Classroom(name=move['to'], department=move['department'], year=move['year'],
+                                   semester=move['semester'], section=move['section'])
+                db.session.add(target)
+                db.session.flush()
+                move['to_id'] = target.id
+        targets = {move['from_id']: move['to_id'] for move in moves}
+        if targets:
+            db.session.execute(
+                update(Classroom)
+                .where(Classroom.id.in_(targets.values()))
+                .values(is_active=True, academic_year=case(
+                    {move['to_id']: move['academic_year'] for move in moves}, value=Classroom.id
+                ))
+                .execution_options(synchronize_session=False)
+            )
+
+        # Graduates leave their classroom before the next cohort moves in
+        graduating = [item['classroom_id'] for item in plan['graduating']]
+        if graduating:
+            db.session.execute(
+                update(User)
+                .where(User.role == 'student', User.classroom_id.in_(graduating))
+                .values(classroom_id=None)
+                .execution_options(synchronize_session=False)
+            )
+
+        if targets:
+            by_source = {move['from_id']: move for move in moves}
+            db.session.execute(
+                update(User)
+                .where(User.role == 'student', User.classroom_id.in_(targets))
+                .values(
+                    classroom_id=case(targets, value=User.classroom_id),
+                    year=case({source: move['year'] for source, move in by_source.items()},
+                              value=User.classroom_id),
+                    semester=case({source: move['semester'] for source, move in by_source.items()},
+                                  value=User.classroom_id),
+                )
+                .execution_options(synchronize_session=False)
+            )
+
+        # Faculty follow their class: read the pairs, archive the old rows,
+        # then add (or reactivate) the assignments on the new classrooms
+        sources = list(targets) + graduating
+        pairs = db.session.execute(
+            select(ClassroomAssignment.user_id, ClassroomAssignment.classroom_id)
+            .where(ClassroomAssignment.classroom_id.in_(targets), ClassroomAssignment.is_active == True)
+        ).all()
+        db.session.execute(
+            update(ClassroomAssignment)
+            .where(ClassroomAssignment.classroom_id.in_(sources), ClassroomAssignment.is_active == True)
+            .values(is_active=False)
+            .execution_options(synchronize_session=False)
+        )
+        if pairs:
+            now = datetime.utcnow()
+            statement = dialect_insert(ClassroomAssignment).values([
+                {'user_id': user_id, 'classroom_id': targets[classroom_id], 'assigned_at': now,
+                 'assigned_by': performed_by, 'is_active': True}
+                for user_id, classroom_id in pairs
+            ])
+            db.session.execute(statement.on_conflict_do_update(
+                index_elements=['user_id', 'classroom_id'],
+                set_={'is_active': True, 'assigned_at': now, 'assigned_by': performed_by}
+            ))
+
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    db.session.expire_all()
+
+    logger.info('Semester rollover%s: %s students moved, %s graduated, %s classrooms created',
+                f' for {department}' if department else '', plan['students_moved'],
+                plan['students_graduating'], plan['classrooms_created'])
+    return plan
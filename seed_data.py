@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Synthetic dataset generator for load and performance testing
+
+Builds a complete college: departments, classrooms, students, faculty with
+classroom assignments, courses, enrollments and several months of classroom
+attendance, plus enough public content (announcements, notifications,
+banners, lecturers, reviews) to exercise the /api/* endpoints.
+
+All randomness comes from a single seeded RNG, so the same options always
+produce the same rows. Rows are written with bulk INSERTs in chunks and the
+script works against both SQLite and PostgreSQL (whatever DATABASE_URL
+points at).
+
+Example:
+    DATABASE_URL=sqlite:///perf.db python seed_data.py --reset --students 20000 --days 180
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import insert, select
+from werkzeug.security import generate_password_hash
+
+# Department catalogue used for generated data: (name, code, program)
+DEPARTMENTS = [
+    ('Computer Science Engineering', 'CSE', 'UG'),
+    ('Electronics and Communication Engineering', 'ECE', 'UG'),
+    ('Electrical and Electronics Engineering', 'EEE', 'UG'),
+    ('Mechanical Engineering', 'MECH', 'UG'),
+    ('Civil Engineering', 'CIVIL', 'UG'),
+    ('Artificial Intelligence and Machine Learning', 'AIML', 'UG'),
+    ('Artificial Intelligence and Data Science', 'AIDS', 'UG'),
+    ('Master of Business Administration', 'MBA', 'PG'),
+    ('Master of Computer Applications', 'MCA', 'PG'),
+    ('Bachelor of Business Administration', 'BBA', 'UG'),
+    ('Bachelor of Computer Applications', 'BCA', 'UG'),
+    ('Diploma in Computer Engineering', 'DCOMP', 'Diploma'),
+]
+
+FIRST_NAMES = [
+    'Aarav', 'Vivaan', 'Aditya', 'Vihaan', 'Arjun', 'Sai', 'Reyansh', 'Krishna', 'Ishaan', 'Rohan',
+    'Ananya', 'Diya', 'Aadhya', 'Saanvi', 'Pari', 'Anika', 'Navya', 'Kavya', 'Meera', 'Sneha',
+    'Rahul', 'Kiran', 'Lakshmi', 'Priya', 'Ravi', 'Deepak', 'Pooja', 'Harsha', 'Teja', 'Varun',
+]
+LAST_NAMES = [
+    'Reddy', 'Sharma', 'Rao', 'Kumar', 'Naidu', 'Patel', 'Gupta', 'Iyer', 'Varma', 'Choudhary',
+    'Singh', 'Mehta', 'Nair', 'Joshi', 'Pillai', 'Desai', 'Chowdary', 'Goud', 'Yadav', 'Das',
+]
+SECTIONS = 'ABCDE'
+# Share of present/absent/late marks in generated attendance
+STATUS_WEIGHTS = (('present', 0.85), ('absent', 0.10), ('late', 0.05))
+
+SEED_EMAIL_DOMAIN = 'seed.example.edu'
+DEFAULT_PASSWORD = 'password123'
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Generate a synthetic college dataset')
+    parser.add_argument('--students', type=int, default=2000, help='number of students (default 2000)')
+    parser.add_argument('--days', type=int, default=30, help='school days of attendance to generate (default 30)')
+    parser.add_argument('--departments', type=int, default=6, help=f'number of departments, max {len(DEPARTMENTS)} (default 6)')
+    parser.add_argument('--sections', type=int, default=2, help='sections per year (default 2)')
+    parser.add_argument('--years', type=int, default=4, help='years per department (default 4)')
+    parser.add_argument('--faculty-per-department', type=int, default=8)
+    parser.add_argument('--faculty-per-classroom', type=int, default=3)
+    parser.add_argument('--courses-per-department', type=int, default=6)
+    parser.add_argument('--announcements', type=int, default=200)
+    parser.add_argument('--notifications', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=42, help='RNG seed (default 42)')
+    parser.add_argument('--end-date', type=date.fromisoformat, default=None,
+                        help='last attendance date, YYYY-MM-DD (default today)')
+    parser.add_argument('--password', default=DEFAULT_PASSWORD,
+                        help=f'password for every generated user (default {DEFAULT_PASSWORD})')
+    parser.add_argument('--chunk-size', type=int, default=5000, help='rows per INSERT batch')
+    parser.add_argument('--reset', action='store_true', help='drop and recreate all tables first')
+    return parser.parse_args(argv)
+
+
+def school_days(end_date, count):
+    """The last ``count`` dates up to ``end_date``, skipping Sundays, oldest first"""
+    days = []
+    current = end_date
+    while len(days) < count:
+        if current.weekday() != 6:
+            days.append(current)
+        current -= timedelta(days=1)
+    return list(reversed(days))
+
+
+def bulk_insert(session, model, rows, chunk_size):
+    """Insert an iterable of row dicts in chunks, committing after each chunk"""
+    total = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= chunk_size:
+            session.execute(insert(model), batch)
+            session.commit()
+            total += len(batch)
+            batch = []
+    if batch:
+        session.execute(insert(model), batch)
+        session.commit()
+        total += len(batch)
+    return total
+
+
+def seed(session, students=2000, days=30, departments=6, sections=2, years=4,
+         faculty_per_department=8, faculty_per_classroom=3, courses_per_department=6,
+         announcements=200, notifications=100, seed=42, end_date=None,
+         password=DEFAULT_PASSWORD, chunk_size=5000, log=print):
+    """
+    Populate the database behind ``session`` and return a dict of row counts.
+
+    The database is expected to be empty apart from the default admin user.
+    """
+    from models import (User, Department, Classroom, ClassroomAssignment, Course, Enrollment,
+                        Attendance, Announcement, Notification, Banner, Lecturer, StudentReview)
+
+    rng = random.Random(seed)
+    end_date = end_date or date.today()
+    now = datetime.combine(end_date, datetime.min.time())
+    password_hash = generate_password_hash(password)
+    counts = {}
+
+    def step(name, started, rows=None):
+        rows = counts[name] if rows is None else rows
+        log(f'  {name}: {rows} rows in {time.perf_counter() - started:.1f}s')
+
+    def person_name():
+        return rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+
+    admin = session.execute(select(User.id).where(User.role == 'admin').limit(1)).scalar()
+    if admin is None:
+        raise RuntimeError('No admin user found; run the app once (or init_db) before seeding')
+
+    # Departments
+    started = time.perf_counter()
+    catalogue = DEPARTMENTS[:max(1, min(departments, len(DEPARTMENTS)))]
+    counts['departments'] = bulk_insert(session, Department, (
+        {
+            'name': name, 'code': code, 'program': program,
+            'description': f'Department of {name}', 'created_at': now, 'is_active': True,
+        }
+        for name, code, program in catalogue
+    ), chunk_size)
+    step('departments', started)
+    department_ids = dict(session.execute(select(Department.code, Department.id).order_by(Department.id)).all())
+
+    # Classrooms: one per department/year/section, in the odd (first) term of each year
+    started = time.perf_counter()
+    classroom_rows = []
+    for name, code, _ in catalogue:
+        for year in range(1, years + 1):
+            for section in SECTIONS[:sections]:
+                semester = year * 2 - 1
+                classroom_rows.append({
+                    'name': f'{code} {section} {year}-{semester}',
+                    'department': name, 'year': year, 'semester': semester, 'section': section,
+                    'academic_year': f'{end_date.year}-{end_date.year + 1}',
+                    'created_at': now, 'is_active': True,
+                })
+    counts['classrooms'] = bulk_insert(session, Classroom, classroom_rows, chunk_size)
+    step('classrooms', started)
+    classrooms = session.execute(
+        select(Classroom.id, Classroom.department, Classroom.year, Classroom.semester, Classroom.section)
+        .order_by(Classroom.id)
+    ).all()
+
+    # Faculty
+    started = time.perf_counter()
+    faculty_rows = []
+    for name, code, _ in catalogue:
+        for i in range(faculty_per_department):
+            first, last = person_name()
+            username = f'{code.lower()}.faculty{i + 1:03d}'
+            faculty_rows.append({
+                'username': username, 'email': f'{username}@{SEED_EMAIL_DOMAIN}',
+                'password_hash': password_hash, 'role': 'faculty',
+                'first_name': first, 'last_name': last, 'department': name,
+                'faculty_id': f'F{code}{i + 1:03d}', 'created_at': now, 'is_active': True,
+            })
+    counts['faculty'] = bulk_insert(session, User, faculty_rows, chunk_size)
+    step('faculty', started)
+    faculty_by_department = {}
+    for user_id, department in session.execute(
+            select(User.id, User.department).where(User.role == 'faculty').order_by(User.id)):
+        faculty_by_department.setdefault(department, []).append(user_id)
+
+    # Faculty classroom assignments
+    started = time.perf_counter()
+    assignment_rows = []
+    classroom_faculty = {}
+    for classroom in classrooms:
+        pool = faculty_by_department.get(classroom.department, [])
+        chosen = rng.sample(pool, min(faculty_per_classroom, len(pool)))
+        classroom_faculty[classroom.id] = chosen
+        for faculty_id in chosen:
+            assignment_rows.append({
+                'user_id': faculty_id, 'classroom_id': classroom.id,
+                'assigned_at': now, 'assigned_by': admin, 'is_active': True,
+            })
+    counts['classroom_assignments'] = bulk_insert(session, ClassroomAssignment, assignment_rows, chunk_size)
+    step('classroom_assignments', started)
+
+    # Students, spread round-robin over classrooms with the denormalized fields filled in
+    started = time.perf_counter()
+
+    def student_rows():
+        for i in range(students):
+            classroom = classrooms[i % len(classrooms)]
+            first, last = person_name()
+            username = f'student{i + 1:06d}'
+            yield {
+                'username': username, 'email': f'{username}@{SEED_EMAIL_DOMAIN}',
+                'password_hash': password_hash, 'role': 'student',
+                'first_name': first, 'last_name': last,
+                'department': classroom.department, 'year': classroom.year,
+                'semester': classroom.semester, 'section': classroom.section,
+                'student_id': f'ST{i + 1:06d}', 'classroom_id': classroom.id,
+                'created_at': now, 'is_active': True,
+            }
+
+    counts['students'] = bulk_insert(session, User, student_rows(), chunk_size)
+    step('students', started)
+    students_by_classroom = {}
+    for user_id, classroom_id in session.execute(
+            select(User.id, User.classroom_id).where(User.role == 'student').order_by(User.id)):
+        students_by_classroom.setdefault(classroom_id, []).append(user_id)
+
+    # Courses and enrollments: every student takes the courses of their department
+    started = time.perf_counter()
+    course_rows = []
+    for name, code, _ in catalogue:
+        pool = faculty_by_department.get(name, [])
+        for i in range(courses_per_department):
+            course_rows.append({
+                'name': f'{code} Course {i + 1}', 'code': f'{code}{101 + i}',
+                'description': f'Generated course {i + 1} for {name}', 'credits': rng.randint(2, 4),
+                'department': name, 'semester': str(i % 8 + 1),
+                'faculty_id': pool[i % len(pool)] if pool else None,
+                'created_at': now, 'is_active': True,
+            })
+    counts['courses'] = bulk_insert(session, Course, course_rows, chunk_size)
+    courses_by_department = {}
+    for course_id, department in session.execute(select(Course.id, Course.department).order_by(Course.id)):
+        courses_by_department.setdefault(department, []).append(course_id)
+    step('courses', started)
+
+    started = time.perf_counter()
+    classroom_department = {c.id: c.department for c in classrooms}
+
+    def enrollment_rows():
+        for classroom_id, student_ids in students_by_classroom.items():
+            for course_id in courses_by_department.get(classroom_department[classroom_id], []):
+                for student_id in student_ids:
+                    yield {'student_id': student_id, 'course_id': course_id,
+                           'enrollment_date': now, 'is_active': True}
+
+    counts['enrollments'] = bulk_insert(session, Enrollment, enrollment_rows(), chunk_size)
+    step('enrollments', started)
+
+    # Classroom attendance: one faculty member marks the whole classroom each school day
+    started = time.perf_counter()
+    statuses = [s for s, _ in STATUS_WEIGHTS]
+    weights = [w for _, w in STATUS_WEIGHTS]
+
+    def attendance_rows():
+        for day in school_days(end_date, days):
+            for classroom_id, student_ids in students_by_classroom.items():
+                markers = classroom_faculty.get(classroom_id) or [admin]
+                marked_by = markers[day.toordinal() % len(markers)]
+                marked_at = datetime.combine(day, datetime.min.time()) + timedelta(
+                    hours=9, minutes=rng.randint(0, 59))
+                for student_id, status in zip(student_ids, rng.choices(statuses, weights, k=len(student_ids))):
+                    yield {'student_id': student_id, 'course_id': None, 'date': day,
+                           'status': status, 'marked_by': marked_by, 'marked_at': marked_at}
+
+    counts['attendance'] = bulk_insert(session, Attendance, attendance_rows(), chunk_size)
+    step('attendance', started)
+
+    # Public website content
+    started = time.perf_counter()
+    categories = ['general', 'academic', 'event', 'urgent', 'circular']
+    audiences = ['all', 'students', 'faculty']
+    counts['announcements'] = bulk_insert(session, Announcement, (
+        {
+            'title': f'Announcement {i + 1}', 'content': f'Generated announcement body {i + 1}.',
+            'category': rng.choice(categories), 'target_audience': rng.choice(audiences),
+            'created_by': admin, 'created_at': now - timedelta(hours=i),
+            'is_active': rng.random() < 0.9, 'is_pinned': rng.random() < 0.05,
+        }
+        for i in range(announcements)
+    ), chunk_size)
+    counts['notifications'] = bulk_insert(session, Notification, (
+        {
+            'title': f'Notification {i + 1}', 'content': f'Generated notification body {i + 1}.',
+            'notification_type': rng.choice(['aicte', 'jntu']),
+            'reference_number': f'REF/{end_date.year}/{i + 1:04d}',
+            'issue_date': end_date - timedelta(days=i), 'created_by': admin,
+            'created_at': now - timedelta(days=i), 'is_active': True,
+            'is_important': rng.random() < 0.1,
+        }
+        for i in range(notifications)
+    ), chunk_size)
+    counts['banners'] = bulk_insert(session, Banner, (
+        {
+            'title': f'Banner {i + 1}', 'image_path': f'banners/seed_banner_{i + 1}.jpg',
+            'display_order': i, 'created_by': admin, 'created_at': now, 'is_active': True,
+        }
+        for i in range(5)
+    ), chunk_size)
+    counts['lecturers'] = bulk_insert(session, Lecturer, (
+        {
+            'name': ' '.join(person_name()), 'designation': 'Assistant Professor',
+            'experience': f'{rng.randint(1, 25)} years', 'department_id': department_id,
+            'display_order': i, 'created_at': now, 'is_active': True,
+        }
+        for department_id in department_ids.values()
+        for i in range(6)
+    ), chunk_size)
+    counts['student_reviews'] = bulk_insert(session, StudentReview, (
+        {
+            'student_name': ' '.join(person_name()), 'review_text': 'Generated review.',
+            'rating': rng.randint(3, 5), 'department_id': department_id,
+            'student_batch': f'{end_date.year - 4}-{end_date.year}',
+            'created_at': now, 'is_approved': rng.random() < 0.8,
+        }
+        for department_id in department_ids.values()
+        for _ in range(10)
+    ), chunk_size)
+    step('public content', started, rows=sum(counts[name] for name in (
+        'announcements', 'notifications', 'banners', 'lecturers', 'student_reviews')))
+
+    return counts
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    from app import create_app, init_db
+    from extensions import db
+
+    app = create_app(profile='worker')
+
+    with app.app_context():
+        print(f"🔄 Seeding {app.config['SQLALCHEMY_DATABASE_URI']} (seed={args.seed})")
+        if args.reset:
+            print('🧹 Dropping and recreating all tables...')
+            db.drop_all()
+            db.session.commit()
+        init_db(app)
+
+        started = time.perf_counter()
+        try:
+            counts = seed(
+                db.session,
+                students=args.students, days=args.days, departments=args.departments,
+                sections=args.sections, years=args.years,
+                faculty_per_department=args.faculty_per_department,
+                faculty_per_classroom=args.faculty_per_classroom,
+                courses_per_department=args.courses_per_department,
+                announcements=args.announcements, notifications=args.notifications,
+                seed=args.seed, end_date=args.end_date, password=args.password,
+                chunk_size=args.chunk_size,
+            )
+        except Exception as e:
+            db.session.rollback()
+            print(f'❌ Seeding failed: {e}')
+            return 1
+
+        print(f'✅ Seeded {sum(counts.values())} rows in {time.perf_counter() - started:.1f}s')
+        for name, count in counts.items():
+            print(f'   {name}: {count}')
+        print(f'🔑 Every generated user logs in with password "{args.password}"')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
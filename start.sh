@@ -24,6 +24,10 @@ done
 echo "🔧 Initializing database schema..."
 python init_db.py
 
+# Apply pending schema migrations (new databases are created and stamped by gunicorn.conf.py)
+echo "🔧 Applying schema migrations..."
+flask --app app db-upgrade
+
 # Start the application
 echo "🎉 Starting Flask application..."
-exec gunicorn --bind 0.0.0.0:5000 --workers 2 --timeout 120 app:app
+exec gunicorn -c gunicorn.conf.py wsgi:app
@@ -0,0 +1,129 @@
+// Typeahead user picker for forms that used to list every user in a <select multiple>.
+//
+// Markup:
+//   <div class="user-picker" data-search-url="/admin/users/search?role=student" data-select="#student_ids">
+//       <input type="search" class="form-control user-picker-input">
+//       <div class="list-group user-picker-results"></div>
+//       <div class="user-picker-selected"></div>
+//   </div>
+//   {{ form.student_ids(class="d-none") }}
+//
+// Picked users become selected <option>s of the (hidden) select, so the form
+// posts exactly as before. The search endpoint returns {results: [{id, text}], more}.
+
+function initUserPicker(container) {
+    const select = document.querySelector(container.dataset.select);
+    const input = container.querySelector('.user-picker-input');
+    const results = container.querySelector('.user-picker-results');
+    const selected = container.querySelector('.user-picker-selected');
+    let page = 1;
+    let timer = null;
+    let controller = null;
+
+    function renderSelected() {
+        selected.innerHTML = '';
+        for (const option of select.options) {
+            const chip = document.createElement('span');
+            chip.className = 'badge bg-primary me-1 mb-1 p-2';
+            chip.textContent = option.text + ' ';
+            const remove = document.createElement('button');
+            remove.type = 'button';
+            remove.className = 'btn-close btn-close-white ms-1';
+            remove.style.fontSize = '0.6rem';
+            remove.setAttribute('aria-label', 'Remove');
+            remove.addEventListener('click', function() {
+                option.remove();
+                renderSelected();
+            });
+            chip.appendChild(remove);
+            selected.appendChild(chip);
+        }
+        select.dispatchEvent(new Event('change'));
+    }
+
+    function add(user) {
+        if (!Array.from(select.options).some(option => option.value === String(user.id))) {
+            select.add(new Option(user.text, user.id, true, true));
+            renderSelected();
+        }
+    }
+
+    async function search(reset) {
+        if (reset) {
+            page = 1;
+        }
+        if (controller) {
+            controller.abort();
+        }
+        controller = new AbortController();
+
+        const url = new URL(container.dataset.searchUrl, window.location.origin);
+        url.searchParams.set('q', input.value.trim());
+        url.searchParams.set('page', page);
+
+        let data;
+        try {
+            const response = await fetch(url, {signal: controller.signal, headers: {'Accept': 'application/json'}});
+            data = await response.json();
+        } catch (error) {
+            if (error.name !== 'AbortError') {
+                results.innerHTML = '<div class="list-group-item text-danger">Search failed, please try again</div>';
+            }
+            return;
+        }
+
+        if (reset) {
+            results.innerHTML = '';
+        } else {
+            results.querySelector('.user-picker-more')?.remove();
+        }
+        if (reset && data.results.length === 0) {
+            results.innerHTML = '<div class="list-group-item text-muted">No matching users</div>';
+        }
+        for (const user of data.results) {
+            const item = document.createElement('button');
+            item.type = 'button';
+            item.className = 'list-group-item list-group-item-action';
+            item.textContent = user.text;
+            item.addEventListener('click', function() {
+                add(user);
+                item.classList.add('active');
+            });
+            results.appendChild(item);
+        }
+        if (data.more) {
+            const more = document.createElement('button');
+            more.type = 'button';
+            more.className = 'list-group-item list-group-item-action text-center text-primary user-picker-more';
+            more.textContent = 'Show more';
+            more.addEventListener('click', function() {
+                page += 1;
+                search(false);
+            });
+            results.appendChild(more);
+        }
+    }
+
+    input.addEventListener('input', function() {
+        clearTimeout(timer);
+        timer = setTimeout(() => search(true), 250);
+    });
+    input.addEventListener('keydown', function(e) {
+        // Enter picks the first result instead of submitting the form
+        if (e.key === 'Enter') {
+            e.preventDefault();
+            results.querySelector('.list-group-item-action:not(.user-picker-more)')?.click();
+        }
+    });
+
+    // Options rendered by the server are users picked before a failed submit
+    for (const option of select.options) {
+        option.selected = true;
+    }
+    renderSelected();
+    search(true);
+}
+
+document.addEventListener('DOMContentLoaded', function() {
+    document.querySelectorAll('.user-picker').forEach(initUserPicker);
+});
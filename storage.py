@@ -0,0 +1,365 @@
+"""
+Storage backends for uploaded files.
+
+uploads.py decides what a file is called (its content hash) and when it can
+be deleted; the backend here only stores bytes under a key such as
+'banners/<sha256>.jpg'. Two backends are available:
+
+    filesystem  files under UPLOAD_FOLDER, served by nginx from /static/uploads/
+    s3          any S3-compatible object store (AWS S3, MinIO, ...)
+
+With S3 every web container sees the same files, and the app never serves
+file bytes: pages link to S3_PUBLIC_URL when the bucket (or a CDN in front of
+it) is public, otherwise to /uploads/<key>, which redirects to a short-lived
+presigned URL. Uploads are streamed to S3 in S3_PART_SIZE parts while they
+are hashed, so large files are never held in memory or written to local disk.
+
+Config (app config or environment):
+    UPLOAD_STORAGE        'filesystem' (default) or 's3'
+    S3_BUCKET             bucket name
+    S3_ENDPOINT_URL       e.g. http://minio:9000 for MinIO; unset for AWS
+    S3_REGION             default us-east-1
+    S3_PREFIX             key prefix inside the bucket, default none
+    S3_PUBLIC_URL         public base URL for the bucket, if it is public
+    S3_PRESIGN_EXPIRES    lifetime of presigned download URLs, default 3600s
+    S3_PART_SIZE          multipart part size in bytes, default 8MB (5MB minimum)
+Credentials come from the usual AWS variables (AWS_ACCESS_KEY_ID, ...).
+"""
+
+import logging
+import os
+import shutil
+import tempfile
+import uuid
+
+logger = logging.getLogger(__name__)
+
+TMP_DIR = '.tmp'
+# Redirects to presigned URLs for private S3 buckets (see blueprints/files.py)
+REDIRECT_PREFIX = '/uploads/'
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+DEFAULT_PART_SIZE = 8 * 1024 * 1024
+MIN_PART_SIZE = 5 * 1024 * 1024
+SPOOL_SIZE = 1024 * 1024
+
+
+class FileSystemStorage:
+    """Files in a local directory (UPLOAD_FOLDER)"""
+
+    def __init__(self, root, base_url='/static/uploads/'):
+        self.root = root
+        self.base_url = base_url.rstrip('/') + '/'
+
+    def _path(self, key):
+        path = os.path.normpath(os.path.join(self.root, key))
+        if not path.startswith(os.path.normpath(self.root) + os.sep):
+            raise ValueError(f'Invalid storage key {key!r}')
+        return path
+
+    def writer(self):
+        return _FileSystemWriter(self)
+
+    def put(self, key, fileobj, content_type=None):
+        writer = self.writer()
+        try:
+            shutil.copyfileobj(fileobj, writer)
+        except Exception:
+            writer.abort()
+            raise
+        writer.commit(key, content_type)
+
+    def open(self, key):
+        return open(self._path(key), 'rb')
+
+    def exists(self, key):
+        return os.path.exists(self._path(key))
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def touch(self, key):
+        os.utime(self._path(key))
+
+    def modified_at(self, key):
+        try:
+            return os.path.getmtime(self._path(key))
+        except FileNotFoundError:
+            return None
+
+    def list(self, prefix=''):
+        """Keys starting with ``prefix``"""
+        start = os.path.join(self.root, os.path.dirname(prefix))
+        for root, dirs, files in os.walk(start):
+            dirs[:] = [d for d in dirs if d != TMP_DIR]
+            for name in files:
+                key = os.path.relpath(os.path.join(root, name), self.root).replace('\\', '/')
+                if key.startswith(prefix):
+                    yield key
+
+    def url(self, key):
+        return self.base_url + key
+
+    def download_url(self, key):
+        return self.url(key)
+
+
+class _FileSystemWriter:
+    def __init__(self, storage):
+        self.storage = storage
+        tmp_dir = os.path.join(storage.root, TMP_DIR)
+        os.makedirs(tmp_dir, exist_ok=True)
+        fd, self.tmp_path = tempfile.mkstemp(dir=tmp_dir)
+        self.file = os.fdopen(fd, 'wb')
+
+    def write(self, data):
+        self.file.write(data)
+
+    def commit(self, key, content_type=None):
+        self.file.close()
+        final_path = self.storage._path(key)
+        try:
+            os.makedirs(os.path.dirname(final_path), exist_ok=True)
+            if os.path.exists(final_path):
+                # Same bytes already stored; refresh the mtime so a concurrent
+                # release of another reference cannot delete it
+                os.utime(final_path)
+            else:
+                os.chmod(self.tmp_path, 0o644)
+                os.replace(self.tmp_path, final_path)
+        finally:
+            self.abort()
+
+    def abort(self):
+        self.file.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+
+class S3Storage:
+    """Objects in an S3-compatible bucket"""
+
+    def __init__(self, bucket, endpoint_url=None, region='us-east-1', prefix='', public_url=None,
+                 presign_expires=3600, part_size=DEFAULT_PART_SIZE, client=None):
+        if client is None:
+            import boto3
+            from botocore.config import Config
+
+            client = boto3.client('s3', endpoint_url=endpoint_url, region_name=region,
+                                  config=Config(signature_version='s3v4', s3={'addressing_style': 'path'}))
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix.strip('/') + '/' if prefix.strip('/') else ''
+        self.public_url = public_url.rstrip('/') + '/' if public_url else None
+        self.presign_expires = presign_expires
+        self.part_size = max(part_size, MIN_PART_SIZE)
+
+    def _key(self, key):
+        return self.prefix + key
+
+    def _is_missing(self, error):
+        return error.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound')
+
+    def _head(self, key):
+        from botocore.exceptions import ClientError
+
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=self._key(key))
+        except ClientError as e:
+            if self._is_missing(e):
+                return None
+            raise
+
+    def writer(self):
+        return _S3Writer(self)
+
+    def put(self, key, fileobj, content_type=None):
+        writer = self.writer()
+        try:
+            shutil.copyfileobj(fileobj, writer, self.part_size)
+        except Exception:
+            writer.abort()
+            raise
+        writer.commit(key, content_type)
+
+    def _object_args(self, content_type):
+        args = {'CacheControl': IMMUTABLE_CACHE_CONTROL}
+        if content_type:
+            args['ContentType'] = content_type
+        return args
+
+    def open(self, key):
+        """A seekable copy of the object (Pillow needs to seek)"""
+        from botocore.exceptions import ClientError
+
+        try:
+            body = self.client.get_object(Bucket=self.bucket, Key=self._key(key))['Body']
+        except ClientError as e:
+            if self._is_missing(e):
+                raise FileNotFoundError(key)
+            raise
+        copy = tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE)
+        for chunk in body.iter_chunks(64 * 1024):
+            copy.write(chunk)
+        copy.seek(0)
+        return copy
+
+    def exists(self, key):
+        return self._head(key) is not None
+
+    def delete(self, key):
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(key))
+
+    def touch(self, key):
+        head = self._head(key)
+        if head is None:
+            return
+        # Copying an object onto itself is the only way to bump LastModified
+        self.client.copy_object(
+            Bucket=self.bucket, Key=self._key(key),
+            CopySource={'Bucket': self.bucket, 'Key': self._key(key)},
+            MetadataDirective='REPLACE', Metadata=head.get('Metadata', {}),
+            **self._object_args(head.get('ContentType'))
+        )
+
+    def modified_at(self, key):
+        head = self._head(key)
+        return head['LastModified'].timestamp() if head else None
+
+    def list(self, prefix=''):
+        paginator = self.client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self._key(prefix)):
+            for item in page.get('Contents', []):
+                key = item['Key'][len(self.prefix):]
+                if not key.startswith(TMP_DIR + '/'):
+                    yield key
+
+    def url(self, key):
+        if self.public_url:
+            return self.public_url + self._key(key)
+        return REDIRECT_PREFIX + key
+
+    def download_url(self, key):
+        if self.public_url:
+            return self.url(key)
+        return self.client.generate_presigned_url(
+            'get_object', Params={'Bucket': self.bucket, 'Key': self._key(key)},
+            ExpiresIn=self.presign_expires
+        )
+
+
+class _S3Writer:
+    """
+    Buffers up to one part in memory. Anything larger becomes a multipart
+    upload to a temporary key, copied server-side to its final key on commit
+    (the final key depends on the hash, known only at the end).
+    """
+
+    def __init__(self, storage):
+        self.storage = storage
+        self.buffer = bytearray()
+        self.tmp_key = None
+        self.upload_id = None
+        self.parts = []
+
+    def write(self, data):
+        self.buffer += data
+        while len(self.buffer) >= self.storage.part_size:
+            self._upload_part(bytes(self.buffer[:self.storage.part_size]))
+            del self.buffer[:self.storage.part_size]
+
+    def _upload_part(self, data):
+        storage = self.storage
+        if self.upload_id is None:
+            self.tmp_key = storage._key(f'{TMP_DIR}/{uuid.uuid4().hex}')
+            self.upload_id = storage.client.create_multipart_upload(
+                Bucket=storage.bucket, Key=self.tmp_key)['UploadId']
+        part_number = len(self.parts) + 1
+        response = storage.client.upload_part(
+            Bucket=storage.bucket, Key=self.tmp_key, UploadId=self.upload_id,
+            PartNumber=part_number, Body=data
+        )
+        self.parts.append({'PartNumber': part_number, 'ETag': response['ETag']})
+
+    def commit(self, key, content_type=None):
+        storage = self.storage
+        try:
+            if storage.exists(key):
+                storage.touch(key)
+                return
+            if self.upload_id is None:
+                storage.client.put_object(Bucket=storage.bucket, Key=storage._key(key),
+                                          Body=bytes(self.buffer), **storage._object_args(content_type))
+                return
+            if self.buffer:
+                self._upload_part(bytes(self.buffer))
+                self.buffer.clear()
+            storage.client.complete_multipart_upload(
+                Bucket=storage.bucket, Key=self.tmp_key, UploadId=self.upload_id,
+                MultipartUpload={'Parts': self.parts}
+            )
+            self.upload_id = None
+            storage.client.copy_object(
+                Bucket=storage.bucket, Key=storage._key(key),
+                CopySource={'Bucket': storage.bucket, 'Key': self.tmp_key},
+                MetadataDirective='REPLACE', **storage._object_args(content_type)
+            )
+        finally:
+            self.abort()
+
+    def abort(self):
+        storage = self.storage
+        if self.upload_id is not None:
+            storage.client.abort_multipart_upload(Bucket=storage.bucket, Key=self.tmp_key,
+                                                  UploadId=self.upload_id)
+            self.upload_id = None
+        elif self.tmp_key is not None:
+            storage.client.delete_object(Bucket=storage.bucket, Key=self.tmp_key)
+        self.tmp_key = None
+
+
+def storage_from_config(config):
+    """Build the backend named by UPLOAD_STORAGE; ``config`` falls back to the environment"""
+
+    def setting(name, default=None):
+        value = config.get(name)
+        return value if value is not None else os.environ.get(name, default)
+
+    backend = setting('UPLOAD_STORAGE', 'filesystem').lower()
+    if backend == 'filesystem':
+        return FileSystemStorage(setting('UPLOAD_FOLDER', 'static/uploads'),
+                                 setting('UPLOAD_URL_PREFIX', '/static/uploads/'))
+    if backend == 's3':
+        bucket = setting('S3_BUCKET')
+        if not bucket:
+            raise ValueError('UPLOAD_STORAGE=s3 needs S3_BUCKET')
+        return S3Storage(
+            bucket,
+            endpoint_url=setting('S3_ENDPOINT_URL'),
+            region=setting('S3_REGION', 'us-east-1'),
+            prefix=setting('S3_PREFIX', ''),
+            public_url=setting('S3_PUBLIC_URL'),
+            presign_expires=int(setting('S3_PRESIGN_EXPIRES', 3600)),
+            part_size=int(setting('S3_PART_SIZE', DEFAULT_PART_SIZE)),
+        )
+    raise ValueError(f'Unknown UPLOAD_STORAGE {backend!r}; expected filesystem or s3')
+
+
+_default_storage = None
+
+
+def get_storage():
+    """The current app's backend, or one configured from the environment outside an app"""
+    global _default_storage
+    from flask import current_app, has_app_context
+
+    if has_app_context():
+        storage = current_app.extensions.get('upload_storage')
+        if storage is None:
+            storage = current_app.extensions['upload_storage'] = storage_from_config(current_app.config)
+        return storage
+    if _default_storage is None:
+        _default_storage = storage_from_config({})
+    return _default_storage
@@ -0,0 +1,53 @@
+"""
+Iterate over large query results without loading them all at once.
+
+``yield_per`` makes SQLAlchemy fetch rows from the driver in batches, and
+``stream_results`` makes psycopg2 use a named (server-side) cursor on
+PostgreSQL, so the database sends the rows as they are consumed instead of
+the whole result up front. SQLite has no server-side cursors; it still
+fetches in batches.
+
+Use these for jobs that have to touch every row (Celery tasks, exports).
+Pages that show rows to a person should paginate instead.
+"""
+
+from extensions import db
+
+BATCH_SIZE = 2000
+
+
+def _execute(statement, batch_size, session=None):
+    session = session or db.session
+    return session.execute(statement.execution_options(stream_results=True, yield_per=batch_size))
+
+
+def stream_rows(statement, batch_size=BATCH_SIZE, session=None):
+    """Execute a select() of columns and yield its rows one at a time"""
+    result = _execute(statement, batch_size, session)
+    try:
+        for partition in result.partitions():
+            yield from partition
+    finally:
+        result.close()
+
+
+def scan_batches(statement, batch_size=BATCH_SIZE, session=None):
+    """
+    Execute a select() of one entity and yield the objects in lists of up to
+    ``batch_size``.
+
+    Objects stay in the session's identity map until the caller asks for the
+    next batch; then changes made to them are flushed and they are expunged,
+    so memory is bounded by one batch however many rows the scan covers.
+    Don't commit inside the loop: that closes the server-side cursor.
+    """
+    session = session or db.session
+    result = _execute(statement, batch_size, session)
+    try:
+        for partition in result.scalars().partitions():
+            yield partition
+            session.flush()
+            for obj in partition:
+                session.expunge(obj)
+    finally:
+        result.close()
@@ -1,10 +1,23 @@
 from celery import Celery
+from celery.schedules import crontab
 from datetime import datetime, timedelta
 import os
 
 # Initialize Celery
 celery = Celery('tasks', broker=os.getenv('REDIS_URL', 'redis://localhost:6379/0'))
 
+# Flask app for the tasks, created on first use. The worker profile loads the
+# models and database only, not the views, forms or templates.
+_flask_app = None
+
+
+def flask_app():
+    global _flask_app
+    if _flask_app is None:
+        from app import create_app
+        _flask_app = create_app(profile='worker')
+    return _flask_app
+
 # Configure Celery
 celery.conf.update(
     result_backend=os.getenv('REDIS_URL', 'redis://localhost:6379/0'),
@@ -20,11 +33,11 @@ def generate_attendance_report(classroom_id, date_range):
     """
     Generate attendance report for a classroom asynchronously
     """
-    from app import app
     from models import Attendance, User
     from extensions import db
+    from replica import replica_reads
     
-    with app.app_context():
+    with flask_app().app_context(), replica_reads():
         start_date, end_date = date_range
         
         # Query attendance data
@@ -75,33 +88,30 @@ def cleanup_old_attendance():
     """
     Archive attendance records older than 1 year
     """
-    from app import app
     from models import Attendance
     from extensions import db
     
-    with app.app_context():
+    with flask_app().app_context():
         cutoff_date = datetime.utcnow() - timedelta(days=365)
         
-        # Get old records
-        old_records = Attendance.query.filter(
-            Attendance.date < cutoff_date
-        ).all()
+        # TODO: Implement archiving logic (e.g., move to archive table or export to file).
+        # Until then only count the old records; there is nothing to load them for
+        processed = db.session.scalar(
+            db.select(db.func.count(Attendance.id)).where(Attendance.date < cutoff_date)
+        )
         
-        # TODO: Implement archiving logic (e.g., move to archive table or export to file)
-        
-        return f'Processed {len(old_records)} old attendance records'
+        return f'Processed {processed} old attendance records'
 
 @celery.task
 def send_attendance_reminder():
     """
     Send reminders to faculty who haven't marked attendance today
     """
-    from app import app
     from models import User, Attendance, ClassroomAssignment
     from extensions import db
     from datetime import date
     
-    with app.app_context():
+    with flask_app().app_context():
         today = date.today()
         
         # Get faculty with assigned classrooms
@@ -128,6 +138,132 @@ def send_attendance_reminder():
         
         return f'Sent {reminders_sent} attendance reminders'
 
+@celery.task(ignore_result=True)
+def process_uploaded_image(model_name, object_id, image_path):
+    """
+    Strip metadata from an uploaded image and generate its responsive variants
+    (see images.py), then point the record at the stripped copy. Skipped if the
+    record has been deleted or its image replaced since the task was queued.
+    """
+    import models
+    import public_api
+    from caching import invalidate
+    from extensions import db
+    from images import IMAGE_FIELDS, generate_variants
+    from uploads import relative_upload_path, release, upload_url_prefix
+    
+    with flask_app().app_context():
+        model = getattr(models, model_name)
+        column = getattr(model, IMAGE_FIELDS[model_name])
+        current = db.session.execute(
+            db.select(column).where(model.id == object_id)
+        ).scalar_one_or_none()
+        if current != image_path:
+            return f'{model_name} {object_id} changed; skipped'
+        
+        variants = generate_variants(relative_upload_path(image_path))
+        if variants is None:
+            return f'{model_name} {object_id}: no variants for {image_path}'
+        
+        original = variants['original']
+        if image_path.startswith(upload_url_prefix()):
+            # Keep the column's existing format (departments store full URLs)
+            original = upload_url_prefix() + original
+        
+        # Only attach the variants if the image was not replaced while we worked
+        result = db.session.execute(
+            db.update(model)
+            .where(model.id == object_id, column == image_path)
+            .values({column: original, 'image_variants': variants})
+        )
+        db.session.commit()
+        if result.rowcount and model_name == 'Department':
+            # /api/departments lists the image and its variants
+            invalidate(public_api.DEPARTMENTS_CACHE_KEY)
+        with db.engine.connect() as connection:
+            # Whichever of the two files lost is deleted unless something else uses it
+            release(connection, original if result.rowcount == 0 else image_path,
+                    grace_seconds=flask_app().config['UPLOAD_GRACE_SECONDS'])
+        if result.rowcount == 0:
+            return f'{model_name} {object_id} changed; skipped'
+        return f'{model_name} {object_id}: {len(variants["variants"])} formats'
+
+@celery.task
+def semester_rollover(department=None, dry_run=True, performed_by=None):
+    """
+    Move every cohort to its next-semester classroom (see rollover.py).
+    Returns the plan; with dry_run nothing is changed.
+    """
+    from rollover import run_rollover
+    
+    with flask_app().app_context():
+        return run_rollover(department=department, dry_run=dry_run, performed_by=performed_by)
+
+@celery.task
+def reconcile_counters():
+    """
+    Repair denormalized counters that have drifted from their rows (see counters.py)
+    """
+    from counters import reconcile
+    from extensions import db
+    
+    with flask_app().app_context():
+        repaired = reconcile()
+        db.session.commit()
+        return repaired
+
+@celery.task
+def repair_classroom_fields():
+    """
+    Re-copy department/year/semester/section from their classroom onto
+    students whose copies have drifted (see bulk.py)
+    """
+    from bulk import classroom_field_drift, repair_classroom_fields as repair
+    from extensions import db
+    
+    with flask_app().app_context():
+        count, user_ids = classroom_field_drift()
+        if not count:
+            return 'No drifted students'
+        repaired = repair()
+        db.session.commit()
+        return f'Repaired {repaired} students with drifted classroom fields, e.g. users {user_ids}'
+
+@celery.task
+def sweep_unreferenced_uploads():
+    """
+    Delete uploads that no record references any more (see uploads.py)
+    """
+    from extensions import db
+    from uploads import sweep_unreferenced
+    
+    with flask_app().app_context():
+        config = flask_app().config
+        with db.engine.connect() as connection:
+            removed = sweep_unreferenced(connection, grace_seconds=config['UPLOAD_GRACE_SECONDS'])
+        return f'Removed {removed} unreferenced uploads'
+
+@celery.task(ignore_result=True)
+def refresh_dashboard_snapshot():
+    """
+    Recompute the admin dashboard figures into the cache (see dashboard.py)
+    """
+    from dashboard import refresh_snapshot
+    from replica import replica_reads
+    
+    with flask_app().app_context(), replica_reads():
+        refresh_snapshot()
+
+@celery.task(ignore_result=True)
+def refresh_cached(key, function, timeout=None, stale=0):
+    """
+    Recompute a cached value in the background (see caching.remember)
+    """
+    from caching import refresh_by_name
+    
+    with flask_app().app_context():
+        refresh_by_name(key, function, timeout, stale)
+
 # Schedule periodic tasks
 @celery.on_after_configure.connect
 def setup_periodic_tasks(sender, **kwargs):
@@ -138,6 +274,34 @@ def setup_periodic_tasks(sender, **kwargs):
         name='cleanup-old-attendance'
     )
     
+    # Delete uploads replaced or orphaned since the last run
+    sender.add_periodic_task(
+        timedelta(hours=1),
+        sweep_unreferenced_uploads.s(),
+        name='sweep-unreferenced-uploads'
+    )
+    
+    # Keep the admin dashboard snapshot at most a minute old
+    sender.add_periodic_task(
+        timedelta(minutes=1),
+        refresh_dashboard_snapshot.s(),
+        name='refresh-dashboard-snapshot'
+    )
+    
+    # Repair counters changed behind the ORM's back
+    sender.add_periodic_task(
+        timedelta(hours=6),
+        reconcile_counters.s(),
+        name='reconcile-counters'
+    )
+    
+    # Keep the classroom fields copied onto students in step with their classroom
+    sender.add_periodic_task(
+        timedelta(days=1),
+        repair_classroom_fields.s(),
+        name='repair-classroom-fields'
+    )
+    
     # Send attendance reminders at 10 AM every weekday
     sender.add_periodic_task(
         crontab(hour=10, minute=0, day_of_week='1-5'),
@@ -0,0 +1,115 @@
+"""
+Tests for the async public API server (asgi_api.py)
+"""
+
+import asyncio
+import json
+from datetime import date, datetime
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from asgi_api import PublicApi, async_database_url
+from extensions import db
+from models import Announcement, Department, Enquiry, Notification, User
+
+
+def make_api(tmp_path):
+    url = f'sqlite:///{tmp_path / "api.db"}'
+    engine = create_engine(url)
+    db.metadata.create_all(engine)
+    with Session(engine) as session:
+        admin = User(username='admin', email='admin@college.edu', password_hash='x', role='admin',
+                     first_name='System', last_name='Administrator')
+        session.add(admin)
+        session.flush()
+        session.add_all([
+            Department(name='Computer Science Engineering', code='CSE', program='UG'),
+            Department(name='Civil Engineering', code='CIVIL', program='UG', is_active=False),
+            Announcement(title='Fest', content='Annual fest', category='event', created_by=admin.id,
+                         event_date=datetime(2026, 3, 1, 10, 0)),
+            Announcement(title='Exams', content='Timetable', category='academic', created_by=admin.id),
+            Notification(title='AICTE circular', content='...', notification_type='aicte',
+                         issue_date=date(2026, 1, 15), created_by=admin.id),
+        ])
+        session.commit()
+    engine.dispose()
+    return PublicApi(database_url=url), url
+
+
+def call(api, method, path, query=b'', body=b''):
+    """Drive the ASGI app directly and return (status, parsed JSON)"""
+    sent = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': body, 'more_body': False}
+
+    async def send(message):
+        sent.append(message)
+
+    async def run():
+        await api({'type': 'http', 'method': method, 'path': path, 'query_string': query}, receive, send)
+        await api.shutdown()
+
+    asyncio.run(run())
+    payload = sent[1]['body']
+    return sent[0]['status'], json.loads(payload) if payload else None
+
+
+def test_departments_lists_active_only(tmp_path):
+    api, _ = make_api(tmp_path)
+    status, payload = call(api, 'GET', '/api/departments')
+    assert status == 200
+    assert payload['total'] == 1
+    assert payload['departments'][0]['code'] == 'CSE'
+
+
+def test_events_and_announcements_include_creator(tmp_path):
+    api, _ = make_api(tmp_path)
+    status, events = call(api, 'GET', '/api/events')
+    assert status == 200
+    assert [e['title'] for e in events['data']] == ['Fest']
+    assert events['data'][0]['creator'] == 'System Administrator'
+
+    status, announcements = call(api, 'GET', '/api/announcements', b'category=academic')
+    assert status == 200
+    assert announcements['count'] == 1
+    assert announcements['filters_applied']['category'] == 'academic'
+
+
+def test_notifications_rejects_bad_dates(tmp_path):
+    api, _ = make_api(tmp_path)
+    status, payload = call(api, 'GET', '/api/notifications', b'date_from=15-01-2026')
+    assert status == 400
+    assert 'date_from' in payload['message']
+
+    status, payload = call(api, 'GET', '/api/notifications', b'date_from=2026-01-01&type=aicte')
+    assert status == 200
+    assert payload['data'][0]['issue_date'] == '2026-01-15'
+
+
+def test_enquiry_is_saved(tmp_path):
+    api, url = make_api(tmp_path)
+    body = json.dumps({'name': 'Asha', 'email': 'asha@example.com', 'mobile': '9876543210',
+                       'programme': 'UG', 'branch': 'CSE'}).encode()
+    status, payload = call(api, 'POST', '/api/enquiry', body=body)
+    assert status == 201
+    with Session(create_engine(url)) as session:
+        enquiry = session.get(Enquiry, payload['enquiry_id'])
+        assert enquiry.course_interested == 'CSE'
+
+    status, payload = call(api, 'POST', '/api/enquiry', body=b'{"name": "Asha"}')
+    assert status == 400
+    assert payload['message'] == 'Missing required field: email'
+
+
+def test_unknown_route_and_method(tmp_path):
+    api, _ = make_api(tmp_path)
+    assert call(api, 'GET', '/api/unknown')[0] == 404
+    assert call(api, 'POST', '/api/departments')[0] == 405
+
+
+def test_async_database_url():
+    assert async_database_url('postgres://u:p@db/college').drivername == 'postgresql+asyncpg'
+    assert async_database_url('sqlite:////tmp/x.db').drivername == 'sqlite+aiosqlite'
+    assert async_database_url('sqlite:///college.db').database.endswith('instance/college.db')
@@ -0,0 +1,135 @@
+"""
+Tests for set-based classroom assignment and enrollment (bulk.py)
+"""
+
+import pytest
+from sqlalchemy import event
+
+from bulk import assign_faculty, assign_students, enroll_students, move_classroom
+from extensions import db
+from models import Classroom, ClassroomAssignment, Course, Enrollment, User
+
+
+@pytest.fixture
+def app(app):
+    with app.app_context():
+        db.session.add_all([
+            User(username=f'f{i}', email=f'f{i}@example.com', password_hash='x', role='faculty',
+                 first_name='Fac', last_name=str(i), faculty_id=f'F{i}')
+            for i in range(2, 4)
+        ])
+        db.session.add_all([
+            Classroom(name='CSE 2-A', department='CSE', year=2, semester=3, section='A'),
+            Classroom(name='CSE 2-A (Sem 4)', department='CSE', year=2, semester=4, section='A'),
+        ])
+        db.session.add_all([
+            User(username=f's{i}', email=f's{i}@example.com', password_hash='x', role='student',
+                 first_name='Stu', last_name=str(i), student_id=f'S{i:03}')
+            for i in range(60)
+        ])
+        db.session.commit()
+    return app
+
+
+def _count_statements():
+    statements = []
+    event.listen(db.engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+    return statements
+
+
+def test_assign_section_in_one_statement(app):
+    with app.app_context():
+        classroom = db.session.get(Classroom, 1)
+        student_ids = [user_id for (user_id,) in db.session.query(User.id).filter_by(role='student')]
+        statements = _count_statements()
+        # The faculty ID (2) is ignored: only students get a classroom_id
+        assert assign_students(classroom, student_ids + [2]) == 60
+        assert len(statements) == 1
+        db.session.commit()
+
+        assert User.query.filter_by(classroom_id=1, department='CSE', year=2, semester=3, section='A').count() == 60
+        assert db.session.get(User, 2).classroom_id is None
+
+
+def test_assign_faculty_reactivates_and_skips_active(app):
+    with app.app_context():
+        classroom = db.session.get(Classroom, 1)
+        db.session.add(ClassroomAssignment(user_id=2, classroom_id=1, is_active=False))
+        db.session.add(ClassroomAssignment(user_id=3, classroom_id=1, is_active=True))
+        db.session.commit()
+
+        # 2 is reactivated, 3 is already active, 4 is a student
+        assert assign_faculty(classroom, [2, 3, 4], assigned_by=1) == 1
+        db.session.commit()
+        rows = db.session.query(ClassroomAssignment.user_id, ClassroomAssignment.is_active).order_by('user_id').all()
+        assert rows == [(2, True), (3, True)]
+
+
+def test_move_classroom_promotes_the_whole_section(app, client):
+    with app.app_context():
+        assign_students(db.session.get(Classroom, 1), range(4, 64))
+        db.session.add(ClassroomAssignment(user_id=2, classroom_id=1))
+        db.session.commit()
+
+    response = client.post('/admin/classrooms/1/move', data={'target_classroom_id': 2, 'include_faculty': 'on'})
+    assert response.status_code == 302
+    with app.app_context():
+        assert User.query.filter_by(classroom_id=2, semester=4).count() == 60
+        assert User.query.filter_by(classroom_id=1).count() == 0
+        rows = db.session.query(ClassroomAssignment.classroom_id, ClassroomAssignment.is_active).order_by('id').all()
+        assert rows == [(1, False), (2, True)]
+
+        move_classroom(db.session.get(Classroom, 2), db.session.get(Classroom, 1))
+        assert User.query.filter_by(classroom_id=1, semester=3).count() == 60
+
+
+def test_enroll_students_reactivates_and_skips_enrolled(app):
+    with app.app_context():
+        db.session.add(Course(name='Algorithms', code='CS201', department='CSE'))
+        db.session.add(Enrollment(student_id=4, course_id=1, is_active=False))
+        db.session.add_all([Enrollment(student_id=user_id, course_id=1) for user_id in range(5, 20)])
+        db.session.commit()
+
+        statements = _count_statements()
+        # 4 is reactivated, 5-19 are already enrolled, 2 is faculty
+        enrolled, already, names = enroll_students(1, [2] + list(range(4, 30)))
+        assert (enrolled, already) == (11, 15)
+        assert len(names) == 10 and names[0] == 'Stu 1'
+        assert len(statements) == 4
+        db.session.commit()
+        assert Enrollment.query.filter_by(course_id=1, is_active=True).count() == 26
+        assert Enrollment.query.filter_by(student_id=2).count() == 0
+
+
+def test_enroll_whole_classroom(app, client):
+    with app.app_context():
+        db.session.add(Course(name='Algorithms', code='CS201', department='CSE'))
+        assign_students(db.session.get(Classroom, 1), range(4, 34))
+        db.session.add(Enrollment(student_id=4, course_id=1))
+        db.session.commit()
+
+    response = client.post('/admin/enrollments/add', data={'course_id': 1, 'classroom_id': 1, 'student_ids': [50]},
+                           follow_redirects=True)
+    page = response.get_data(as_text=True)
+    assert 'Successfully enrolled 30 students in Algorithms' in page
+    assert 'Stu 0' in page
+    with app.app_context():
+        assert Enrollment.query.filter_by(course_id=1).count() == 31
+
+    page = client.post('/admin/enrollments/add', data={'course_id': 1}).get_data(as_text=True)
+    assert 'Pick students, a classroom or a department' in page
+
+
+def test_enrollment_form_queries_do_not_grow_with_classrooms(app, client):
+    with app.app_context():
+        statements = _count_statements()
+    assert client.get('/admin/enrollments/add').status_code == 200
+    before = len(statements)
+
+    with app.app_context():
+        db.session.add_all([Classroom(name=f'ECE {section}', department='ECE', year=1, semester=1, section=section)
+                            for section in 'ABCDE'])
+        db.session.commit()
+    statements.clear()
+    assert client.get('/admin/enrollments/add').status_code == 200
+    assert len(statements) == before
@@ -0,0 +1,120 @@
+"""
+Tests for the compute-once cache helpers (caching.py)
+"""
+
+import pickle
+import threading
+import time
+
+import pytest
+
+import caching
+from caching import peek, remember, store
+from extensions import cache
+
+
+@pytest.fixture
+def app_config():
+    return {'CACHE_TYPE': 'SimpleCache'}
+
+
+@pytest.fixture
+def app(app):
+    with app.app_context():
+        cache.clear()
+    return app
+
+
+def test_concurrent_misses_compute_once(app, monkeypatch):
+    calls = []
+    results = []
+
+    # SET NX is atomic on Redis; SimpleCache.add is check-then-set, so make it atomic here
+    with app.app_context():
+        backend = cache.cache
+    add, guard = backend.add, threading.Lock()
+
+    def atomic_add(*args, **kwargs):
+        with guard:
+            return add(*args, **kwargs)
+
+    monkeypatch.setattr(backend, 'add', atomic_add)
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return {'value': 42}
+
+    def worker():
+        with app.app_context():
+            results.append(remember('expensive', compute))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [{'value': 42}] * 8
+    with app.app_context():
+        assert cache.get('lock:expensive') is None
+
+
+def test_unreachable_cache_computes(make_app):
+    app = make_app(CACHE_TYPE='RedisCache', CACHE_REDIS_URL='redis://127.0.0.1:1/0')
+    with app.app_context():
+        assert remember('expensive', lambda: 'fresh') == 'fresh'
+
+
+def _wait_for(predicate, seconds=2):
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_stale_entry_is_served_while_one_reader_refreshes(app):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.1)
+        return 'new'
+
+    with app.app_context():
+        # Expired a second ago, still inside its stale window
+        cache.set('report', caching._pack('old', 60, 0.0)._replace(expires_at=time.time() - 1), timeout=60)
+        assert [remember('report', compute, timeout=60, stale=60) for _ in range(5)] == ['old'] * 5
+
+        assert _wait_for(lambda: peek('report') == 'new')
+        assert _wait_for(lambda: cache.get('lock:report') is None)
+        assert len(calls) == 1
+        assert remember('report', compute, timeout=60, stale=60) == 'new'
+
+
+def test_early_expiration_depends_on_time_left_and_cost(app):
+    with app.app_context():
+        # An hour left and cheap to compute: never refreshed early
+        cache.set('cheap', caching._pack('cached', 3600, 0.001), timeout=3600)
+        assert all(remember('cheap', lambda: 'fresh', timeout=3600) == 'cached' for _ in range(50))
+        assert cache.get('lock:cheap') is None
+
+        # A second left of a value that takes minutes to compute: refreshed ahead of expiry
+        cache.set('costly', caching._pack('cached', 1, 300.0), timeout=60)
+        assert remember('costly', lambda: 'fresh', timeout=60) == 'cached'
+        assert _wait_for(lambda: peek('costly') == 'fresh')
+
+
+def test_large_values_are_compressed(app):
+    with app.app_context():
+        rows = [{'department': 'CSE', 'status': 'present', 'day': i % 30} for i in range(5000)]
+        store('small', rows[:3])
+        store('large', rows)
+        assert not cache.get('small').compressed
+        entry = cache.get('large')
+        assert entry.compressed
+        assert len(entry.data) < len(pickle.dumps(rows)) / 4
+        assert peek('large') == rows
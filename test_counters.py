@@ -0,0 +1,108 @@
+"""
+Tests for the denormalized counters (counters.py)
+"""
+
+import pytest
+from sqlalchemy import text
+
+from bulk import assign_students, enroll_students
+from counters import reconcile
+from extensions import db
+from models import Classroom, ClassroomAssignment, Course, Department, Enrollment, StudentReview, User
+
+
+@pytest.fixture
+def app(app):
+    with app.app_context():
+        db.session.add(User(username='fay', email='fay@example.com', password_hash='x', role='faculty',
+                            first_name='Fay', last_name='Faculty'))
+        db.session.add_all([
+            Classroom(name='CSE A 2-3', department='CSE', year=2, semester=3, section='A'),
+            Classroom(name='CSE B 2-3', department='CSE', year=2, semester=3, section='B'),
+            Course(name='Algorithms', code='CS201', department='CSE'),
+            Department(name='CSE', code='CSE', program='UG'),
+        ])
+        db.session.add_all([
+            User(username=f's{i}', email=f's{i}@example.com', password_hash='x', role='student',
+                 first_name='Stu', last_name=str(i))
+            for i in range(10)
+        ])
+        db.session.commit()
+    return app
+
+
+def _counts():
+    return db.session.query(Classroom.student_count, Classroom.faculty_count).order_by(Classroom.id).all()
+
+
+def test_flush_refreshes_old_and_new_parent(app):
+    with app.app_context():
+        students = User.query.filter_by(role='student').order_by(User.id).all()
+        for student in students[:4]:
+            student.classroom_id = 1
+        db.session.add(ClassroomAssignment(user_id=2, classroom_id=1))
+        db.session.commit()
+        assert _counts() == [(4, 1), (0, 0)]
+
+        # Moving a student after commit (expired attributes) still updates both classrooms
+        students[0].classroom_id = 2
+        db.session.delete(ClassroomAssignment.query.one())
+        db.session.commit()
+        assert _counts() == [(3, 0), (1, 0)]
+
+        students[1].role = 'faculty'
+        db.session.commit()
+        assert _counts() == [(2, 0), (1, 0)]
+
+
+def test_bulk_statements_refresh_on_commit(app):
+    with app.app_context():
+        assign_students(db.session.get(Classroom, 1), range(3, 13))
+        enroll_students(1, range(3, 8))
+        db.session.commit()
+        assert _counts() == [(10, 0), (0, 0)]
+        assert db.session.get(Course, 1).active_enrollment_count == 5
+
+        db.session.get(Enrollment, 1).is_active = False
+        db.session.commit()
+        assert db.session.get(Course, 1).active_enrollment_count == 4
+
+        # A rolled back bulk statement leaves nothing to refresh
+        assign_students(db.session.get(Classroom, 2), range(3, 13))
+        db.session.rollback()
+        assert _counts() == [(10, 0), (0, 0)]
+
+
+def test_department_rating(app):
+    with app.app_context():
+        department = db.session.get(Department, 1)
+        reviews = [StudentReview(student_name='A', review_text='Good', rating=rating, department_id=1)
+                   for rating in (5, 4, 2)]
+        db.session.add_all(reviews)
+        db.session.commit()
+        assert department.get_average_rating() == 0
+
+        reviews[0].is_approved = True
+        reviews[1].is_approved = True
+        db.session.commit()
+        assert (department.approved_review_count, department.rating_sum) == (2, 9)
+        assert department.get_average_rating() == 4.5
+
+        reviews[1].rating = 1
+        db.session.commit()
+        assert department.get_average_rating() == 3.0
+
+
+def test_reconcile_repairs_drift(app):
+    with app.app_context():
+        assign_students(db.session.get(Classroom, 1), range(3, 7))
+        db.session.commit()
+        # Writes that bypass the ORM
+        db.session.execute(text("UPDATE user SET classroom_id = 2 WHERE id = 3"))
+        db.session.execute(text("UPDATE classroom SET faculty_count = 7 WHERE id = 1"))
+        db.session.commit()
+        assert _counts() == [(4, 7), (0, 0)]
+
+        assert reconcile() == {'classroom': 2, 'course': 0, 'department': 0}
+        db.session.commit()
+        assert _counts() == [(3, 0), (1, 0)]
@@ -0,0 +1,72 @@
+"""
+Tests for the cached admin dashboard snapshot (dashboard.py)
+"""
+
+from datetime import date
+
+import pytest
+from sqlalchemy import event
+
+from caching import peek
+from dashboard import SNAPSHOT_KEY, refresh_snapshot
+from extensions import cache, db
+from models import Attendance, Department, Enquiry, User
+
+
+@pytest.fixture
+def app_config():
+    return {'CACHE_TYPE': 'SimpleCache'}
+
+
+@pytest.fixture
+def app(app):
+    with app.app_context():
+        cache.clear()
+        db.session.add(User(username='s1', email='s1@example.com', password_hash='x', role='student',
+                            first_name='Stu', last_name='One'))
+        db.session.add(Department(name='CSE', code='CSE', program='UG'))
+        db.session.add(Enquiry(name='Eve', email='eve@example.com', phone='1', message='Hi'))
+        db.session.flush()
+        db.session.add(Attendance(student_id=2, date=date.today(), status='present', marked_by=1))
+        db.session.commit()
+    return app
+
+
+def test_dashboard_renders_from_snapshot(app, client):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        response = client.get('/admin/dashboard')
+        assert response.status_code == 200
+        assert b'Figures as of' in response.data
+        assert b'eve@example.com' in response.data
+        computed = len(statements)
+
+        # The second view only loads the admin
+        statements.clear()
+        assert client.get('/admin/dashboard').status_code == 200
+        assert len(statements) < computed
+        assert not any('attendance' in statement for statement in statements)
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+
+
+def test_refresh_replaces_cached_snapshot(app):
+    with app.app_context():
+        first = refresh_snapshot()
+        assert first['total_students'] == 1
+        assert first['attendance_stats'][0]['present_count'] == 1
+
+        db.session.add(User(username='s2', email='s2@example.com', password_hash='x', role='student',
+                            first_name='Stu', last_name='Two'))
+        db.session.commit()
+        refresh_snapshot()
+        cached = peek(SNAPSHOT_KEY)
+        assert cached['total_students'] == 2
+        assert cached['computed_at'] >= first['computed_at']
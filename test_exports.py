@@ -0,0 +1,78 @@
+"""
+Tests for streaming CSV/XLSX exports (exports.py)
+"""
+
+import io
+from datetime import date
+
+import pytest
+from openpyxl import load_workbook
+
+from exports import _csv_chunks, _xlsx_chunks
+from extensions import db
+from models import Attendance, Classroom, User
+
+
+def test_csv_sends_header_before_reading_rows():
+    def rows():
+        raise AssertionError('rows read before the header was sent')
+        yield
+
+    chunks = _csv_chunks(['Name', 'Email'], rows())
+    assert next(chunks).decode('utf-8') == '﻿Name,Email\r\n'
+
+
+def test_csv_neutralises_formulas():
+    body = b''.join(_csv_chunks(['Name'], [('=HYPERLINK("x")',), ('-5',), (-5,), ('Ann',)])).decode('utf-8')
+    assert body.splitlines()[1:] == ['"\'=HYPERLINK(""x"")"', "'-5", '-5', 'Ann']
+
+
+def test_xlsx_is_a_workbook():
+    rows = ((i, f'user{i}') for i in range(5000))
+    workbook = load_workbook(io.BytesIO(b''.join(_xlsx_chunks('users', ['ID', 'Name'], rows))))
+    sheet = workbook['users']
+    assert sheet.max_row == 5001
+    assert [cell.value for cell in sheet[5001]] == [4999, 'user4999']
+
+
+@pytest.fixture
+def app(app):
+    with app.app_context():
+        classroom = Classroom(name='CSE 2-A', department='CSE', year=2, semester=3, section='A')
+        db.session.add(classroom)
+        db.session.flush()
+        students = [
+            User(username=f's{i}', email=f's{i}@example.com', password_hash='x', role='student',
+                 first_name='Stu', last_name=str(i), department='CSE', year=2, semester=3, section='A',
+                 student_id=f'CSE{i:03}', classroom_id=classroom.id)
+            for i in range(3)
+        ]
+        db.session.add_all(students)
+        db.session.flush()
+        db.session.add_all([
+            Attendance(student_id=student.id, date=date.today(), status='present', marked_by=1)
+            for student in students
+        ])
+        db.session.commit()
+    return app
+
+
+def test_export_users_applies_filters(client):
+    response = client.get('/admin/users/export?format=csv&role=student&classroom=1')
+    assert response.status_code == 200
+    assert response.headers['Content-Disposition'].startswith('attachment; filename="users_')
+    lines = response.get_data(as_text=True).splitlines()
+    assert len(lines) == 4
+    assert all(',CSE 2-A,' in line for line in lines[1:])
+
+
+def test_export_attendance_xlsx(client):
+    response = client.get('/admin/attendance-overview/export?format=xlsx&department=CSE')
+    assert response.status_code == 200
+    sheet = load_workbook(io.BytesIO(response.data)).active
+    assert sheet.max_row == 4
+    assert [cell.value for cell in sheet[2]][8:11] == ['CSE 2-A', 'present', 'Ada Admin']
+
+
+def test_export_rejects_unknown_format(client):
+    assert client.get('/admin/users/export?format=pdf').status_code == 400
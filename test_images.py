@@ -0,0 +1,138 @@
+"""
+Tests for responsive image variants (images.py)
+"""
+
+import pytest
+from PIL import Image
+
+import public_api
+import tasks
+from app import create_app
+from caching import peek, store
+from extensions import db
+from images import generate_variants, responsive_image
+from models import Banner, Department, User
+from storage import FileSystemStorage
+
+
+def write_photo(path, size=(1600, 900)):
+    image = Image.new('RGB', size, (200, 40, 40))
+    exif = Image.Exif()
+    exif[0x010F] = 'PhoneMaker'  # Make
+    exif[0x0112] = 6             # Orientation: rotate 90 degrees clockwise
+    image.save(path, 'JPEG', exif=exif.tobytes())
+
+
+def test_generate_variants_strips_metadata_and_resizes(tmp_path):
+    (tmp_path / 'banners').mkdir()
+    write_photo(tmp_path / 'banners' / 'campus.jpg')
+
+    result = generate_variants('banners/campus.jpg', FileSystemStorage(str(tmp_path)))
+
+    # Orientation applied: the 1600x900 landscape is stored as a portrait
+    assert (result['width'], result['height']) == (900, 1600)
+    # A stripped copy is stored next to the upload, which is left untouched
+    assert result['original'] != 'banners/campus.jpg'
+    with Image.open(tmp_path / result['original']) as original:
+        assert not original.getexif()
+
+    assert 'webp' in result['variants'] and 'jpeg' in result['variants']
+    webp = result['variants']['webp']
+    assert [entry['width'] for entry in webp] == [320, 640, 900]
+    for entry in webp:
+        with Image.open(tmp_path / entry['path']) as variant:
+            assert variant.format == 'WEBP'
+            assert variant.width == entry['width']
+
+
+def test_generate_variants_skips_non_images(tmp_path):
+    (tmp_path / 'notes.pdf').write_bytes(b'%PDF-1.4 not an image')
+    assert generate_variants('notes.pdf', FileSystemStorage(str(tmp_path))) is None
+
+
+def test_responsive_image_srcset():
+    described = responsive_image({'width': 640, 'height': 360, 'variants': {
+        'webp': [{'width': 320, 'path': 'banners/_variants/a-320.webp'},
+                 {'width': 640, 'path': 'banners/_variants/a-640.webp'}],
+        'jpeg': [{'width': 320, 'path': 'banners/_variants/a-320.jpg'}],
+    }})
+    assert described['sources'] == [{
+        'type': 'image/webp',
+        'srcset': '/static/uploads/banners/_variants/a-320.webp 320w, '
+                  '/static/uploads/banners/_variants/a-640.webp 640w',
+    }]
+    assert described['srcset'] == '/static/uploads/banners/_variants/a-320.jpg 320w'
+    assert responsive_image(None) is None
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'test.db'}",
+        'UPLOAD_FOLDER': str(tmp_path / 'uploads'),
+        'UPLOAD_GRACE_SECONDS': 0,
+        'CACHE_TYPE': 'SimpleCache',
+    }, profile='worker')
+    monkeypatch.setattr(tasks, '_flask_app', app)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def test_commit_queues_processing_and_replacing_clears_variants(app, tmp_path, monkeypatch):
+    queued = []
+    monkeypatch.setattr(tasks.process_uploaded_image, 'apply_async',
+                        lambda args, **kwargs: queued.append(args))
+
+    with app.app_context():
+        admin = User(username='admin', email='a@example.com', password_hash='x', role='admin',
+                     first_name='A', last_name='B')
+        db.session.add(admin)
+        db.session.commit()
+        assert queued == []
+
+        banner = Banner(title='Campus', image_path='banners/campus.jpg', created_by=admin.id)
+        db.session.add(banner)
+        db.session.commit()
+        assert queued == [('Banner', banner.id, 'banners/campus.jpg')]
+
+        # Running the task attaches the variants and the stripped copy
+        banners = tmp_path / 'uploads' / 'banners'
+        banners.mkdir(parents=True)
+        write_photo(banners / 'campus.jpg', size=(800, 400))
+        tasks.process_uploaded_image('Banner', banner.id, 'banners/campus.jpg')
+        db.session.expire_all()
+        variants = banner.image_variants
+        assert variants['width'] == 400
+        assert banner.image_path == variants['original']
+        assert not (banners / 'campus.jpg').exists()
+        assert len(queued) == 1
+
+        # A new image drops the old variants, with their files, and queues the new one
+        banner.image_path = 'banners/other.jpg'
+        db.session.commit()
+        assert banner.image_variants is None
+        assert queued[-1] == ('Banner', banner.id, 'banners/other.jpg')
+        assert not (tmp_path / 'uploads' / variants['variants']['webp'][0]['path']).exists()
+
+        # A task for the replaced image is a no-op
+        assert 'skipped' in tasks.process_uploaded_image('Banner', banner.id, variants['original'])
+
+
+def test_processing_a_department_image_invalidates_the_api_cache(app, tmp_path, monkeypatch):
+    monkeypatch.setattr(tasks.process_uploaded_image, 'apply_async', lambda args, **kwargs: None)
+
+    with app.app_context():
+        department = Department(name='Computer Science Engineering', code='CSE', program='UG',
+                                image='/static/uploads/departments/cse.jpg')
+        db.session.add(department)
+        db.session.commit()
+        store(public_api.DEPARTMENTS_CACHE_KEY, {'departments': []}, timeout=300)
+
+        departments = tmp_path / 'uploads' / 'departments'
+        departments.mkdir(parents=True)
+        write_photo(departments / 'cse.jpg', size=(800, 400))
+        tasks.process_uploaded_image('Department', department.id, '/static/uploads/departments/cse.jpg')
+
+        assert peek(public_api.DEPARTMENTS_CACHE_KEY) is None
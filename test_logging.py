@@ -0,0 +1,136 @@
+"""
+Tests for the structured logging setup (logging_config.py)
+"""
+
+import io
+import json
+import logging
+import random
+import re
+import sys
+
+import pytest
+from flask import Flask, g
+
+from logging_config import (
+    JsonFormatter, RequestContextFilter, SamplingFilter, init_request_logging, setup_logging, stop_logging,
+)
+from test_startup import run_python
+
+
+def make_record(msg='hello %s', args=('world',), level=logging.INFO, exc_info=None, **extra):
+    record = logging.LogRecord('college.test', level, __file__, 1, msg, args, exc_info)
+    for key, value in extra.items():
+        setattr(record, key, value)
+    return record
+
+
+@pytest.fixture
+def restore_logging():
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    yield
+    stop_logging()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(level)
+
+
+def test_json_formatter_includes_extra_fields():
+    entry = json.loads(JsonFormatter().format(make_record(event='attendance.batch_insert', rows=40)))
+    assert entry['message'] == 'hello world'
+    assert entry['level'] == 'INFO'
+    assert entry['logger'] == 'college.test'
+    assert entry['event'] == 'attendance.batch_insert'
+    assert entry['rows'] == 40
+    assert 'args' not in entry and 'exc_info' not in entry
+
+
+def test_json_formatter_includes_traceback():
+    try:
+        raise ValueError('boom')
+    except ValueError:
+        record = make_record(level=logging.ERROR, exc_info=sys.exc_info())
+    entry = json.loads(JsonFormatter().format(record))
+    assert 'ValueError: boom' in entry['exc_info']
+
+
+def test_sampling_filter():
+    sampling = SamplingFilter({'noisy': '0', 'kept': '1', 'half': '0.5'}, rng=random.Random(1))
+    assert not sampling.filter(make_record(event='noisy'))
+    assert sampling.filter(make_record(event='kept'))
+    assert sampling.filter(make_record())
+
+    records = [make_record(event='half') for _ in range(1000)]
+    kept = [record for record in records if sampling.filter(record)]
+    assert 400 < len(kept) < 600
+    assert all(record.sample_rate == 0.5 for record in kept)
+
+
+def test_request_context_filter():
+    app = Flask(__name__)
+    record = make_record()
+    assert RequestContextFilter().filter(record)
+    assert not hasattr(record, 'request_id')
+
+    with app.test_request_context('/admin/dashboard', method='POST'):
+        g.request_id = 'abc123'
+        RequestContextFilter().filter(record)
+    assert (record.request_id, record.method, record.path) == ('abc123', 'POST', '/admin/dashboard')
+
+
+def test_setup_logging_reads_environment(monkeypatch, restore_logging):
+    monkeypatch.setenv('LOG_LEVEL', 'warning')
+    monkeypatch.setenv('LOG_LEVELS', 'college.routes=DEBUG, college.quiet = ERROR')
+    monkeypatch.setenv('LOG_SAMPLE_RATES', 'college.noisy=0')
+    stream = io.StringIO()
+    setup_logging(stream=stream)
+
+    assert logging.getLogger().level == logging.WARNING
+    assert logging.getLogger('college.routes').level == logging.DEBUG
+    assert logging.getLogger('college.quiet').level == logging.ERROR
+
+    logging.getLogger('college.routes').debug('shown', extra={'event': 'college.routes'})
+    logging.getLogger('college.routes').debug('dropped', extra={'event': 'college.noisy'})
+    logging.getLogger('college.other').info('below the root level')
+    stop_logging()
+
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [line['message'] for line in lines] == ['shown']
+
+
+def test_request_id_round_trip():
+    app = Flask(__name__)
+    init_request_logging(app)
+    app.add_url_rule('/ping', 'ping', lambda: g.request_id)
+    client = app.test_client()
+
+    response = client.get('/ping', headers={'X-Request-ID': 'upstream-42'})
+    assert response.headers['X-Request-ID'] == 'upstream-42'
+    assert response.get_data(as_text=True) == 'upstream-42'
+
+    response = client.get('/ping')
+    assert re.fullmatch(r'[0-9a-f]{32}', response.headers['X-Request-ID'])
+    assert response.get_data(as_text=True) == response.headers['X-Request-ID']
+
+
+def test_import_leaves_logging_alone(tmp_path):
+    # Importing app must not replace the root handlers or start the listener;
+    # create_app does, once
+    run_python(tmp_path, (
+        'import logging, threading\n'
+        'sentinel = logging.NullHandler()\n'
+        'logging.getLogger().addHandler(sentinel)\n'
+        'import app, logging_config\n'
+        'assert logging_config._listener is None\n'
+        'assert logging.getLogger().handlers == [sentinel]\n'
+        'assert threading.active_count() == 1\n'
+        'app.create_app()\n'
+        'assert logging_config._listener is not None\n'
+        'assert sentinel not in logging.getLogger().handlers\n'
+        'listener = logging_config._listener\n'
+        'app.create_app()\n'
+        'assert logging_config._listener is listener\n'
+    ))
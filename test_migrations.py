@@ -0,0 +1,111 @@
+"""
+Tests for the Alembic migrations (migrations/)
+"""
+
+import pytest
+from sqlalchemy import inspect, text
+
+import migrations
+from app import create_app, create_tables
+from extensions import db
+from migrations import helpers
+from models import Classroom, ClassroomAssignment, Course, Department, Enrollment, StudentReview, User
+
+
+IMAGE_TABLES = ('user', 'department', 'lecturer', 'student_review', 'banner')
+
+
+@pytest.fixture
+def app(tmp_path):
+    return create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'test.db'}",
+        'UPLOAD_FOLDER': str(tmp_path / 'uploads'),
+        'IMAGE_PIPELINE': 'off',
+    }, profile='worker')
+
+
+def _revision():
+    with db.engine.connect() as connection:
+        return migrations.current_revision(connection)
+
+
+def _indexes(table):
+    return {index['name'] for index in inspect(db.engine).get_indexes(table)}
+
+
+def test_fresh_database_is_stamped_head(app):
+    with app.app_context():
+        create_tables()
+        head = _revision()
+        assert head is not None
+
+        # Nothing left to run
+        migrations.upgrade()
+        assert _revision() == head
+
+
+def test_legacy_database_upgrades(app, monkeypatch):
+    # Several batches per table
+    monkeypatch.setattr(helpers, 'BACKFILL_BATCH_SIZE', 2)
+
+    with app.app_context():
+        db.create_all()
+        db.session.add(User(username='fay', email='fay@example.com', password_hash='x', role='faculty',
+                            first_name='Fay', last_name='Faculty'))
+        db.session.add_all([Classroom(name=f'CSE {i}', department='CSE', year=2, semester=3, section=str(i))
+                            for i in range(3)])
+        db.session.add(Course(name='Algorithms', code='CS201', department='CSE'))
+        db.session.add(Department(name='CSE', code='CSE', program='UG'))
+        db.session.add_all([
+            User(username=f's{i}', email=f's{i}@example.com', password_hash='x', role='student',
+                 first_name='Stu', last_name=str(i), classroom_id=1 + i % 2)
+            for i in range(5)
+        ])
+        db.session.flush()
+        db.session.add(ClassroomAssignment(user_id=1, classroom_id=3))
+        db.session.add_all([Enrollment(student_id=student_id, course_id=1, is_active=student_id != 2)
+                            for student_id in range(2, 7)])
+        db.session.add_all([
+            StudentReview(student_name='A', rating=4, review_text='Good', department_id=1, is_approved=True),
+            StudentReview(student_name='B', rating=5, review_text='Great', department_id=1, is_approved=True),
+            StudentReview(student_name='C', rating=1, review_text='Bad', department_id=1, is_approved=False),
+        ])
+        db.session.commit()
+
+        # Roll the schema back to what create_all() built before the migrations
+        with db.engine.begin() as connection:
+            for table, names in (('classroom', ('student_count', 'faculty_count')),
+                                 ('course', ('active_enrollment_count',)),
+                                 ('department', ('approved_review_count', 'rating_sum'))):
+                for name in names:
+                    connection.execute(text(f'ALTER TABLE {table} DROP COLUMN {name}'))
+            for table in IMAGE_TABLES:
+                connection.execute(text(f'ALTER TABLE "{table}" DROP COLUMN image_variants'))
+            for name in ('idx_attendance_student_date_status', 'idx_attendance_marker_date_student',
+                         'idx_announcement_active_category', 'idx_announcement_active_pinned'):
+                connection.execute(text(f'DROP INDEX {name}'))
+            connection.execute(text('CREATE INDEX idx_attendance_status_date ON attendance (status, date)'))
+            connection.execute(text('CREATE INDEX idx_assignment_assigned_at ON classroom_assignments (assigned_at)'))
+        assert _revision() is None
+
+        migrations.upgrade()
+
+        assert _revision() is not None
+        db.session.expire_all()
+        assert db.session.query(Classroom.student_count, Classroom.faculty_count).order_by(Classroom.id).all() \
+            == [(3, 0), (2, 0), (0, 1)]
+        assert db.session.get(Course, 1).active_enrollment_count == 4
+        department = db.session.get(Department, 1)
+        assert (department.approved_review_count, department.rating_sum) == (2, 9)
+
+        attendance = _indexes('attendance')
+        assert {'idx_attendance_student_date_status', 'idx_attendance_marker_date_student'} <= attendance
+        assert 'idx_attendance_status_date' not in attendance
+        assert 'idx_assignment_assigned_at' not in _indexes('classroom_assignments')
+        assert {'idx_announcement_active_category', 'idx_announcement_active_pinned'} <= _indexes('announcement')
+        for table in IMAGE_TABLES:
+            assert 'image_variants' in {column['name'] for column in inspect(db.engine).get_columns(table)}
+        # Models that map image_variants load again
+        assert db.session.get(User, 1).image_variants is None
+        assert db.session.get(Department, 1).image_variants is None
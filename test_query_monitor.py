@@ -0,0 +1,128 @@
+"""
+Tests for the per-request query monitor and @query_budget
+"""
+
+import pytest
+from flask import Flask
+from sqlalchemy import create_engine, text
+
+from extensions import db
+from models import Classroom, ClassroomAssignment, Course, Department, Enrollment, Lecturer, StudentReview, User
+from query_monitor import QueryBudgetExceeded, init_query_monitor, query_budget
+
+
+def make_app(raise_on_budget=True):
+    app = Flask(__name__)
+    app.config.update(TESTING=True, QUERY_BUDGET_RAISE=raise_on_budget)
+    init_query_monitor(app)
+
+    engine = create_engine('sqlite://')
+
+    def run_queries(n):
+        with engine.connect() as conn:
+            for i in range(n):
+                conn.execute(text('SELECT :value'), {'value': i})
+
+    @app.route('/cheap')
+    @query_budget(3)
+    def cheap():
+        run_queries(2)
+        return 'ok'
+
+    @app.route('/loop')
+    @query_budget(3)
+    def loop():
+        run_queries(6)
+        return 'ok'
+
+    return app
+
+
+def test_query_count_header():
+    client = make_app().test_client()
+    response = client.get('/cheap')
+    assert response.status_code == 200
+    assert response.headers['X-Query-Count'] == '2'
+
+
+def test_budget_exceeded_raises_in_tests():
+    client = make_app().test_client()
+    with pytest.raises(QueryBudgetExceeded) as excinfo:
+        client.get('/loop')
+    assert excinfo.value.count == 6
+    assert excinfo.value.budget == 3
+    assert 'N+1? x6' in excinfo.value.report
+
+
+def test_budget_exceeded_only_logs_by_default(caplog):
+    client = make_app(raise_on_budget=False).test_client()
+    with caplog.at_level('WARNING', logger='query_monitor'):
+        response = client.get('/loop')
+    assert response.status_code == 200
+    assert 'exceeded its query budget of 3' in caplog.text
+
+
+# Views that render a list whose rows used to lazy-load in a loop
+BUDGETED_PAGES = [
+    (1, 'admin.admin_enrollments', '/admin/enrollments'),
+    (1, 'admin.admin_assign_classroom', '/admin/classrooms/1/assign'),
+    (1, 'admin.admin_assign_classroom', '/admin/classrooms/1/assign?user_type=faculty'),
+    (1, 'admin.admin_departments', '/admin/departments'),
+    (1, 'admin.admin_department_lecturers', '/admin/departments/1/lecturers'),
+    (1, 'admin.admin_department_reviews', '/admin/departments/1/reviews'),
+    (2, 'faculty.faculty_students', '/faculty/students'),
+]
+
+
+@pytest.fixture
+def app_config():
+    return {'QUERY_BUDGET_RAISE': True}
+
+
+@pytest.fixture
+def app(app):
+    # Enough rows that a query per row overruns every budget
+    rows = 6
+    with app.app_context():
+        db.session.add(User(username='fay', email='fay@example.com', password_hash='x', role='faculty',
+                            first_name='Fay', last_name='Faculty', faculty_id='F001'))
+        db.session.add_all([
+            User(username=f'f{i}', email=f'f{i}@example.com', password_hash='x', role='faculty',
+                 first_name='Fac', last_name=str(i), faculty_id=f'F1{i:02}')
+            for i in range(rows)
+        ])
+        db.session.flush()
+        faculty_ids = [user_id for (user_id,) in db.session.query(User.id).filter_by(role='faculty')]
+        for i in range(rows):
+            classroom = Classroom(name=f'CSE {i}', department='CSE', year=2, semester=3, section=chr(65 + i))
+            department = Department(name=f'Department {i}', code=f'D{i}', program='UG')
+            db.session.add_all([classroom, department])
+            db.session.flush()
+            db.session.add_all([ClassroomAssignment(user_id=user_id, classroom_id=classroom.id)
+                                for user_id in faculty_ids])
+            db.session.add_all([
+                User(username=f'c{i}s{j}', email=f'c{i}s{j}@example.com', password_hash='x', role='student',
+                     first_name='Stu', last_name=str(j), classroom_id=classroom.id, department='CSE',
+                     year=2, semester=3, section=classroom.section)
+                for j in range(rows)
+            ])
+            db.session.add_all([Lecturer(name=f'Lecturer {j}', department_id=department.id) for j in range(rows)])
+            db.session.add_all([StudentReview(student_name='A', review_text='Good', rating=4,
+                                              department_id=department.id) for j in range(rows)])
+            db.session.add(Course(name=f'Course {i}', code=f'C{i}', department='CSE', faculty_id=faculty_ids[i]))
+        db.session.flush()
+        student_ids = [user_id for (user_id,) in db.session.query(User.id).filter_by(role='student')]
+        db.session.add_all([Enrollment(student_id=student_id, course_id=course_id)
+                            for course_id in range(1, rows + 1) for student_id in student_ids[::rows]])
+        db.session.commit()
+    return app
+
+
+@pytest.mark.parametrize('user_id, endpoint, url', BUDGETED_PAGES)
+def test_list_pages_stay_within_their_budget(app, login, user_id, endpoint, url):
+    assert app.view_functions[endpoint].query_budget
+    client = login(app.test_client(), user_id)
+    # An N+1 raises QueryBudgetExceeded here
+    response = client.get(url)
+    assert response.status_code == 200
+    assert int(response.headers['X-Query-Count']) <= app.view_functions[endpoint].query_budget
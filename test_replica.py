@@ -0,0 +1,112 @@
+"""
+Tests for read-replica routing (replica.py), with the primary and the
+replica as two SQLite files
+"""
+
+import pytest
+from sqlalchemy import event, func, select
+
+from extensions import db
+from models import Classroom, Department, StudentReview, User
+from replica import REPLICA_BIND, replica_reads
+
+
+@pytest.fixture
+def app_config(tmp_path):
+    return {
+        'SQLALCHEMY_BINDS': {REPLICA_BIND: f"sqlite:///{tmp_path / 'replica.db'}"},
+        'CACHE_TYPE': 'NullCache',
+    }
+
+
+@pytest.fixture
+def app(app):
+    with app.app_context():
+        replica = db.engines[REPLICA_BIND]
+        db.metadata.create_all(replica)
+        with replica.begin() as connection:
+            connection.execute(User.__table__.insert().values(
+                username='admin', email='admin@example.com', password_hash='x', role='admin',
+                first_name='Ada', last_name='Admin', is_active=True))
+        # The replica is a copy of the primary, here one that has not caught up yet
+        for engine, departments in ((db.engines[None], 1), (replica, 3)):
+            with engine.begin() as connection:
+                connection.execute(Department.__table__.insert(), [
+                    {'name': f'Dept {i}', 'code': f'D{i}', 'program': 'UG', 'is_active': True}
+                    for i in range(departments)
+                ])
+                connection.execute(StudentReview.__table__.insert().values(
+                    student_name='A', rating=4, review_text='Good', department_id=1, is_approved=False))
+                connection.execute(Classroom.__table__.insert(), [
+                    {'name': f'CSE {section}', 'department': 'CSE', 'year': 2, 'semester': 3, 'section': section,
+                     'is_active': True}
+                    for section in 'AB'
+                ])
+    yield app
+    # init_app() registered a MetaData for the bind on the shared db; apps in
+    # other tests have no such bind, so create_all() must not see it
+    db.metadatas.pop(REPLICA_BIND, None)
+
+
+@pytest.fixture
+def replica_statements(app):
+    statements = []
+    with app.app_context():
+        engine = db.engines[REPLICA_BIND]
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', record)
+    yield statements
+    event.remove(engine, 'before_cursor_execute', record)
+
+
+def test_replica_reads_send_selects_only(app, replica_statements):
+    with app.app_context():
+        with replica_reads():
+            assert db.session.scalar(select(func.count(Department.id))) == 3
+            # Locking reads and writes stay on the primary
+            assert db.session.scalars(select(Department).with_for_update()).all()[0].name == 'Dept 0'
+            db.session.add(Department(name='New', code='NEW', program='UG'))
+            db.session.commit()
+        assert db.session.scalar(select(func.count(Department.id))) == 2
+        assert all(statement.lstrip().startswith('SELECT') for statement in replica_statements)
+        assert len(replica_statements) == 1
+
+
+def test_reports_read_replica_until_own_write(client, replica_statements):
+    assert client.get('/admin/dashboard').status_code == 200
+    assert client.get('/admin/attendance-overview').status_code == 200
+    assert replica_statements
+
+    # After the user's own write, their reads go to the primary for a while
+    assert client.post('/admin/reviews/1/approve').status_code == 302
+    replica_statements.clear()
+    assert client.get('/admin/dashboard').status_code == 200
+    assert replica_statements == []
+
+    with client.session_transaction() as session:
+        session['_primary_until'] = 0
+    assert client.get('/admin/dashboard').status_code == 200
+    assert replica_statements
+
+
+def test_bulk_statements_make_reads_sticky(client, replica_statements):
+    # move_classroom is a bulk UPDATE; nothing is flushed
+    response = client.post('/admin/classrooms/1/move', data={'target_classroom_id': 2})
+    assert response.status_code == 302
+    with client.session_transaction() as session:
+        assert '_primary_until' in session
+
+    replica_statements.clear()
+    assert client.get('/admin/attendance-overview').status_code == 200
+    assert replica_statements == []
+
+
+def test_attendance_export_streams_from_replica(client, replica_statements):
+    response = client.get('/admin/attendance-overview/export?format=csv')
+    assert response.status_code == 200
+    # The rows are read while the body streams, after the view has returned
+    assert response.get_data(as_text=True).startswith('﻿Date,Student ID')
+    assert any('FROM attendance' in statement for statement in replica_statements)
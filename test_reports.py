@@ -0,0 +1,77 @@
+"""
+Tests for the per-classroom attendance reports (reports.py) and the checker
+for classroom fields copied onto students (bulk.py)
+"""
+
+from datetime import date
+
+import pytest
+
+from bulk import classroom_field_drift, repair_classroom_fields
+from extensions import db
+from models import Attendance, Classroom, ClassroomAssignment, User
+
+
+@pytest.fixture
+def app(app):
+    with app.app_context():
+        db.session.add(User(username='fay', email='fay@example.com', password_hash='x', role='faculty',
+                            first_name='Fay', last_name='Faculty'))
+        classrooms = [
+            Classroom(name='CSE A 2-3', department='CSE', year=2, semester=3, section='A'),
+            Classroom(name='ECE B 1-1', department='ECE', year=1, semester=1, section='B'),
+        ]
+        db.session.add_all(classrooms)
+        db.session.flush()
+        db.session.add(ClassroomAssignment(user_id=2, classroom_id=1))
+        for i in range(6):
+            student = User(username=f's{i}', email=f's{i}@example.com', password_hash='x', role='student',
+                           first_name='Stu', last_name=str(i))
+            student.set_classroom(classrooms[i % 2] if i < 5 else None)
+            db.session.add(student)
+        db.session.flush()
+        for i in range(6):
+            for day, status in ((1, 'present'), (2, 'absent' if i == 0 else 'late')):
+                db.session.add(Attendance(student_id=3 + i, date=date.today().replace(day=day), status=status,
+                                          marked_by=2))
+        db.session.commit()
+    return app
+
+
+def test_overview_groups_by_classroom(app, client):
+    with app.app_context():
+        # A stale copy on the user no longer moves the student to another row
+        db.session.get(User, 3).department = 'ECE'
+        db.session.commit()
+
+    page = client.get('/admin/attendance-overview?date_from=2000-01-01').get_data(as_text=True)
+    assert page.index('CSE A 2-3') < page.index('ECE B 1-1') < page.index('No Classroom')
+
+    with app.app_context():
+        from reports import attendance_by_classroom, classroom_filter
+
+        rows = attendance_by_classroom(*classroom_filter(department='CSE'))
+        assert [(row.name, row.total_records, row.present_count, row.absent_count, row.late_count,
+                 row.total_students, row.student_count) for row in rows] == [('CSE A 2-3', 6, 3, 1, 2, 3, 3)]
+
+
+def test_faculty_report_uses_classroom_counts(app, login):
+    client = login(app.test_client(), 2)
+    page = client.get('/faculty/attendance-reports?department=CSE&date_from=2000-01-01').get_data(as_text=True)
+    assert 'CSE A 2-3' in page and 'ECE B 1-1' not in page
+
+
+def test_drift_is_found_and_repaired(app):
+    with app.app_context():
+        assert classroom_field_drift() == (0, [])
+        student = db.session.get(User, 3)
+        student.semester = 4
+        db.session.get(User, 4).section = None
+        db.session.commit()
+
+        assert classroom_field_drift() == (2, [3, 4])
+        assert repair_classroom_fields() == 2
+        db.session.commit()
+        assert classroom_field_drift() == (0, [])
+        db.session.refresh(student)
+        assert (student.department, student.year, student.semester, student.section) == ('CSE', 2, 3, 'A')
@@ -0,0 +1,88 @@
+"""
+Tests for the semester rollover (rollover.py)
+"""
+
+import pytest
+
+from extensions import db
+from models import Classroom, ClassroomAssignment, User
+from rollover import next_academic_year, plan_rollover
+
+
+@pytest.fixture
+def app(app):
+    with app.app_context():
+        db.session.add(User(username='fay', email='fay@example.com', password_hash='x', role='faculty',
+                            first_name='Fay', last_name='Faculty'))
+        db.session.add_all([
+            Classroom(id=1, name='CSE A 2-3', department='CSE', year=2, semester=3, section='A', academic_year='2024-25'),
+            Classroom(id=2, name='CSE A 2-4', department='CSE', year=2, semester=4, section='A', academic_year='2024-25'),
+            Classroom(id=3, name='CSE A 4-8', department='CSE', year=4, semester=8, section='A', academic_year='2024-25'),
+            Classroom(id=4, name='ECE A 1-1', department='ECE', year=1, semester=1, section='A', academic_year='2024-25'),
+        ])
+        for classroom_id, count in ((1, 3), (2, 2), (3, 1), (4, 1)):
+            classroom = db.session.get(Classroom, classroom_id)
+            db.session.add_all([
+                User(username=f'c{classroom_id}s{i}', email=f'c{classroom_id}s{i}@example.com', password_hash='x',
+                     role='student', first_name='Stu', last_name=str(i), classroom_id=classroom_id,
+                     department=classroom.department, year=classroom.year, semester=classroom.semester,
+                     section=classroom.section)
+                for i in range(count)
+            ])
+        # Fay teaches semesters 3 and 4; she had taught semester 5 before
+        db.session.add_all([
+            ClassroomAssignment(user_id=2, classroom_id=1),
+            ClassroomAssignment(user_id=2, classroom_id=2),
+        ])
+        db.session.commit()
+    return app
+
+
+def test_next_academic_year():
+    assert next_academic_year('2024-25', 5) == '2025-26'
+    assert next_academic_year('2024-2025', 3) == '2025-2026'
+    assert next_academic_year('2024-25', 4) == '2024-25'
+    assert next_academic_year(None, 3) is None
+
+
+def test_plan_is_a_dry_run(app):
+    with app.app_context():
+        plan = plan_rollover(department='CSE')
+        assert [(move['from'], move['to'], move['create'], move['students']) for move in plan['moves']] == [
+            ('CSE A 2-3', 'CSE A 2-4', False, 3),
+            ('CSE A 2-4', 'CSE A 3-5', True, 2),
+        ]
+        assert plan['graduating'] == [{'classroom_id': 3, 'classroom': 'CSE A 4-8', 'students': 1}]
+        assert plan['faculty_moved'] == 2
+        assert Classroom.query.count() == 4
+        assert User.query.filter_by(classroom_id=1).count() == 3
+
+
+def test_rollover_moves_cohorts_in_one_transaction(app, monkeypatch):
+    import tasks
+
+    monkeypatch.setattr(tasks, '_flask_app', app)
+    plan = tasks.semester_rollover(department='CSE', dry_run=False, performed_by=1)
+    assert plan['students_moved'] == 5 and plan['classrooms_created'] == 1
+
+    with app.app_context():
+        new = Classroom.query.filter_by(department='CSE', semester=5).one()
+        assert (new.name, new.year, new.academic_year) == ('CSE A 3-5', 3, '2025-26')
+        assert db.session.get(Classroom, 2).academic_year == '2024-25'
+
+        assert User.query.filter_by(classroom_id=2, year=2, semester=4).count() == 3
+        assert User.query.filter_by(classroom_id=new.id, year=3, semester=5).count() == 2
+        assert User.query.filter_by(classroom_id=1).count() == 0
+        assert User.query.filter_by(role='student', classroom_id=None).count() == 1
+        # Other departments are untouched
+        assert User.query.filter_by(classroom_id=4, semester=1).count() == 1
+
+        assignments = db.session.query(ClassroomAssignment.classroom_id, ClassroomAssignment.is_active)\
+            .order_by(ClassroomAssignment.classroom_id).all()
+        assert assignments == [(1, False), (2, True), (new.id, True)]
+
+
+def test_rollover_page_previews(app, client):
+    page = client.get('/admin/classrooms/rollover').get_data(as_text=True)
+    assert 'CSE A 3-5' in page and 'ECE A 1-2' in page
+    assert 'Start Rollover' in page
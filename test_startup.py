@@ -0,0 +1,70 @@
+"""
+Startup budget: creating the app must stay cheap and must not touch the database
+"""
+
+import os
+import subprocess
+import sys
+
+# Cumulative import time of ``wsgi`` in milliseconds; override on slow machines
+IMPORT_TIME_BUDGET_MS = float(os.environ.get('IMPORT_TIME_BUDGET_MS', 1500))
+LAZY_MODULES = ('pandas', 'openpyxl', 'PIL', 'celery')
+
+
+def run_python(tmp_path, code, importtime=False):
+    db_path = tmp_path / 'startup.db'
+    env = dict(os.environ, DATABASE_URL=f'sqlite:///{db_path}', LOG_LEVEL='WARNING')
+    args = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', code]
+    result = subprocess.run(
+        args, cwd=os.path.dirname(os.path.abspath(__file__)), env=env,
+        capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    return result, db_path
+
+
+def import_timings(tmp_path, module):
+    result, db_path = run_python(tmp_path, f'import {module}', importtime=True)
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line.split('|')
+        try:
+            timings[name.strip()] = int(cumulative)
+        except ValueError:
+            continue  # header line
+    return timings, db_path
+
+
+def test_import_does_not_touch_database(tmp_path):
+    _, db_path = import_timings(tmp_path, 'wsgi')
+    assert not db_path.exists()
+
+
+def test_heavy_modules_are_lazy(tmp_path):
+    timings, _ = import_timings(tmp_path, 'wsgi')
+    loaded = sorted(name for name in timings if name.split('.')[0] in LAZY_MODULES)
+    assert not loaded, f'imported at startup: {loaded[:10]}'
+
+
+def test_import_time_budget(tmp_path):
+    timings, _ = import_timings(tmp_path, 'wsgi')
+    total_ms = timings['wsgi'] / 1000
+    slowest = sorted(timings.items(), key=lambda item: -item[1])[:5]
+    assert total_ms < IMPORT_TIME_BUDGET_MS, f'import wsgi took {total_ms:.0f}ms; slowest: {slowest}'
+
+
+def test_profiles_load_only_their_views(tmp_path):
+    code = (
+        'import sys\n'
+        'from app import create_app\n'
+        'worker = create_app(profile="worker")\n'
+        'assert not [m for m in sys.modules if m.startswith("blueprints.") or m == "forms"], sys.modules.keys()\n'
+        'api = create_app(profile="api")\n'
+        'assert "blueprints.admin" not in sys.modules and "forms" not in sys.modules\n'
+        'assert sorted(api.blueprints) == ["api", "files"]\n'
+        'web = create_app()\n'
+        'assert {"auth", "student", "faculty", "admin", "api"} <= set(web.blueprints)\n'
+    )
+    run_python(tmp_path, code)
@@ -0,0 +1,95 @@
+"""
+Tests for the upload storage backends (storage.py). The S3 backend runs
+against moto's S3 server as a local stand-in for MinIO/AWS.
+"""
+
+import io
+import socket
+import urllib.request
+
+import pytest
+
+from storage import S3Storage, storage_from_config
+from uploads import release, store_stream
+
+moto_server = pytest.importorskip('moto.server')
+pytest.importorskip('boto3')
+
+
+@pytest.fixture(scope='module')
+def s3_endpoint():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    server = moto_server.ThreadedMotoServer(ip_address='127.0.0.1', port=port)
+    server.start()
+    yield f'http://127.0.0.1:{port}'
+    server.stop()
+
+
+@pytest.fixture
+def s3(s3_endpoint, monkeypatch, request):
+    monkeypatch.setenv('AWS_ACCESS_KEY_ID', 'test')
+    monkeypatch.setenv('AWS_SECRET_ACCESS_KEY', 'test')
+    bucket = request.node.name.replace('_', '-')[:60]
+    storage = storage_from_config({'UPLOAD_STORAGE': 's3', 'S3_BUCKET': bucket,
+                                   'S3_ENDPOINT_URL': s3_endpoint, 'S3_PREFIX': 'college'})
+    storage.client.create_bucket(Bucket=bucket)
+    return storage
+
+
+def test_small_upload_is_deduplicated(s3):
+    first = store_stream(io.BytesIO(b'banner'), 'banners', 'a.png', s3)
+    second = store_stream(io.BytesIO(b'banner'), 'banners', 'b.png', s3)
+
+    assert first == second
+    assert list(s3.list()) == [first]
+    head = s3.client.head_object(Bucket=s3.bucket, Key='college/' + first)
+    assert head['ContentType'] == 'image/png'
+    assert 'immutable' in head['CacheControl']
+
+
+def test_large_upload_streams_in_parts(s3):
+    data = bytes(range(256)) * (11 * 1024 * 1024 // 256)  # three 5MB parts
+    s3.part_size = 5 * 1024 * 1024
+
+    key = store_stream(io.BytesIO(data), 'imports', 'big.pdf', s3)
+
+    assert s3.open(key).read() == data
+    # The temporary multipart object is gone and nothing is left half-uploaded
+    objects = s3.client.list_objects_v2(Bucket=s3.bucket)['Contents']
+    assert [item['Key'] for item in objects] == ['college/' + key]
+    assert not s3.client.list_multipart_uploads(Bucket=s3.bucket).get('Uploads')
+
+
+def test_download_urls(s3):
+    key = store_stream(io.BytesIO(b'photo'), 'profiles', 'me.jpg', s3)
+
+    # Private bucket: pages link to the redirect view, which hands out presigned URLs
+    assert s3.url(key) == f'/uploads/{key}'
+    with urllib.request.urlopen(s3.download_url(key)) as response:
+        assert response.read() == b'photo'
+
+    public = S3Storage(s3.bucket, prefix='college', public_url='https://cdn.example.com/', client=s3.client)
+    assert public.url(key) == f'https://cdn.example.com/college/{key}'
+
+
+def test_release_removes_object_and_variants(s3, monkeypatch):
+    key = store_stream(io.BytesIO(b'image'), 'banners', 'a.jpg', s3)
+    stem = key.rsplit('/', 1)[1].split('.')[0]
+    s3.put(f'banners/_variants/{stem}-320.webp', io.BytesIO(b'small'), 'image/webp')
+    monkeypatch.setattr('uploads.is_referenced', lambda connection, path: False)
+
+    assert release(None, key, s3, grace_seconds=0)
+    assert list(s3.list()) == []
+
+
+def test_redirect_view(tmp_path):
+    from app import create_app
+
+    app = create_app({'TESTING': True, 'UPLOAD_FOLDER': str(tmp_path),
+                      'SQLALCHEMY_DATABASE_URI': 'sqlite://'}, profile='api')
+    response = app.test_client().get('/uploads/banners/abc.jpg')
+    assert response.status_code == 302
+    assert response.headers['Location'] == '/static/uploads/banners/abc.jpg'
+    assert app.test_client().get('/uploads/.tmp/x').status_code == 404
@@ -0,0 +1,85 @@
+"""
+Tests for batched result streaming (streaming.py) and the pages converted to it
+"""
+
+from datetime import date, timedelta
+
+import pytest
+
+from extensions import db
+from models import Attendance, Course, Enrollment, User
+from streaming import scan_batches, stream_rows
+
+
+@pytest.fixture
+def app(app):
+    with app.app_context():
+        db.session.add(User(username='faculty', email='faculty@example.com', password_hash='x',
+                            role='faculty', first_name='Fay', last_name='Faculty'))
+        db.session.add_all([
+            User(username=f's{i}', email=f's{i}@example.com', password_hash='x', role='student',
+                 first_name='Stu', last_name=f'{i:03}', department='CSE', year=1 + i % 4, semester=1,
+                 section='A', student_id=f'CSE{i:03}')
+            for i in range(120)
+        ])
+        db.session.commit()
+    return app
+
+
+def test_stream_rows(app):
+    with app.app_context():
+        rows = stream_rows(db.select(User.username).where(User.role == 'student').order_by(User.id),
+                           batch_size=7)
+        assert [row.username for row in rows] == [f's{i}' for i in range(120)]
+
+
+def test_scan_batches_flushes_and_expunges(app):
+    with app.app_context():
+        statement = db.select(User).where(User.role == 'student').order_by(User.id)
+        sizes = []
+        for batch in scan_batches(statement, batch_size=50):
+            sizes.append(len(batch))
+            for user in batch:
+                user.phone = '555'
+            assert len(db.session.identity_map) == len(batch)
+        assert sizes == [50, 50, 20]
+        assert len(db.session.identity_map) == 0
+        assert db.session.scalar(db.select(db.func.count()).where(User.phone == '555')) == 120
+
+
+def test_faculty_students_is_paginated(app, login):
+    client = login(app.test_client(), 2)
+    first = client.get('/faculty/students').get_data(as_text=True)
+    last = client.get('/faculty/students?page=3').get_data(as_text=True)
+    assert 'CSE000' in first and 'CSE119' not in first
+    assert 'CSE119' in last and 'CSE000' not in last
+    assert '<h3>120</h3>' in first
+
+
+def test_admin_enrollments_is_paginated(app, client):
+    with app.app_context():
+        course = Course(name='Algorithms', code='CS201', department='CSE', credits=4, faculty_id=2)
+        db.session.add(course)
+        db.session.flush()
+        db.session.add_all([Enrollment(student_id=student_id, course_id=course.id)
+                            for student_id in range(3, 123)])
+        db.session.commit()
+    page = client.get('/admin/enrollments?page=3').get_data(as_text=True)
+    assert page.count('confirmRemoveEnrollment(') == 20 + 1  # rows plus the function definition
+    assert 'Fay Faculty' in page
+    assert client.get('/admin/enrollments/add').status_code == 200
+
+
+def test_cleanup_old_attendance_counts_without_loading_rows(app, monkeypatch):
+    import tasks
+
+    with app.app_context():
+        db.session.add_all([
+            Attendance(student_id=3, date=date.today() - timedelta(days=days), marked_by=2)
+            for days in (1, 400, 500)
+        ])
+        db.session.commit()
+    monkeypatch.setattr(tasks, '_flask_app', app)
+    # Nothing is archived yet, so no row has to be read
+    monkeypatch.setattr('streaming.scan_batches', None)
+    assert tasks.cleanup_old_attendance() == 'Processed 2 old attendance records'
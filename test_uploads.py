@@ -0,0 +1,94 @@
+"""
+Tests for content-addressed upload storage (uploads.py)
+"""
+
+import hashlib
+import io
+import os
+
+import pytest
+
+from app import create_app
+from extensions import db
+from models import Banner, Department, User
+from storage import FileSystemStorage
+from uploads import is_content_addressed, relative_upload_path, store_stream, sweep_unreferenced
+
+
+def test_store_stream_names_files_by_content(tmp_path):
+    data = b'banner bytes' * 10000
+    storage = FileSystemStorage(str(tmp_path))
+    first = store_stream(io.BytesIO(data), 'banners', 'Campus Day.JPEG', storage)
+    second = store_stream(io.BytesIO(data), 'banners', 'copy.jpeg', storage)
+
+    assert first == second == f'banners/{hashlib.sha256(data).hexdigest()}.jpg'
+    assert is_content_addressed(first)
+    assert os.listdir(tmp_path / 'banners') == [os.path.basename(first)]
+    assert os.listdir(tmp_path / '.tmp') == []
+    assert (tmp_path / first).read_bytes() == data
+
+
+def test_relative_upload_path():
+    assert relative_upload_path('banners/a.jpg') == 'banners/a.jpg'
+    assert relative_upload_path('/static/uploads/departments/a.jpg') == 'departments/a.jpg'
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'test.db'}",
+        'UPLOAD_FOLDER': str(tmp_path / 'uploads'),
+        'UPLOAD_GRACE_SECONDS': 0,
+        'IMAGE_PIPELINE': 'off',
+    }, profile='worker')
+    with app.app_context():
+        db.create_all()
+        db.session.add(User(username='admin', email='a@example.com', password_hash='x', role='admin',
+                            first_name='A', last_name='B'))
+        db.session.commit()
+    return app
+
+
+def test_shared_file_deleted_with_last_reference(app, tmp_path):
+    with app.app_context():
+        path = store_stream(io.BytesIO(b'same image'), 'banners', 'a.jpg')
+        first = Banner(title='One', image_path=path, created_by=1)
+        second = Banner(title='Two', image_path=path, created_by=1)
+        db.session.add_all([first, second])
+        db.session.commit()
+
+        db.session.delete(first)
+        db.session.commit()
+        assert (tmp_path / 'uploads' / path).exists()
+
+        db.session.delete(second)
+        db.session.commit()
+        assert not (tmp_path / 'uploads' / path).exists()
+
+
+def test_replacing_releases_old_file_across_url_formats(app, tmp_path):
+    with app.app_context():
+        old = store_stream(io.BytesIO(b'old'), 'departments', 'a.jpg')
+        new = store_stream(io.BytesIO(b'new'), 'departments', 'b.jpg')
+        department = Department(name='EEC', code='EEC', program='UG', image=f'/static/uploads/{old}')
+        db.session.add(department)
+        db.session.commit()
+
+        department.image = f'/static/uploads/{new}'
+        db.session.commit()
+        assert not (tmp_path / 'uploads' / old).exists()
+        assert (tmp_path / 'uploads' / new).exists()
+
+
+def test_sweep_removes_only_unreferenced(app, tmp_path):
+    with app.app_context():
+        kept = store_stream(io.BytesIO(b'kept'), 'banners', 'a.png')
+        orphan = store_stream(io.BytesIO(b'orphan'), 'banners', 'b.png')
+        db.session.add(Banner(title='Kept', image_path=kept, created_by=1))
+        db.session.commit()
+
+        with db.engine.connect() as connection:
+            assert sweep_unreferenced(connection, grace_seconds=0) == 1
+        assert (tmp_path / 'uploads' / kept).exists()
+        assert not (tmp_path / 'uploads' / orphan).exists()
@@ -0,0 +1,99 @@
+"""
+Tests for the typeahead user search and the forms that use UserPickerField
+"""
+
+import pytest
+from flask_wtf import FlaskForm
+
+from extensions import db
+from forms import UserPickerField
+from models import Classroom, ClassroomAssignment, Course, Enrollment, User
+
+
+@pytest.fixture
+def app(app):
+    with app.app_context():
+        db.session.add(User(username='fay', email='fay@example.com', password_hash='x', role='faculty',
+                            first_name='Fay', last_name='Smith', faculty_id='F001', department='CSE'))
+        db.session.add(Classroom(name='CSE 1-A', department='CSE', year=1, semester=1, section='A'))
+        db.session.add(Course(name='Algorithms', code='CS201', department='CSE'))
+        db.session.add_all([
+            User(username=f's{i}', email=f's{i}@example.com', password_hash='x', role='student',
+                 first_name='Ann' if i % 2 else 'Bob', last_name=f'Smith{i:02}', student_id=f'CSE{i:03}',
+                 department='CSE' if i < 30 else 'ECE', classroom_id=1 if i < 5 else None)
+            for i in range(50)
+        ])
+        db.session.commit()
+    return app
+
+
+def test_search_matches_word_prefixes(client):
+    data = client.get('/admin/users/search?role=student&q=ann%20smith1').get_json()
+    assert [user['text'] for user in data['results']] == [
+        f'Ann Smith{i} (CSE0{i})' for i in (11, 13, 15, 17, 19)
+    ]
+    assert data['more'] is False
+    assert client.get('/admin/users/search?role=student&q=nn').get_json()['results'] == []
+    assert client.get('/admin/users/search?role=student&q=%25').get_json()['results'] == []
+
+
+def test_search_pages_and_scopes(client):
+    first = client.get('/admin/users/search?role=student').get_json()
+    second = client.get('/admin/users/search?role=student&page=3').get_json()
+    assert len(first['results']) == 20 and first['more'] is True
+    assert len(second['results']) == 10 and second['more'] is False
+
+    unassigned = client.get('/admin/users/search?role=student&unassigned=1&department=CSE&page=2').get_json()
+    assert len(unassigned['results']) == 5 and unassigned['more'] is False
+    faculty = client.get('/admin/users/search?role=faculty&q=F00').get_json()
+    assert faculty['results'] == [{'id': 2, 'text': 'Fay Smith (F001)'}]
+    assert client.get('/admin/users/search?role=admin').status_code == 400
+
+
+def test_enrollment_form_checks_ids_without_listing_students(app, client):
+    page = client.get('/admin/enrollments/add').get_data(as_text=True)
+    assert 'Smith01' not in page
+
+    # 2 is faculty, not a student: rejected, and the valid pick (s7) is kept for the re-render
+    page = client.post('/admin/enrollments/add', data={'course_id': 1, 'student_ids': [10, 2]})
+    assert page.status_code == 200
+    assert 'can no longer be picked here' in page.get_data(as_text=True)
+    assert 'Ann Smith07 (CSE007)' in page.get_data(as_text=True)
+
+    response = client.post('/admin/enrollments/add', data={'course_id': 1, 'student_ids': [10, 11]})
+    assert response.status_code == 302
+    with app.app_context():
+        assert db.session.query(Enrollment.student_id).order_by(Enrollment.student_id).all() == [(10,), (11,)]
+
+
+def test_assign_classroom_only_accepts_unassigned_students(app, client):
+    # Student 3 (s0) is already in a classroom
+    page = client.post('/admin/classrooms/1/assign', data={'classroom_id': 1, 'user_type': 'student',
+                                                            'user_ids': [3]})
+    assert 'can no longer be picked here' in page.get_data(as_text=True)
+
+    response = client.post('/admin/classrooms/1/assign', data={'classroom_id': 1, 'user_type': 'faculty',
+                                                                'user_ids': [2]})
+    assert response.status_code == 302
+    with app.app_context():
+        assert ClassroomAssignment.query.filter_by(user_id=2, classroom_id=1).count() == 1
+
+
+class PickerForm(FlaskForm):
+    students = UserPickerField('Students', role='student')
+    anyone = UserPickerField('Anyone')
+
+
+def test_picker_defaults_to_its_role_and_names_a_missing_query(app):
+    with app.test_request_context(method='POST', data={'students': [3, 2]}):
+        form = PickerForm()
+        assert not form.validate()
+        # 2 is faculty: not an active student
+        assert form.students.errors == ['1 of the selected users can no longer be picked here.']
+
+    with app.test_request_context(method='POST', data={'anyone': [3]}):
+        form = PickerForm()
+        with pytest.raises(ValueError, match="'anyone' has no query"):
+            form.validate()
+        form.anyone.query = User.query.filter_by(role='student')
+        assert form.validate()
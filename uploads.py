@@ -0,0 +1,242 @@
+"""
+Content-addressed storage for uploaded files.
+
+Where the bytes live is up to the backend in storage.py (local disk or an
+S3-compatible bucket); this module decides what files are called and when
+they can be deleted.
+
+Uploads are stored under the SHA-256 of their bytes instead of a random name:
+
+    static/uploads/banners/3f7a...e9c1.jpg
+
+so the same file uploaded twice (the same banner for two slides, a photo
+re-uploaded when editing a record) is stored once, and a URL always serves
+the same bytes. That is what lets nginx cache /static/uploads/ for a year
+with ``immutable`` (see nginx.conf): a changed image gets a new URL.
+
+The hash is computed while the upload is streamed to the backend, so large
+files are read once and never held in memory.
+
+Because a file may be shared, records no longer delete their file directly.
+The columns listed in UPLOAD_FIELDS are tracked by ``init_upload_tracking``:
+when a commit replaces or deletes a value, the old file is released, and it
+is removed (with its image variants) only if no row references it any more.
+Files touched within the last UPLOAD_GRACE_SECONDS are left alone so an
+upload that is about to be committed cannot lose its file to a concurrent
+delete; ``sweep_unreferenced`` (run hourly by Celery) collects those later.
+"""
+
+import hashlib
+import logging
+import mimetypes
+import os
+import re
+import time
+
+from sqlalchemy import event, inspect, select
+
+from storage import get_storage
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+DEFAULT_GRACE_SECONDS = 300
+VARIANT_DIR = '_variants'
+
+# model class name -> column holding an upload path
+UPLOAD_FIELDS = {
+    'Banner': 'image_path',
+    'Department': 'image',
+    'Lecturer': 'photo',
+    'StudentReview': 'photo',
+    'User': 'profile_image',
+}
+
+CONTENT_ADDRESSED_RE = re.compile(r'^[0-9a-f]{64}(\.[a-z0-9]+)?$')
+
+
+def upload_url_prefix():
+    return os.environ.get('UPLOAD_URL_PREFIX', '/static/uploads/')
+
+
+def relative_upload_path(stored):
+    """
+    Path of an upload relative to UPLOAD_FOLDER.
+
+    Most models store 'banners/name.jpg', departments store the full
+    '/static/uploads/departments/name.jpg' URL.
+    """
+    if not stored:
+        return None
+    prefix = upload_url_prefix()
+    if stored.startswith(prefix):
+        stored = stored[len(prefix):]
+    return stored.lstrip('/')
+
+
+def upload_url(stored):
+    """Public URL of an upload, from the value stored on a model"""
+    if not stored:
+        return None
+    return get_storage().url(relative_upload_path(stored))
+
+
+def is_content_addressed(path):
+    return bool(path) and bool(CONTENT_ADDRESSED_RE.match(os.path.basename(path)))
+
+
+def _extension(filename):
+    ext = os.path.splitext(filename)[1].lower()
+    return '.jpg' if ext == '.jpeg' else ext
+
+
+def store_stream(stream, subfolder, filename, storage=None):
+    """
+    Copy ``stream`` into the store, hashing it on the way, and return the
+    key 'subfolder/<sha256>.ext'. ``filename`` only supplies the extension.
+    """
+    storage = storage or get_storage()
+    digest = hashlib.sha256()
+    writer = storage.writer()
+    try:
+        for chunk in iter(lambda: stream.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+            writer.write(chunk)
+    except Exception:
+        writer.abort()
+        raise
+    key = os.path.join(subfolder, digest.hexdigest() + _extension(filename)).replace('\\', '/')
+    content_type = mimetypes.guess_type(filename)[0]
+    writer.commit(key, content_type)
+    return key
+
+
+def store_file(path, subfolder, filename, storage=None):
+    """Add a local file (e.g. one saved before uploads were content-addressed) to the store"""
+    with open(path, 'rb') as source:
+        return store_stream(source, subfolder, filename, storage)
+
+
+def _path_variants(relative_path):
+    """Values a column may hold for this upload"""
+    return [relative_path, upload_url_prefix() + relative_path]
+
+
+def is_referenced(connection, relative_path):
+    import models
+
+    for model_name, field in UPLOAD_FIELDS.items():
+        column = getattr(getattr(models, model_name), field)
+        if connection.execute(select(column).where(column.in_(_path_variants(relative_path))).limit(1)).first():
+            return True
+    return False
+
+
+def _referenced_paths(connection):
+    import models
+
+    referenced = set()
+    for model_name, field in UPLOAD_FIELDS.items():
+        column = getattr(getattr(models, model_name), field)
+        for (value,) in connection.execute(select(column).where(column.isnot(None), column != '')):
+            referenced.add(relative_upload_path(value))
+    return referenced
+
+
+def _remove(storage, key):
+    """Delete a stored file and any image variants generated from it"""
+    folder, filename = os.path.split(key)
+    stem = os.path.splitext(filename)[0]
+    storage.delete(key)
+    variant_prefix = '/'.join(part for part in (folder, VARIANT_DIR, stem + '-') if part)
+    for variant in list(storage.list(variant_prefix)):
+        storage.delete(variant)
+
+
+def _recently_touched(storage, key, grace_seconds):
+    modified = storage.modified_at(key)
+    return modified is not None and time.time() - modified < grace_seconds
+
+
+def release(connection, stored, storage=None, grace_seconds=DEFAULT_GRACE_SECONDS):
+    """Delete an upload if nothing references it; returns True if it was deleted"""
+    storage = storage or get_storage()
+    key = relative_upload_path(stored)
+    if not key or is_referenced(connection, key):
+        return False
+    if _recently_touched(storage, key, grace_seconds):
+        return False
+    _remove(storage, key)
+    return True
+
+
+def sweep_unreferenced(connection, storage=None, grace_seconds=DEFAULT_GRACE_SECONDS):
+    """Delete every content-addressed upload that no row references; returns the count"""
+    storage = storage or get_storage()
+    referenced = _referenced_paths(connection)
+    removed = 0
+    for key in list(storage.list()):
+        if f'/{VARIANT_DIR}/' in f'/{key}' or not is_content_addressed(key):
+            continue
+        if key in referenced or _recently_touched(storage, key, grace_seconds):
+            continue
+        _remove(storage, key)
+        removed += 1
+    return removed
+
+
+# Tracking
+
+def _before_flush(session, flush_context, instances):
+    released = session.info.setdefault('released_uploads', [])
+    for obj in list(session.dirty):
+        field = UPLOAD_FIELDS.get(type(obj).__name__)
+        if field is None:
+            continue
+        history = inspect(obj).attrs[field].history
+        if history.has_changes():
+            released.extend(path for path in history.deleted if path)
+    for obj in session.deleted:
+        field = UPLOAD_FIELDS.get(type(obj).__name__)
+        if field is not None and getattr(obj, field):
+            released.append(getattr(obj, field))
+
+
+def _after_commit(session):
+    released = session.info.pop('released_uploads', None)
+    if not released:
+        return
+    from flask import current_app
+
+    grace_seconds = current_app.config['UPLOAD_GRACE_SECONDS']
+    try:
+        # The session cannot run SQL inside after_commit; use a connection of its own
+        with session.get_bind().connect() as connection:
+            for path in set(released):
+                release(connection, path, grace_seconds=grace_seconds)
+    except Exception as e:
+        # The files are left for sweep_unreferenced
+        logger.warning('Could not release replaced uploads: %s', e)
+
+
+def _after_rollback(session, previous_transaction):
+    session.info.pop('released_uploads', None)
+
+
+def _load_old_value(target, value, oldvalue, initiator):
+    pass
+
+
+def init_upload_tracking(db):
+    """Release the old file whenever a tracked upload column is replaced or its row deleted"""
+    import models
+
+    if event.contains(db.session, 'before_flush', _before_flush):
+        return
+    for model_name, field in UPLOAD_FIELDS.items():
+        # Load the previous value on assignment, even if the attribute was
+        # expired by a commit, so the flush history knows which file to release
+        event.listen(getattr(getattr(models, model_name), field), 'set', _load_old_value, active_history=True)
+    event.listen(db.session, 'before_flush', _before_flush)
+    event.listen(db.session, 'after_commit', _after_commit)
+    event.listen(db.session, 'after_soft_rollback', _after_rollback)
@@ -1,9 +1,8 @@
-import os
-import uuid
 from functools import wraps
-from flask import abort, current_app
+from flask import abort
 from flask_login import current_user
 from werkzeug.utils import secure_filename
+from uploads import store_stream
 
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'pdf', 'doc', 'docx'}
 
@@ -12,23 +11,10 @@ def allowed_file(filename):
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 def save_uploaded_file(file, subfolder=''):
-    """Save uploaded file and return the filename"""
+    """Save uploaded file and return its path relative to UPLOAD_FOLDER"""
     if file and allowed_file(file.filename):
-        # Generate unique filename
-        filename = secure_filename(file.filename)
-        name, ext = os.path.splitext(filename)
-        unique_filename = f"{name}_{uuid.uuid4().hex[:8]}{ext}"
-        
-        # Create upload directory if it doesn't exist
-        upload_path = os.path.join(current_app.config['UPLOAD_FOLDER'], subfolder)
-        os.makedirs(upload_path, exist_ok=True)
-        
-        # Save file
-        file_path = os.path.join(upload_path, unique_filename)
-        file.save(file_path)
-        
-        # Return relative path for database storage
-        return os.path.join(subfolder, unique_filename).replace('\\', '/')
+        # Stored under its content hash; identical uploads share one file
+        return store_stream(file.stream, subfolder, secure_filename(file.filename))
     
     return None
 
@@ -0,0 +1,12 @@
+"""
+WSGI entry point: ``gunicorn -c gunicorn.conf.py wsgi:app``
+
+APP_PROFILE selects what the process loads (web by default, or api for a
+process serving only the public /api/* endpoints).
+"""
+
+import os
+
+from app import create_app
+
+app = create_app(profile=os.environ.get('APP_PROFILE', 'web'))